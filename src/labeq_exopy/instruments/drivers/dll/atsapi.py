@@ -26,6 +26,7 @@ Attributes:
 # - use numpy for memory allocation in DMABuffer
 # - remove tk WaitBar
 # - delay the loading of the ats library
+# - bind the functions used while streaming once per board
 
 from ctypes import (CDLL, byref, c_byte, c_int, c_long, c_float, c_uint32,
                     c_int64, c_void_p, c_char_p)
@@ -570,6 +571,12 @@ class Board(object):
 
         self.type = ats.AlazarGetBoardKind(self.handle)
 
+        # Functions called for each buffer during an acquisition are looked
+        # up once and the handle converted once.
+        self._handle = U32(self.handle)
+        self._postAsyncBuffer = ats.AlazarPostAsyncBuffer
+        self._waitAsyncBufferComplete = ats.AlazarWaitAsyncBufferComplete
+
     def abortAsyncRead(self):
         """Cancels any asynchronous acquisition running on a board.
 
@@ -657,7 +664,7 @@ class Board(object):
         """Posts a DMA buffer to a board.
 
         """
-        ats.AlazarPostAsyncBuffer(self.handle, buffer, bufferLength)
+        self._postAsyncBuffer(self._handle, buffer, bufferLength)
 
     def read(self, channelId, buffer, elementSize, record, transferOffset,
              transferLength):
@@ -780,4 +787,4 @@ class Board(object):
         """Blocks until the board confirms that buffer is filled with data.
 
         """
-        ats.AlazarWaitAsyncBufferComplete(self.handle, buffer, timeout_ms)
+        self._waitAsyncBufferComplete(self._handle, buffer, timeout_ms)
@@ -19,6 +19,7 @@ To read well the Dll of the LabBrick, Visual C++ Studio 2013 is needed.
 from ..driver_tools import (InstrIOError, secure_communication,
                             instrument_property)
 from ..dll_tools import DllLibrary, DllInstrument
+from ..list_sweep_tools import ListSweepMixin
 from inspect import cleandoc
 import ctypes
 
@@ -26,28 +27,61 @@ import ctypes
 class LabBrickDll(DllLibrary):
     """ Wrapper for the Labbrick dll library (vnx_fmsynth.dll).
 
+    The vendor documentation does not state that the dll can be called
+    concurrently, so the whole library is protected by a single lock.
+
     """
+    function_prefix = 'fnLMS_'
+
+    prototypes = {
+        'GetNumDevices': (ctypes.c_int, []),
+        'GetDevInfo': (ctypes.c_int, [ctypes.POINTER(ctypes.c_uint)]),
+        'GetSerialNumber': (ctypes.c_int, [ctypes.c_uint]),
+        'InitDevice': (ctypes.c_int, [ctypes.c_uint]),
+        'CloseDevice': (ctypes.c_int, [ctypes.c_uint]),
+        'SetTestMode': (None, [ctypes.c_int]),
+        'GetDeviceStatus': (ctypes.c_int, [ctypes.c_uint]),
+        'GetFrequency': (ctypes.c_int, [ctypes.c_uint]),
+        'SetFrequency': (ctypes.c_int, [ctypes.c_uint, ctypes.c_int]),
+        'GetPowerLevel': (ctypes.c_int, [ctypes.c_uint]),
+        'SetPowerLevel': (ctypes.c_int, [ctypes.c_uint, ctypes.c_int]),
+        'GetUseInternalRef': (ctypes.c_int, [ctypes.c_uint]),
+        'SetUseInternalRef': (ctypes.c_int, [ctypes.c_uint, ctypes.c_int]),
+        'GetRF_On': (ctypes.c_int, [ctypes.c_uint]),
+        'SetRFOn': (ctypes.c_int, [ctypes.c_uint, ctypes.c_int]),
+        'GetUseInternalPulseMod': (ctypes.c_int, [ctypes.c_uint]),
+        'SetUseExternalPulseMod': (ctypes.c_int, [ctypes.c_uint,
+                                                  ctypes.c_int]),
+        'GetMaxPwr': (ctypes.c_int, [ctypes.c_uint]),
+        'GetMinPwr': (ctypes.c_int, [ctypes.c_uint]),
+        'GetMaxFreq': (ctypes.c_int, [ctypes.c_uint]),
+        'GetMinFreq': (ctypes.c_int, [ctypes.c_uint]),
+        }
+
     def __init__(self, path, **kwargs):
 
         super(LabBrickDll, self).__init__(path, **kwargs)
 
-        # dict {serial_num: ids}
-        self.devIDs = {}
-        self.initialized_devices = []
+        # The singleton is initialized only once, by the first driver.
+        with self.secure():
+            if getattr(self, 'devIDs', None) is None:
+                # dict {serial_num: ids}
+                self.devIDs = {}
+                self.initialized_devices = []
 
-# See what we have connected
-        self.connected_instruments()
+                # See what we have connected
+                self.connected_instruments()
 
     def connected_instruments(self):
         """ Return the serial number of each connected instruments.
 
         """
-        numDevices = self.dll.fnLMS_GetNumDevices()
+        numDevices = self.functions.GetNumDevices()
         devIDsArray = numDevices*ctypes.c_uint
         devIDs = devIDsArray()
-        self.dll.fnLMS_GetDevInfo(ctypes.byref(devIDs))
+        self.functions.GetDevInfo(devIDs)
         for tmpID in devIDs:
-            tmpNum = self.dll.fnLMS_GetSerialNumber(tmpID)
+            tmpNum = self.functions.GetSerialNumber(tmpID)
             self.devIDs[tmpNum] = tmpID
 
         return self.devIDs.keys()
@@ -68,7 +102,7 @@ class LabBrickDll(DllLibrary):
         """
 
         if devID in self.devIDs.values():
-            status = self.dll.fnLMS_InitDevice(devID)
+            status = self.functions.InitDevice(devID)
             if status != 0:
                 mes = 'Unable to connect to Labbrick {}.'.format(devID)
                 return InstrIOError(mes)
@@ -82,7 +116,7 @@ class LabBrickDll(DllLibrary):
         """
 # Close device if open
         if self.open(devID):
-            self.dll.fnLMS_CloseDevice(devID)
+            self.functions.CloseDevice(devID)
         else:
             raise ValueError(cleandoc('''Instrument {} is not connected'''
                                       .format(devID)))
@@ -98,71 +132,71 @@ class LabBrickDll(DllLibrary):
 
         '''
         if value in ('True', 'Yes', 1):
-            self.dll.fnLMS_SetTestMode(1)
+            self.functions.SetTestMode(1)
         elif value in ('False', 'No', 0):
-            self.dll.fnLMS_SetTestMode(0)
+            self.functions.SetTestMode(0)
         else:
             raise ValueError(cleandoc('''{} is an invalid value'''
                                       .format(value)))
 
 # Some properties of the device
     def open(self, devID):
-        statusBits = self.dll.fnLMS_GetDeviceStatus(devID)
+        statusBits = self.functions.GetDeviceStatus(devID)
         if statusBits < 2:
             return False
         else:
             return bin(statusBits)[-2] == '1'
 
     def get_frequency(self, devID):
-        return self.dll.fnLMS_GetFrequency(devID)
+        return self.functions.GetFrequency(devID)
 
     def set_frequency(self, value, devID):
-        self.dll.fnLMS_SetFrequency(devID, value)
+        self.functions.SetFrequency(devID, value)
 
     def get_power(self, devID):
-        return self.dll.fnLMS_GetPowerLevel(devID)
+        return self.functions.GetPowerLevel(devID)
 
     def set_power(self, value, devID):
-        self.dll.fnLMS_SetPowerLevel(devID, value)
+        self.functions.SetPowerLevel(devID, value)
 
     def get_freqref(self, devID):
-        return self.dll.fnLMS_GetUseInternalRef(devID)
+        return self.functions.GetUseInternalRef(devID)
 
     def set_freqref(self, value, boolean, devID):
         try:
-            self.dll.fnLMS_SetUseInternalRef(devID, boolean)
+            self.functions.SetUseInternalRef(devID, boolean)
         except KeyError:
-            self.dll.fnLMS_SetUseInternalRef(devID, value)
+            self.functions.SetUseInternalRef(devID, value)
 
     def get_output(self, devID):
-        return self.dll.fnLMS_GetRF_On(devID)
+        return self.functions.GetRF_On(devID)
 
     def set_output(self, value, devID):
-        self.dll.fnLMS_SetRFOn(devID, value)
+        self.functions.SetRFOn(devID, value)
 
     def get_extpulsemod(self, devID):
-        return self.dll.fnLMS_GetUseInternalPulseMod(devID)
+        return self.functions.GetUseInternalPulseMod(devID)
 
     def set_extpulsemod(self, value, devID):
-        self.dll.fnLMS_SetUseExternalPulseMod(devID, value)
+        self.functions.SetUseExternalPulseMod(devID, value)
 
     def get_maxpower(self, devID):
-        return self.dll.fnLMS_GetMaxPwr(devID)
+        return self.functions.GetMaxPwr(devID)
 
     def get_minpower(self, devID):
-        return self.dll.fnLMS_GetMinPwr(devID)
+        return self.functions.GetMinPwr(devID)
 
     def get_maxfreq(self, devID):
-        return self.dll.fnLMS_GetMaxFreq(devID)
+        return self.functions.GetMaxFreq(devID)
 
     def get_minfreq(self, devID):
-        return self.dll.fnLMS_GetMinFreq(devID)
+        return self.functions.GetMinFreq(devID)
 
     def plllocked(self, devID):
-        return self.dll.fnLMS_GetDeviceStatus(devID)
+        return self.functions.GetDeviceStatus(devID)
 
 
-class LabBrickLMS103(DllInstrument):
+class LabBrickLMS103(ListSweepMixin, DllInstrument):
 
     library = 'vnx_fmsynth.dll'
 
@@ -218,7 +252,7 @@ class LabBrickLMS103(DllInstrument):
     @instrument_property
     @secure_communication()
     def max_power(self):
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 maxpower = self._dll.get_maxpower(self.devID)/4
                 if maxpower is not None:
@@ -231,7 +265,7 @@ class LabBrickLMS103(DllInstrument):
     @instrument_property
     @secure_communication()
     def min_power(self):
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 minpower = self._dll.get_minpower(self.devID)/4
                 if minpower is not None:
@@ -244,7 +278,7 @@ class LabBrickLMS103(DllInstrument):
     @instrument_property
     @secure_communication()
     def max_freq(self):
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 maxfreq = self._dll.get_maxfreq(self.devID)/1e8
                 if maxfreq is not None:
@@ -257,7 +291,7 @@ class LabBrickLMS103(DllInstrument):
     @instrument_property
     @secure_communication()
     def min_freq(self):
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 minfreq = self._dll.get_minfreq(self.devID)/1e8
                 if minfreq is not None:
@@ -273,7 +307,7 @@ class LabBrickLMS103(DllInstrument):
         ''' frequency getter method.
 
         '''
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 freq = self._dll.get_frequency(self.devID)/1e8
                 if freq is not None:
@@ -291,7 +325,7 @@ class LabBrickLMS103(DllInstrument):
         Input : float, No string
 
         """
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 if (value <= self.maxFreq) and (value >= self.minFreq):
                     self._dll.set_frequency(int(value*1e8), self.devID)
@@ -313,7 +347,7 @@ class LabBrickLMS103(DllInstrument):
         ''' power getter method.
 
         '''
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 power = self.maxPower - self._dll.get_power(self.devID)*0.25
                 if power is not None:
@@ -330,7 +364,7 @@ class LabBrickLMS103(DllInstrument):
         Input : number, No string
 
         '''
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 if (value <= self.maxPower) and (value >= self.minPower):
                     self._dll.set_power(int(value*4), self.devID)
@@ -354,7 +388,7 @@ class LabBrickLMS103(DllInstrument):
         Output = {'0' = external mode, '1e-8' = internal mode}
 
         '''
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 freqref = self._dll.get_freqref(self.devID)/1e8
                 if freqref is not None:
@@ -372,7 +406,7 @@ class LabBrickLMS103(DllInstrument):
         Output = None
 
         '''
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             str2boolMap = {'int': True, 'internal': True, 'ext': False,
                            'external': False}
             if self.devID is not None:
@@ -389,7 +423,7 @@ class LabBrickLMS103(DllInstrument):
         Output = {'1' = on, '0' = off}
 
         '''
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 output = self._dll.get_output(self.devID)
                 if output is not None:
@@ -407,7 +441,7 @@ class LabBrickLMS103(DllInstrument):
         Output = None
 
         '''
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 self._dll.set_output(value, self.devID)
                 result = self._dll.get_output(self.devID)
@@ -425,7 +459,7 @@ class LabBrickLMS103(DllInstrument):
         Output = {True, False}
 
         '''
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 return self._dll.get_extpulsemod(self.devID) == 0
             else:
@@ -439,7 +473,7 @@ class LabBrickLMS103(DllInstrument):
         Output = None
 
         '''
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 self._dll.set_extpulsemod(value, self.devID)
             else:
@@ -448,7 +482,7 @@ class LabBrickLMS103(DllInstrument):
     @instrument_property
     @secure_communication()
     def plllocked(self):
-        with self._dll.secure():
+        with self._dll.secure(self.devID):
             if self.devID is not None:
                 statusBits = self._dll.plllocked(self.devID)
                 if statusBits < 64:
@@ -13,11 +13,22 @@ import os
 import time
 import atexit
 import ctypes
+import hashlib
 import numpy as np
 
 from pyclibrary import CLibrary
 
-from ..dll_tools import DllInstrument
+from ..dll_tools import DllInstrument, DllFunctions
+
+
+#: Libraries already loaded, by (library path, header path), so that the
+#: header is parsed at most once per process.
+_LIBRARIES = {}
+
+#: Functions called while acquiring. Their underlying ctypes function is
+#: bound once to skip the dynamic lookup and the wrapping of the result.
+_HOT_FUNCTIONS = ('ArmTrigger', 'DisarmTrigger', 'GetAcquiredRecords',
+                  'GetData')
 
 
 class ADQControlUnit(object):
@@ -190,7 +201,8 @@ class SPADQ14(DllInstrument):
         samples_per_record = int(round(samples_per_sec*duration))
 
         mask = (0x01 if channels[0] else 0) + (0x02 if channels[1] else 0)
-        assert self._dll.MultiRecordSetChannelMask(self._cu_id, self._id, mask)
+        assert self._dll.MultiRecordSetChannelMask(self._cu_id, self._id,
+                                                   mask)()
         assert self._dll.MultiRecordSetup(self._cu_id, self._id,
                                           records_per_capture,
                                           samples_per_record)()
@@ -213,13 +225,14 @@ class SPADQ14(DllInstrument):
         id_ = self._id
         bytes_per_sample = self._dll.GetNofBytesPerSample(cu, id_)[2]
 
-        assert self._dll.DisarmTrigger(self._cu_id, self._id)()
-        while not self._dll.ArmTrigger(self._cu_id, self._id)():
+        fn = self._fn
+        assert fn.DisarmTrigger(cu, id_)
+        while not fn.ArmTrigger(cu, id_):
             time.sleep(0.0001)
 
         # Wait for all records to be acquired.
-        acq_records = self._dll.GetAcquiredRecords.func
-        get_data = self._dll.GetData.func
+        acq_records = fn.GetAcquiredRecords
+        get_data = fn.GetData
         retrieved_records = 0
         while retrieved_records < records_per_capture:
             # Wait for a record to be acquired.
@@ -284,13 +297,39 @@ class SPADQ14(DllInstrument):
     def _setup_library(self):
         """Load and initialize the dll.
 
+        The library is loaded only once per process. The parsed header is
+        cached on disk (pyclibrary checks that the header did not change
+        before using the cache).
+
         """
-        cache_path = str(os.path.join(os.path.dirname(__file__),
-                                      'adq14.pycctypes.libc'))
         library_dir = os.path.join(self._infos.get('lib_dir', ''),
                                    'ADQAPI.dll')
         header_dir = os.path.join(self._infos.get('header_dir', ''),
                                   'ADQAPI.h')
 
-        self._dll = CLibrary(library_dir, [header_dir], cache=cache_path,
-                             prefix=['ADQ',  'ADQ_'], convention='cdll')
+        key = (os.path.abspath(library_dir), os.path.abspath(header_dir))
+        if key not in _LIBRARIES:
+            lib = CLibrary(library_dir, [header_dir],
+                           cache=_header_cache_path(key[1]),
+                           prefix=['ADQ',  'ADQ_'], convention='cdll')
+            fn = DllFunctions()
+            for name in _HOT_FUNCTIONS:
+                setattr(fn, name, getattr(lib, name).func)
+            _LIBRARIES[key] = (lib, fn)
+
+        self._dll, self._fn = _LIBRARIES[key]
+
+
+def _header_cache_path(header):
+    """Path of the file in which to cache the parsed header.
+
+    The cache lives in the user directory (the package directory may not be
+    writable) and its name depends on the header so that several versions of
+    the API do not overwrite each other.
+
+    """
+    cache_dir = os.path.join(os.path.expanduser('~'), '.labeq_exopy')
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    digest = hashlib.md5(header.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, 'adq14_{}.pycctypes.libc'.format(digest))
@@ -17,6 +17,10 @@ from threading import Lock
 from .driver_tools import BaseInstrument, InstrIOError
 
 
+#: Lock serializing the loading of the libraries.
+_LOADING_LOCK = Lock()
+
+
 class DllInstrument(BaseInstrument):
     """ A base class for all instrumensts directly calling a dll.
 
@@ -31,6 +35,10 @@ class DllInstrument(BaseInstrument):
 
     library = ''
 
+    #: Dll calls are not funnelled through common methods so the instrument
+    #: properties accesses are timed instead when profiling.
+    profile_properties = True
+
 
 class DllLibrary(object):
     """ Singleton class used to call a dll.
@@ -39,6 +47,11 @@ class DllLibrary(object):
     driver never need to access the _instance attribute. All manipulation of
     the dll should be done inside the secure context for thread safety.
 
+    By default a single lock protects the whole library. If the vendor dll
+    can be called concurrently for different devices, subclasses should set
+    `per_device_locking` to True, in which case calls made in the context
+    `secure(device)` only exclude other calls for the same device.
+
     Parameters
     ----------
     path : str
@@ -51,41 +64,166 @@ class DllLibrary(object):
     timeout : float, optional
         Timeout to use when attempting to acquire the library lock.
 
+    Attributes
+    ----------
+    functions : DllFunctions
+        Functions listed in `prototypes`, with their signature declared, as
+        attributes (named without the `function_prefix`).
+
     """
+    #: Signatures of the dll functions used by the wrapper, as a dict
+    #: {name: (restype, argtypes)}. They are declared once when the library is
+    #: loaded so that no conversion needs to be guessed at each call.
+    prototypes = {}
+
+    #: Prefix common to the name of the functions listed in `prototypes`.
+    function_prefix = ''
+
+    #: Whether calls for different devices can be made concurrently.
+    per_device_locking = False
 
     _instance = None
 
     def __new__(cls, *args, **kwargs):
-        if cls._instance is not None:
-            return cls._instance
-        else:
-            return super(DllLibrary, cls).__new__(cls, *args, **kwargs)
+        # Look only at the class itself so that each library has its own
+        # instance.
+        instance = cls.__dict__.get('_instance')
+        if instance is None:
+            instance = super(DllLibrary, cls).__new__(cls)
+            cls._instance = instance
+        return instance
 
     def __init__(self, path, **kwargs):
 
-        if kwargs.get('type') == 'windll':
-            self.dll = ctypes.windll.LoadLibrary(path)
-        elif kwargs.get('type') == 'oledll':
-            self.dll = ctypes.windll.LoadLibrary(path)
-        else:
-            self.dll = ctypes.cdll.LoadLibrary(path)
+        with _LOADING_LOCK:
+            if getattr(self, 'dll', None) is None:
+                if kwargs.get('type') == 'windll':
+                    self.dll = ctypes.windll.LoadLibrary(path)
+                elif kwargs.get('type') == 'oledll':
+                    self.dll = ctypes.windll.LoadLibrary(path)
+                else:
+                    self.dll = ctypes.cdll.LoadLibrary(path)
+
+                self.functions = bind_functions(self.dll, self.prototypes,
+                                                self.function_prefix)
+                self.lock = Lock()
+                self._device_locks = {}
+                self._lock_stats = {None: _new_lock_stats()}
+                self._locks_guard = Lock()
 
         self.timeout = kwargs.get('timeout', 5.0)
 
-        self.lock = Lock()
-
     @contextmanager
-    def secure(self):
+    def secure(self, device=None):
         """ Lock acquire and release method.
 
+        Parameters
+        ----------
+        device : hashable, optional
+            Identifier of the device the calls are made for. Only used if
+            `per_device_locking` is True.
+
         """
-        t = 0
-        while not self.lock.acquire():
-            time.sleep(0.1)
-            t += 0.1
-            if t > self.timeout:
+        if device is None or not self.per_device_locking:
+            device = None
+            lock = self.lock
+        else:
+            lock = self._device_lock(device)
+
+        stats = self._lock_stats[device]
+        if lock.acquire(False):
+            wait = 0.0
+        else:
+            start = time.perf_counter()
+            acquired = lock.acquire(timeout=self.timeout)
+            wait = time.perf_counter() - start
+            with self._locks_guard:
+                stats['contentions'] += 1
+                stats['wait'] += wait
+                stats['max_wait'] = max(stats['max_wait'], wait)
+                if not acquired:
+                    stats['timeouts'] += 1
+            if not acquired:
                 raise InstrIOError('Timeout in trying to acquire dll lock.')
+
+        stats['acquisitions'] += 1
         try:
             yield
         finally:
-            self.lock.release()
+            lock.release()
+
+    def lock_statistics(self):
+        """ Report the contention observed on the library locks.
+
+        Returns
+        -------
+        stats : dict
+            Statistics per device (None being the library wide lock): number
+            of acquisitions, of contended acquisitions, of timeouts, total and
+            maximal time spent waiting (in s).
+
+        """
+        with self._locks_guard:
+            return {k: dict(v) for k, v in self._lock_stats.items()
+                    if v['acquisitions'] or v['timeouts']}
+
+    def _device_lock(self, device):
+        """ Access the lock of a device, creating it if necessary.
+
+        """
+        try:
+            return self._device_locks[device]
+        except KeyError:
+            with self._locks_guard:
+                if device not in self._device_locks:
+                    self._lock_stats[device] = _new_lock_stats()
+                    self._device_locks[device] = Lock()
+                return self._device_locks[device]
+
+
+def _new_lock_stats():
+    """ Create the counters used to monitor the contention on a lock.
+
+    """
+    return {'acquisitions': 0, 'contentions': 0, 'timeouts': 0, 'wait': 0.0,
+            'max_wait': 0.0}
+
+
+class DllFunctions(object):
+    """ Namespace holding dll functions whose signature has been declared.
+
+    """
+    pass
+
+
+def bind_functions(dll, prototypes, prefix=''):
+    """ Declare the signature of dll functions and collect them.
+
+    The functions are looked up only once so that calling them later does not
+    involve any dynamic resolution.
+
+    Parameters
+    ----------
+    dll : ctypes.CDLL
+        Loaded library.
+    prototypes : dict
+        Mapping between function names (without prefix) and tuples
+        (restype, argtypes) or (restype, argtypes, errcheck).
+    prefix : str, optional
+        Prefix to add to the names to get the exported symbols.
+
+    Returns
+    -------
+    functions : DllFunctions
+        Namespace whose attributes are the declared functions.
+
+    """
+    functions = DllFunctions()
+    for name, prototype in prototypes.items():
+        func = getattr(dll, prefix + name)
+        func.restype = prototype[0]
+        func.argtypes = prototype[1]
+        if len(prototype) > 2:
+            func.errcheck = prototype[2]
+        setattr(functions, name, func)
+    return functions
@@ -37,6 +37,8 @@ from inspect import cleandoc
 from textwrap import fill
 from functools import wraps
 
+from .profiling_tools import profiler
+
 
 class InstrError(Exception):
     """Generic error raised when an instrument does not behave as expected
@@ -76,14 +78,18 @@ class instrument_property(property):
             name = self.name
             if name in obj._caching_permissions:
                 try:
-                    return obj._cache[name]
+                    aux = obj._cache[name]
+                    if profiler.enabled:
+                        profiler.record_cache(obj, name, True)
+                    return aux
                 except KeyError:
-                    aux = super(instrument_property, self).__get__(obj,
-                                                                   objtype)
+                    if profiler.enabled:
+                        profiler.record_cache(obj, name, False)
+                    aux = self._profiled_get(obj, objtype)
                     obj._cache[name] = aux
                     return aux
             else:
-                return super(instrument_property, self).__get__(obj, objtype)
+                return self._profiled_get(obj, objtype)
 
         else:
             return self
@@ -95,11 +101,36 @@ class instrument_property(property):
         if name in obj._caching_permissions:
             try:
                 if obj._cache[name] == value:
+                    if profiler.enabled:
+                        profiler.record_cache(obj, name, True)
                     return
             except KeyError:
                 pass
-            super(instrument_property, self).__set__(obj, value)
+            if profiler.enabled:
+                profiler.record_cache(obj, name, False)
+            obj.forget_state(name)
+            self._profiled_set(obj, value)
             obj._cache[name] = value
+        else:
+            obj.forget_state(name)
+            self._profiled_set(obj, value)
+
+    def _profiled_get(self, obj, objtype):
+        """Call the getter, timing it if the driver profiles its properties.
+
+        """
+        if profiler.enabled and obj.profile_properties:
+            with profiler.timer(obj, 'get ' + self.name):
+                return super(instrument_property, self).__get__(obj, objtype)
+        return super(instrument_property, self).__get__(obj, objtype)
+
+    def _profiled_set(self, obj, value):
+        """Call the setter, timing it if the driver profiles its properties.
+
+        """
+        if profiler.enabled and obj.profile_properties:
+            with profiler.timer(obj, 'set ' + self.name):
+                super(instrument_property, self).__set__(obj, value)
         else:
             super(instrument_property, self).__set__(obj, value)
 
@@ -130,6 +161,8 @@ def secure_communication(max_iter=2):
                     if i == max_iter:
                         raise
                     else:
+                        if profiler.enabled:
+                            profiler.record_retry(self, method.__name__)
                         log = logging.getLogger(__name__)
                         msg = ('Iterating connection %s/%s '
                                'for instrument %s')
@@ -244,6 +277,10 @@ class BaseInstrument(object):
         Identifier of the last owner of the driver. Used to know whether or not
         previous settings might heve been modified by other parts of the
         program.
+    profile_properties : bool
+        Whether the accesses to the instrument properties should be timed when
+        profiling is enabled. Drivers whose communication methods are already
+        timed (such as VISA drivers) should leave it to False.
 
     Methods
     -------
@@ -258,11 +295,32 @@ class BaseInstrument(object):
         Check whether or not the cache is likely to have been corrupted
     clear_cache(properties = None)
         Clear the cache of some or all instrument properties
+    apply_state(key, value, setter)
+        Call setter only if value differs from the last one applied for key.
+    record_state(key, value)
+        Record that a setting is known to have been applied.
+    forget_state(*keys)
+        Forget the last applied value of some or all settings.
+
+    Shadow state
+    ------------
+    On top of the instrument properties cache, drivers can keep track of the
+    last value applied for any setting (identified by a free form key such as
+    a SCPI header) to avoid re-sending settings which would not change the
+    instrument configuration. The shadow state is cleared with the cache and
+    when the connection is reopened. Setting an instrument property forgets
+    the value recorded under its name, so that a setting applied with
+    `apply_state` under the name of a property cannot get out of sync with
+    direct accesses to the property. `shadow_state_couplings` maps a key to
+    the keys whose known value is lost when it is applied (for example
+    settings that the instrument resets as a side effect).
 
     """
     caching_permissions = {}
     secure_com_except = (InstrIOError)
     owner = ''
+    profile_properties = False
+    shadow_state_couplings = {}
 
     def __init__(self, connection_info, caching_allowed=True,
                  caching_permissions={}, auto_open=True):
@@ -276,6 +334,7 @@ class BaseInstrument(object):
         else:
             self._caching_permissions = set([])
         self._cache = {}
+        self._shadow_state = {}
 
     def open_connection(self):
         """Open a connection to an instrument
@@ -344,8 +403,10 @@ class BaseInstrument(object):
             for name, instr_prop in inspect.getmembers(self.__class__, test):
                 if name in properties and name in cache:
                     del cache[name]
+            self.forget_state(*properties)
         else:
             self._cache = {}
+            self.forget_state()
 
     def check_cache(self, properties=None):
         """Return the value of the cache of the instruments
@@ -373,3 +434,48 @@ class BaseInstrument(object):
             cache = self._cache.copy()
 
         return cache
+
+    def apply_state(self, key, value, setter):
+        """Apply a setting unless it is known to already have this value.
+
+        Parameters
+        ----------
+        key : str
+            Identifier of the setting.
+        value :
+            Value the setting should have.
+        setter : Callable
+            Callable taking the value as single argument and sending it to the
+            instrument.
+
+        Returns
+        -------
+        sent : bool
+            Whether the setter was called.
+
+        """
+        state = self._shadow_state
+        if key in state and state[key] == value:
+            return False
+        setter(value)
+        self.record_state(key, value)
+        return True
+
+    def record_state(self, key, value):
+        """Record the value of a setting applied outside of `apply_state`.
+
+        """
+        state = self._shadow_state
+        for coupled in self.shadow_state_couplings.get(key, ()):
+            state.pop(coupled, None)
+        state[key] = value
+
+    def forget_state(self, *keys):
+        """Forget the value of the specified settings or of all of them.
+
+        """
+        if keys:
+            for key in keys:
+                self._shadow_state.pop(key, None)
+        else:
+            self._shadow_state = {}
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Uniform frequency/power list sweep interface for RF sources.
+
+A list of frequencies and/or powers is loaded once using `load_list_sweep`
+and each call to `next_list_point` moves the source to the next point. Sources
+supporting a list mode receive the whole list at once and are stepped by a
+single trigger per point, others are emulated by setting the frequency and
+power of each point.
+
+:Contains:
+    ListSweepMixin :
+        Mixin adding the list sweep interface to a driver.
+
+"""
+from .driver_tools import InstrIOError
+
+
+#: Factors used to convert frequencies to Hz.
+TO_HZ = {'GHz': 1e9, 'MHz': 1e6, 'kHz': 1e3, 'KHz': 1e3, 'Hz': 1.0}
+
+
+class _ListSweep(object):
+    """State of the list sweep loaded on a source.
+
+    """
+    __slots__ = ('frequencies', 'powers', 'trigger', 'hardware', 'index')
+
+    def __init__(self, frequencies, powers, trigger):
+        self.frequencies = frequencies
+        self.powers = powers
+        self.trigger = trigger
+        self.hardware = False
+        self.index = -1
+
+    def __len__(self):
+        return len(self.frequencies if self.frequencies is not None
+                   else self.powers)
+
+
+class ListSweepMixin(object):
+    """Mixin adding the list sweep interface to a RF source driver.
+
+    The default implementation emulates the list by setting the `frequency`
+    and `power` instrument properties at each point. Drivers of sources
+    supporting a list mode should override `_upload_list_sweep`,
+    `_trigger_list_point` and `_stop_hardware_list_sweep`.
+
+    Frequencies are expressed in the `frequency_unit` of the driver.
+
+    """
+    #: Trigger modes supported by the list mode of the source, other modes
+    #: are emulated.
+    list_sweep_triggers = ()
+
+    _list_sweep = None
+
+    @property
+    def list_sweep_active(self):
+        """Whether a list sweep is currently loaded.
+
+        """
+        return self._list_sweep is not None
+
+    def load_list_sweep(self, frequencies=None, powers=None, trigger='bus'):
+        """Load a list of frequencies and/or powers.
+
+        The source is left before the first point, the first call to
+        `next_list_point` moves to the first point.
+
+        Parameters
+        ----------
+        frequencies : iterable(float), optional
+            Frequencies of the points, in `frequency_unit`.
+        powers : iterable(float), optional
+            Powers of the points in dBm. If both lists are given they must
+            have the same length.
+        trigger : {'bus', 'external'}, optional
+            Source of the trigger moving to the next point. In external mode
+            `next_list_point` does not trigger the source but only tracks
+            the current point.
+
+        Returns
+        -------
+        points : int
+            Number of points in the list.
+
+        """
+        if frequencies is not None:
+            frequencies = [float(f) for f in frequencies]
+        if powers is not None:
+            powers = [float(p) for p in powers]
+        if frequencies is None and powers is None:
+            raise ValueError('A list of frequencies or powers is required.')
+        if (frequencies is not None and powers is not None and
+                len(frequencies) != len(powers)):
+            raise ValueError('The frequency and power lists must have the '
+                             'same length.')
+
+        if self._list_sweep is not None:
+            self.stop_list_sweep()
+
+        sweep = _ListSweep(frequencies, powers, trigger)
+        if not len(sweep):
+            raise ValueError('Cannot load an empty list.')
+        if trigger in self.list_sweep_triggers:
+            self._upload_list_sweep(frequencies, powers, trigger)
+            sweep.hardware = True
+            self.clear_cache(['frequency', 'power'])
+        elif trigger != 'bus':
+            msg = '{} does not support {} triggered list sweeps.'
+            raise InstrIOError(msg.format(type(self).__name__, trigger))
+
+        self._list_sweep = sweep
+        return len(sweep)
+
+    def next_list_point(self):
+        """Move the source to the next point of the list.
+
+        Returns
+        -------
+        index : int
+            Index of the new point.
+        frequency : float or None
+            Frequency of the point (None if only powers are swept).
+        power : float or None
+            Power of the point (None if only frequencies are swept).
+
+        """
+        sweep = self._list_sweep
+        if sweep is None:
+            raise InstrIOError('No list sweep is loaded.')
+        index = sweep.index + 1
+        if index >= len(sweep):
+            raise InstrIOError('The list sweep is over ({} points).'
+                               .format(len(sweep)))
+
+        frequency = (sweep.frequencies[index] if sweep.frequencies is not None
+                     else None)
+        power = sweep.powers[index] if sweep.powers is not None else None
+        if sweep.hardware:
+            if sweep.trigger == 'bus':
+                self._trigger_list_point()
+            self.forget_state('frequency', 'power')
+        else:
+            if frequency is not None:
+                self.frequency = frequency
+            if power is not None:
+                self.power = power
+
+        sweep.index = index
+        return index, frequency, power
+
+    def stop_list_sweep(self):
+        """Leave the list mode and go back to fixed frequency and power.
+
+        """
+        sweep = self._list_sweep
+        self._list_sweep = None
+        if sweep is not None and sweep.hardware:
+            self._stop_hardware_list_sweep()
+            self.clear_cache(['frequency', 'power'])
+
+    def _upload_list_sweep(self, frequencies, powers, trigger):
+        """Send the list to the source and arm it.
+
+        """
+        raise NotImplementedError()
+
+    def _trigger_list_point(self):
+        """Trigger the source to move to the next point.
+
+        """
+        self.write('*TRG')
+
+    def _stop_hardware_list_sweep(self):
+        """Switch the source back to fixed frequency and power.
+
+        """
+        raise NotImplementedError()
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""
+This module defines tools to profile the communications of the drivers.
+
+Profiling is disabled by default. When disabled the only cost paid by a
+driver call is the check of the `enabled` flag of the process wide
+`profiler`. It can be switched on and off at any time::
+
+    from labeq_exopy.instruments.drivers.profiling_tools import profiler
+    profiler.enable('C:/data/instr_profile.jsonl')
+
+The statistics of a driver are dumped (and reset) when the driver is stopped
+by its starter, that is at the end of a measurement. If no path was
+specified, the statistics are written to the Exopy log.
+
+:Contains:
+    CommandStats :
+        Latency histogram and counters collected for a single command.
+    InstrProfiler :
+        Collector of the statistics of all drivers.
+    profiler :
+        Process wide `InstrProfiler` instance used by the drivers.
+    profiled :
+        Decorator timing a communication method of a driver.
+
+"""
+import json
+import logging
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+
+#: Upper edges (in s) of the latency histogram bins (4 bins per decade from
+#: 10 µs to 100 s). The last bin collects everything above 100 s.
+HISTOGRAM_EDGES = tuple(1e-5*10**(i/4) for i in range(29))
+
+_HISTOGRAM_LABELS = tuple('{:.3g}'.format(e) for e in HISTOGRAM_EDGES) +\
+    ('inf',)
+
+
+class CommandStats(object):
+    """Statistics collected for one command of one instrument.
+
+    """
+    __slots__ = ('count', 'total', 'min', 'max', 'histogram', 'sent',
+                 'received', 'retries', 'errors')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.histogram = [0]*(len(HISTOGRAM_EDGES) + 1)
+        self.sent = 0
+        self.received = 0
+        self.retries = 0
+        self.errors = 0
+
+    def add(self, duration, sent, received):
+        """Record a call of the command.
+
+        """
+        self.count += 1
+        self.total += duration
+        if duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        self.histogram[bisect_right(HISTOGRAM_EDGES, duration)] += 1
+        self.sent += sent
+        self.received += received
+
+    def as_dict(self):
+        """Summarize the statistics in a json serializable dict.
+
+        """
+        count = self.count
+        return {'count': count,
+                'total': self.total,
+                'mean': self.total/count if count else 0.0,
+                'min': self.min if count else 0.0,
+                'max': self.max,
+                'histogram': {l: c for l, c in
+                              zip(_HISTOGRAM_LABELS, self.histogram) if c},
+                'bytes_sent': self.sent,
+                'bytes_received': self.received,
+                'retries': self.retries,
+                'errors': self.errors}
+
+
+class _InstrRecord(object):
+    """Statistics collected for one instrument.
+
+    """
+    __slots__ = ('label', 'commands', 'cache')
+
+    def __init__(self, label):
+        self.label = label
+        self.commands = {}
+        self.cache = {}
+
+    def command(self, name):
+        try:
+            return self.commands[name]
+        except KeyError:
+            stats = self.commands[name] = CommandStats()
+            return stats
+
+
+class InstrProfiler(object):
+    """Collect per-command latency, payload sizes, retries and cache usage.
+
+    Drivers are weakly referenced so that profiling never keeps a driver
+    alive.
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether or not statistics are currently collected.
+    path : str
+        Path of the file to which statistics are appended as json lines when
+        dumped. If empty the statistics are written to the log.
+
+    """
+    def __init__(self):
+        self.enabled = False
+        self.path = ''
+        self._records = WeakKeyDictionary()
+        self._lock = Lock()
+
+    def enable(self, path=''):
+        """Start collecting statistics.
+
+        Parameters
+        ----------
+        path : str, optional
+            File to which the statistics should be dumped. The log is used if
+            not specified.
+
+        """
+        self.path = path
+        self.enabled = True
+
+    def disable(self):
+        """Stop collecting statistics (already collected ones are kept).
+
+        """
+        self.enabled = False
+
+    def reset(self, instr=None):
+        """Discard the statistics of one or all instruments.
+
+        """
+        with self._lock:
+            if instr is None:
+                self._records = WeakKeyDictionary()
+            else:
+                self._records.pop(instr, None)
+
+    def record(self, instr, command, duration, sent=0, received=0):
+        """Record a call to the instrument.
+
+        Parameters
+        ----------
+        instr : BaseInstrument
+            Driver which issued the call.
+        command : str
+            Identifier of the command (SCPI header or function name).
+        duration : float
+            Time spent in the call in seconds.
+        sent, received : int, optional
+            Number of bytes sent to and received from the instrument.
+
+        """
+        with self._lock:
+            self._get_record(instr).command(command).add(duration, sent,
+                                                         received)
+
+    def record_error(self, instr, command):
+        """Record a call which raised an exception.
+
+        """
+        with self._lock:
+            self._get_record(instr).command(command).errors += 1
+
+    def record_retry(self, instr, command):
+        """Record a new attempt made by `secure_communication`.
+
+        """
+        with self._lock:
+            self._get_record(instr).command(command).retries += 1
+
+    def record_cache(self, instr, name, hit):
+        """Record an access to the cache of an instrument property.
+
+        """
+        with self._lock:
+            counts = self._get_record(instr).cache.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    @contextmanager
+    def timer(self, instr, command, sent=0, received=0):
+        """Time the body of the with statement as a call to the instrument.
+
+        Does nothing when the profiler is disabled.
+
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record_error(instr, command)
+            raise
+        self.record(instr, command, time.perf_counter() - start, sent,
+                    received)
+
+    def report(self, instr=None):
+        """Summarize the collected statistics.
+
+        Parameters
+        ----------
+        instr : BaseInstrument, optional
+            Instrument whose statistics should be reported. All instruments
+            are reported if omitted.
+
+        Returns
+        -------
+        report : list(dict)
+            One json serializable dict per instrument.
+
+        """
+        with self._lock:
+            if instr is not None:
+                records = [self._records[instr]] if instr in self._records\
+                    else []
+            else:
+                records = list(self._records.values())
+
+            return [{'instrument': r.label,
+                     'commands': {k: v.as_dict()
+                                  for k, v in r.commands.items()},
+                     'cache': {k: {'hits': v[0], 'misses': v[1]}
+                               for k, v in r.cache.items()}}
+                    for r in records]
+
+    def dump(self, instr=None, reset=True):
+        """Write the collected statistics to the file or the log.
+
+        Parameters
+        ----------
+        instr : BaseInstrument, optional
+            Instrument whose statistics should be dumped. All instruments are
+            dumped if omitted.
+        reset : bool, optional
+            Whether to discard the dumped statistics.
+
+        """
+        report = self.report(instr)
+        if reset:
+            self.reset(instr)
+        if not report:
+            return
+
+        stamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+        lines = [json.dumps(dict(r, timestamp=stamp)) for r in report]
+        if self.path:
+            with open(self.path, 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+        else:
+            log = logging.getLogger(__name__)
+            for line in lines:
+                log.info('Instrument profile: %s', line)
+
+    def _get_record(self, instr):
+        """Access the record of an instrument, creating it if necessary.
+
+        """
+        try:
+            return self._records[instr]
+        except KeyError:
+            ident = (getattr(instr, 'connection_str', None) or
+                     getattr(instr, 'serial', None))
+            label = type(instr).__name__
+            if ident:
+                label += '({})'.format(ident)
+            record = self._records[instr] = _InstrRecord(label)
+            return record
+
+
+#: Profiler used by all drivers.
+profiler = InstrProfiler()
+
+
+def _payload_size(obj):
+    """Best effort estimation of the number of bytes carried by a value.
+
+    """
+    if isinstance(obj, (str, bytes, bytearray)):
+        return len(obj)
+    return getattr(obj, 'nbytes', 0)
+
+
+def profiled(method):
+    """Decorator timing a communication method of a driver.
+
+    The first positional argument, if it is a message, is used to identify the
+    command (only its header is kept so that 'VOLT 1' and 'VOLT 2' are
+    gathered). Otherwise the method name is used.
+
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+
+        if not profiler.enabled:
+            return method(self, *args, **kwargs)
+
+        message = args[0] if args else None
+        if isinstance(message, (str, bytes)) and message.strip():
+            command = message.split(None, 1)[0]
+            if isinstance(command, bytes):
+                command = command.decode('ascii', 'replace')
+            sent = len(message)
+        else:
+            command = name
+            sent = 0
+
+        start = time.perf_counter()
+        try:
+            res = method(self, *args, **kwargs)
+        except Exception:
+            profiler.record_error(self, command)
+            raise
+        profiler.record(self, command, time.perf_counter() - start, sent,
+                        _payload_size(res))
+        return res
+
+    wrapper.__wrapped__ = method
+    return wrapper
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Tools to handle the waveforms transferred from oscilloscopes.
+
+Waveforms are transferred as raw integer samples along with the factors
+needed to convert them to volts. The statistics usually obtained through one
+measurement query each are computed on the computer from a single transfer.
+
+:Contains:
+    Waveform :
+        Raw samples of a channel and their scaling.
+    waveform_statistics :
+        Compute the usual statistics of a waveform.
+
+"""
+import numpy as np
+
+
+#: Statistics computed by `waveform_statistics`.
+STATISTICS = ('mean', 'rms', 'min', 'max', 'amplitude', 'frequency',
+              'period')
+
+
+class Waveform(object):
+    """Raw samples of a channel and their scaling.
+
+    Attributes
+    ----------
+    raw : np.ndarray
+        Raw integer samples.
+    gain : float
+        Volts per raw unit.
+    offset : float
+        Voltages are gain * raw + offset.
+    x_origin : float
+        Time of the first sample relative to the trigger.
+    x_increment : float
+        Time between two samples.
+
+    """
+    __slots__ = ('raw', 'gain', 'offset', 'x_origin', 'x_increment')
+
+    def __init__(self, raw, gain, offset, x_origin, x_increment):
+        self.raw = raw
+        self.gain = gain
+        self.offset = offset
+        self.x_origin = x_origin
+        self.x_increment = x_increment
+
+    def volts(self, dtype=np.float64):
+        """Voltages of the samples.
+
+        """
+        out = self.raw.astype(dtype)
+        out *= self.gain
+        out += self.offset
+        return out
+
+    @property
+    def time(self):
+        """Time of the samples relative to the trigger.
+
+        """
+        return self.x_origin + self.x_increment*np.arange(len(self.raw))
+
+
+def waveform_statistics(waveform, hysteresis=0.1):
+    """Compute the usual statistics of a waveform.
+
+    The frequency is estimated from the rising crossings of the mean value,
+    interpolated between samples, and is NaN if less than two crossings are
+    found. A crossing is only counted once the signal went below the
+    hysteresis band centred on the mean and then above it, so that the noise
+    around the mean does not produce spurious crossings.
+
+    Parameters
+    ----------
+    waveform : Waveform
+        Waveform to analyse.
+    hysteresis : float, optional
+        Width of the hysteresis band as a fraction of the peak to peak
+        amplitude.
+
+    Returns
+    -------
+    statistics : dict
+        Values of the statistics listed in `STATISTICS`.
+
+    """
+    volts = waveform.volts()
+    mean = volts.mean()
+    vmin = volts.min()
+    vmax = volts.max()
+
+    volts -= mean
+    rms = np.sqrt(np.dot(volts, volts)/len(volts) + mean**2)
+
+    # Samples outside of the band, -1 below and 1 above.
+    half_band = hysteresis*(vmax - vmin)/2
+    outside = np.flatnonzero((volts < -half_band) | (volts > half_band))
+    side = np.sign(volts[outside])
+    # First sample above the band following samples below it.
+    armed = np.flatnonzero((side[:-1] < 0) & (side[1:] > 0))
+    above = outside[armed + 1]
+    # Last sample below the mean before each of them.
+    last_below = np.maximum.accumulate(np.where(volts < 0,
+                                                np.arange(len(volts)), -1))
+    rising = last_below[above]
+    if len(rising) > 1:
+        before = volts[rising]
+        crossings = rising + before/(before - volts[rising + 1])
+        period = (waveform.x_increment*(crossings[-1] - crossings[0]) /
+                  (len(crossings) - 1))
+        frequency = 1/period
+    else:
+        period = frequency = float('nan')
+
+    return {'mean': mean, 'rms': rms, 'min': vmin, 'max': vmax,
+            'amplitude': vmax - vmin, 'frequency': frequency,
+            'period': period}
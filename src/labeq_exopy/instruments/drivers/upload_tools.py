@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Concurrent upload of waveforms and sequences to several AWGs.
+
+Each driver communicates through its own VISA session, so the uploads to
+different instruments can run in parallel on separate threads. The operations
+queued for one instrument are executed in order on a single thread while
+holding the lock of the driver.
+
+:Contains:
+    UploadScheduler :
+        Queue the uploads for several AWGs and run them concurrently.
+    UploadReport :
+        Summary of the uploads performed by a scheduler.
+
+"""
+import time
+import logging
+from threading import Thread, Event
+from collections import OrderedDict
+
+from .driver_tools import InstrIOError
+
+
+logger = logging.getLogger(__name__)
+
+
+class UploadReport(object):
+    """Summary of the uploads performed by a scheduler.
+
+    Attributes
+    ----------
+    duration : float
+        Total duration of the uploads in seconds.
+    sent_bytes : int
+        Number of bytes of waveform data actually sent.
+    skipped : int
+        Number of waveforms which were already stored in the instruments.
+    instruments : dict
+        Per instrument (connection string) tuple of the number of bytes sent
+        and of the time spent uploading.
+
+    """
+    __slots__ = ('duration', 'sent_bytes', 'skipped', 'instruments')
+
+    def __init__(self, duration, sent_bytes, skipped, instruments):
+        self.duration = duration
+        self.sent_bytes = sent_bytes
+        self.skipped = skipped
+        self.instruments = instruments
+
+    @property
+    def throughput(self):
+        """Aggregate throughput in bytes per second.
+
+        """
+        return self.sent_bytes/self.duration if self.duration else 0.0
+
+    def __repr__(self):
+        return ('UploadReport({} bytes in {:.3f} s, {:.3g} B/s, {} skipped)'
+                .format(self.sent_bytes, self.duration, self.throughput,
+                        self.skipped))
+
+
+class _UploadJob(object):
+    """Operations queued for a single instrument.
+
+    """
+    __slots__ = ('driver', 'operations', 'sequence_started', 'sent_bytes',
+                 'skipped', 'duration', 'error')
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.operations = []
+        self.sequence_started = False
+        self.sent_bytes = 0
+        self.skipped = 0
+        self.duration = 0.0
+        self.error = None
+
+    def run(self, abort):
+        """Execute the queued operations unless another job failed.
+
+        """
+        driver = self.driver
+        start = time.perf_counter()
+        try:
+            with driver.lock:
+                for kind, args in self.operations:
+                    if abort.is_set():
+                        break
+                    if kind == 'waveform':
+                        if driver.to_send(*args):
+                            self.sent_bytes += _waveform_size(args)
+                        else:
+                            self.skipped += 1
+                    else:
+                        self.sequence_started = True
+                        driver.set_sequence(*args)
+        except Exception as e:
+            self.error = e
+            abort.set()
+        finally:
+            self.duration = time.perf_counter() - start
+
+    def rollback(self):
+        """Clear the sequence if it was (even partially) programmed.
+
+        """
+        if not self.sequence_started:
+            return
+        try:
+            with self.driver.lock:
+                self.driver.clear_sequence()
+        except Exception:
+            logger.exception('Failed to clear the sequence of %s',
+                             self.driver.connection_str)
+
+
+def _waveform_size(args):
+    """Size of the waveform found in the arguments passed to `to_send`.
+
+    The waveform is the largest bytes like argument, the other ones being
+    names or channel identifiers.
+
+    """
+    sizes = [arg.nbytes if isinstance(arg, memoryview)
+             else len(arg)
+             for arg in args
+             if isinstance(arg, (bytes, bytearray, str, memoryview))]
+    return max(sizes, default=0)
+
+
+class UploadScheduler(object):
+    """Queue the uploads for several AWGs and run them concurrently.
+
+    Operations are queued using `add_waveform` and `add_sequence` and executed
+    by `run`, one thread per instrument. If any instrument fails, the other
+    threads stop after their current operation and the sequences programmed
+    on all the instruments are cleared, so that no instrument is left with a
+    partially uploaded sequence.
+
+    Drivers must provide a `lock` attribute and the `to_send` method, and the
+    `set_sequence` and `clear_sequence` methods if sequences are programmed.
+
+    """
+    def __init__(self):
+        self._jobs = OrderedDict()
+
+    def add_waveform(self, driver, *args):
+        """Queue a waveform upload, args are passed to `driver.to_send`.
+
+        """
+        self._get_job(driver).operations.append(('waveform', args))
+
+    def add_sequence(self, driver, elements, batch_size=64):
+        """Queue the programming of a sequence using `driver.set_sequence`.
+
+        """
+        self._get_job(driver).operations.append(
+            ('sequence', (list(elements), batch_size)))
+
+    def run(self):
+        """Execute all the queued operations and empty the queue.
+
+        Returns
+        -------
+        report : UploadReport
+            Summary of the uploads.
+
+        Raises
+        ------
+        InstrIOError
+            If any instrument failed, after rolling back the sequences.
+
+        """
+        jobs = list(self._jobs.values())
+        self._jobs = OrderedDict()
+        abort = Event()
+
+        start = time.perf_counter()
+        threads = [Thread(target=job.run, args=(abort,)) for job in jobs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - start
+
+        failed = [job for job in jobs if job.error is not None]
+        if failed:
+            for job in jobs:
+                job.rollback()
+            msg = '\n'.join('{}: {}'.format(job.driver.connection_str,
+                                            job.error)
+                            for job in failed)
+            raise InstrIOError('Upload failed, the sequences were cleared:\n'
+                               + msg)
+
+        report = UploadReport(duration,
+                              sum(job.sent_bytes for job in jobs),
+                              sum(job.skipped for job in jobs),
+                              {job.driver.connection_str:
+                               (job.sent_bytes, job.duration)
+                               for job in jobs})
+        logger.debug('%r', report)
+        return report
+
+    def _get_job(self, driver):
+        """Access the job of a driver, creating it if necessary.
+
+        """
+        key = id(driver)
+        if key not in self._jobs:
+            self._jobs[key] = _UploadJob(driver)
+        return self._jobs[key]
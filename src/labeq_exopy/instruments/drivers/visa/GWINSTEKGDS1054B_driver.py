@@ -16,6 +16,9 @@ from multiprocessing import current_process
 from ..driver_tools import (InstrIOError, secure_communication,
                             instrument_property)
 from ..visa_tools import VisaInstrument
+from ..scope_tools import Waveform
+
+import numpy as np
 
 
 
@@ -56,13 +59,56 @@ class GWINSTEKGDS1054B(VisaInstrument):
     @secure_communication()
     def read_mean(self):       
         value = self.query('meas:mean?')
-        print (value)
 
         if value:
             return float(value)
         else:
             raise InstrIOError('GWINSTEK GDS-1054B: throwed a fit')
 
+    @secure_communication()
+    def read_waveforms(self, channel_nums):
+        """Read the acquisition memory of several channels.
+
+        The memory of each channel is transferred as a text header followed
+        by a binary block of big endian 16 bits samples, with 25 samples
+        units per vertical division.
+
+        Parameters
+        ----------
+        channel_nums : iterable(int)
+            Channels whose waveform should be read.
+
+        Returns
+        -------
+        waveforms : dict
+            Waveform of each channel.
+
+        """
+        driver = self._driver
+        waveforms = {}
+        for num in channel_nums:
+            self.write(':ACQuire{}:MEMory?'.format(num))
+            header = driver.read_raw().decode('ascii', 'replace')
+            infos = dict(field.split(',', 1) for field in header.split(';')
+                         if ',' in field)
+            if driver.read_bytes(1) != b'#':
+                raise InstrIOError('GWINSTEK GDS-1054B: invalid waveform '
+                                   'block for channel {}'.format(num))
+            digits = int(driver.read_bytes(1))
+            length = int(driver.read_bytes(digits))
+            block = driver.read_bytes(length)
+            self.drain_output()
+
+            raw = np.frombuffer(block, dtype='>i2')
+            scale = float(infos['Vertical Scale'])
+            position = float(infos.get('Vertical Position', 0))
+            period = float(infos['Sampling Period'])
+            trigger = int(infos.get('Trigger Address', 0))
+            waveforms[num] = Waveform(raw, scale/25, -position,
+                                      -trigger*period, period)
+
+        return waveforms
+
     @secure_communication()
     def ramp_cursor(self, duration, goal):   
         if __name__ == 'labeq_exopy.instruments.drivers.visa.GWINSTEKGDS1054B_driver':
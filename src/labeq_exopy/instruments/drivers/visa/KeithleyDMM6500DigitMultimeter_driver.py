@@ -4,12 +4,21 @@
 """Driver for Keithley instruments using VISA library.
 
 """
+import numpy as np
+
 from ..driver_tools import (InstrIOError, secure_communication,
                             instrument_property)
 from ..visa_tools import VisaInstrument
 
 
 class Keithley6500(VisaInstrument):
+    """Driver for the Keithley DMM6500.
+
+    The measure function, range and data format are tracked in the shadow
+    state (see `BaseInstrument`) so that a read only sends the settings which
+    changed before the `READ?` query.
+
+    """
     rangeVal = ""
 
 
@@ -17,6 +26,9 @@ class Keithley6500(VisaInstrument):
 
     protocoles = {'TCPIP': 'INSTR'}
 
+    #: Name of the buffer used for buffered acquisitions.
+    buffer_name = 'defbuffer1'
+
     def open_connection(self, **para):
         """Open the connection to the instr using the `connection_str`.
 
@@ -24,15 +36,11 @@ class Keithley6500(VisaInstrument):
         super(Keithley6500, self).open_connection(**para)
         self.write_termination = '\n'
         self.read_termination = '\n'
+        self._buffer_count = 0
 
     @secure_communication()
     def read_voltage_dc(self):
-    # The SENS:FUNC setting may be circumvented by using MEAS:FUNC ('SENS:FUNC "VOLT:DC"')
-    #MEAS:FUNC is a coupling of the sens:func and data?
-        if self.rangeVal :
-            self.write('SENS:VOLT:RANG ' + self.rangeVal)
-        
-        value = self.query('MEAS:VOLT:DC?')
+        value = self._read('VOLT:DC')
 
         #split string into list to get voltage measurement
         value = value.split(",")[0]
@@ -47,10 +55,7 @@ class Keithley6500(VisaInstrument):
 
     @secure_communication()
     def read_voltage_ac(self):    
-        if self.rangeVal :
-            self.write('SENS:VOLT:RANG ' + self.rangeVal)
-        
-        value = self.query('MEAS:VOLT:AC?')
+        value = self._read('VOLT:AC')
         value = value.split(",")[0]
         value = value.replace("NVAC","")
         
@@ -61,7 +66,7 @@ class Keithley6500(VisaInstrument):
 
     @secure_communication()
     def read_two_resistance(self):
-        value = self.query('MEAS:RES'+self.rangeVal+'?')
+        value = self._read('RES')
         value = value.split(",")[0]
         value = value.replace("NOHM","")
         
@@ -72,7 +77,7 @@ class Keithley6500(VisaInstrument):
 
     @secure_communication()
     def read_four_resistance(self):
-        value = self.query('MEAS:FRES'+self.rangeVal+'?')
+        value = self._read('FRES')
         value = value.split(",")[0]
         value = value.replace("NOHM4W","")
         
@@ -83,7 +88,7 @@ class Keithley6500(VisaInstrument):
 
     @secure_communication()
     def read_current_dc(self):
-        value = self.query('meas:CURR:DC'+self.rangeVal+'?')
+        value = self._read('CURR:DC')
         value = value.split(",")[0]
         value = value.replace("NADC","")
 
@@ -94,7 +99,7 @@ class Keithley6500(VisaInstrument):
 
     @secure_communication()
     def read_current_ac(self):
-        value = self.query('MEAS:CURR:AC'+self.rangeVal+'?')
+        value = self._read('CURR:AC')
         value = value.split(",")[0]
         value = value.replace("NAAC","")
 
@@ -106,11 +111,58 @@ class Keithley6500(VisaInstrument):
     @secure_communication()
     def set_range(self, range_val):
         if not range_val :
-            self.write('SENS:VOLT:RANG 100')
+            # Use the same key as _configure_function for the DC voltage.
+            self.write('SENS:VOLT:DC:RANG 100')
+            self.record_state('SENS:VOLT:DC:RANG', '100')
             self.rangeVal = ""
         else:
             self.rangeVal = str(range_val)
 
+    @secure_communication()
+    def configure_buffer(self, count, function='VOLT:DC'):
+        """Configure a trigger model taking `count` readings into the buffer.
+
+        Parameters
+        ----------
+        count : int
+            Number of readings to acquire per `read_buffer` call.
+        function : str, optional
+            Measure function to use.
+
+        """
+        count = int(count)
+        self._configure_function(function)
+        self.write('TRAC:POIN {}, "{}"'.format(count, self.buffer_name))
+        self.write('TRIG:LOAD "SimpleLoop", {}, 0, "{}"'
+                   .format(count, self.buffer_name))
+        self._buffer_count = count
+
+    @secure_communication()
+    def read_buffer(self):
+        """Run the trigger model configured by `configure_buffer`.
+
+        The readings are transferred as a single block of little endian
+        doubles.
+
+        Returns
+        -------
+        data : np.ndarray
+            1D array of the acquired readings.
+
+        """
+        count = self._buffer_count
+        if not count:
+            raise InstrIOError('Keithley6500: buffer has not been configured')
+        self.write_state(('FORM:DATA', 'REAL'), ('FORM:BORD', 'SWAP'))
+        self.write('TRAC:CLE "{}"'.format(self.buffer_name))
+        self.write('INIT')
+        # Block until the trigger model is done.
+        self.query('*OPC?')
+        return self.query_binary_values('TRAC:DATA? 1, {}, "{}", READ'
+                                        .format(count, self.buffer_name),
+                                        datatype='d', is_big_endian=False,
+                                        container=np.array)
+
     @secure_communication()
     def check_connection(self):
         """Check wether or not a front panel user set the instrument in local.
@@ -123,3 +175,18 @@ class Keithley6500(VisaInstrument):
         if val:
             return val[6]
 
+    def _read(self, function):
+        """Make sure the instrument is configured for `function` and read.
+
+        """
+        self._configure_function(function)
+        self.write_state(('FORM:DATA', 'ASC'))
+        return self.query('READ?')
+
+    def _configure_function(self, function):
+        """Select the measure function and apply the user range if any.
+
+        """
+        self.write_state(('SENS:FUNC', '"{}"'.format(function)))
+        if self.rangeVal:
+            self.write_state(('SENS:{}:RANG'.format(function), self.rangeVal))
@@ -12,7 +12,6 @@
 """
 from ..driver_tools import (InstrIOError, secure_communication, instrument_property)
 from ..visa_tools import VisaInstrument
-import time
 
 
 class LI5650(VisaInstrument):
@@ -28,34 +27,15 @@ class LI5650(VisaInstrument):
         self.timeout = 5000
 
     def measure(self, val):
-        """ set sensitivity mode """
-        
-        ###for debug
-        f = open("C:\\Users\\2administrator\\Desktop\\Exopy Errors\\timeout_data.txt", "a")
-        
+        """ Fetch the last data and return the specified value.
 
-        # #first make sure data output format is DATA1,DATA2,DATA3,DATA4
-        # self.write('DATA 30')
-        
-        # #now ensure data outputs are R,Phase,X,Y
-        # self.write('CALC1:FORM MLIN')
-        # self.write('CALC2:FORM PHAS')
-        # self.write('CALC3:FORM REAL')
-        # self.write('CALC4:FORM IMAG')
+        The latency of the query can be monitored by enabling the driver
+        profiler (see `profiling_tools`).
 
-        
-        t1 = time.time()
+        """
         #get data
         data = (self.query('FETC?')).split(',')
 
-        t2 = time.time()
-        dt = t2 - t1
-
-        ### for debug
-        f.write(f"{dt}\n")
-        f.close()
-        print(dt)
-
         #measure the specified value
         if val == 'R':
             return data[0]
@@ -86,6 +66,11 @@ class LI5650(VisaInstrument):
 
         self.write('SENS:FILT:LPAS:TCON ' + str(val))
     
+    def read_time_constant(self):
+        """read time constant in seconds """
+
+        return float(self.query('SENS:FILT:LPAS:TCON?'))
+
     def set_tc_slope(self, val):
         """set time constant """
 
@@ -13,18 +13,100 @@ import logging
 from inspect import cleandoc
 import numpy as np
 
-from pyvisa import VisaIOError, constants
-
-from ..driver_tools import (BaseInstrument, InstrIOError, InstrError,
+from ..driver_tools import (BaseInstrument, InstrIOError,
                             secure_communication, instrument_property)
 from ..visa_tools import VisaInstrument
 
 
-FORMATTING_DICT = {'PHAS': lambda x: np.angle(x, deg=True),
-                   'MLIN': np.abs,
-                   'MLOG': lambda x: 10*np.log10(np.abs(x)),
-                   'REAL': np.real,
-                   'IMAG': np.imag}
+def _format_phase(data, out):
+    np.arctan2(data.imag, data.real, out=out)
+    np.degrees(out, out=out)
+
+
+def _format_unwrapped_phase(data, out):
+    np.arctan2(data.imag, data.real, out=out)
+    out[...] = np.unwrap(out)
+
+
+def _format_mlin(data, out):
+    np.absolute(data, out=out)
+
+
+def _format_mlog(data, out):
+    np.absolute(data, out=out)
+    np.log10(out, out=out)
+    out *= 10
+
+
+def _format_real(data, out):
+    np.copyto(out, data.real)
+
+
+def _format_imag(data, out):
+    np.copyto(out, data.imag)
+
+
+#: Formatters of complex data. Each function takes the complex data and the
+#: float array into which the result should be written. 'UPHAS' corresponds to
+#: the unwrapped phase in radians.
+FORMATTING_DICT = {'PHAS': _format_phase,
+                   'UPHAS': _format_unwrapped_phase,
+                   'MLIN': _format_mlin,
+                   'MLOG': _format_mlog,
+                   'REAL': _format_real,
+                   'IMAG': _format_imag}
+
+
+def format_complex_data(data, formats, names=None, x_axis=None, x_name='x',
+                        delay=0.0):
+    """Compute several formats of complex data into a single record array.
+
+    Each requested format is written directly into its field so that no
+    intermediate array is created (except when unwrapping the phase).
+
+    Parameters
+    ----------
+    data : numpy.array
+        Complex data, as returned by `read_raw_data`.
+    formats : iterable(str)
+        Keys of FORMATTING_DICT to compute.
+    names : iterable(str), optional
+        Names of the fields in which to store the formats. The formats are
+        used if omitted.
+    x_axis : numpy.array, optional
+        Sweep axis. If provided it is stored as the first field.
+    x_name : str, optional
+        Name of the field in which to store the x axis.
+    delay : float, optional
+        Electrical delay to compensate. The data are multiplied by
+        exp(2iπ x delay) before being formatted. Requires x_axis.
+
+    Returns
+    -------
+    data : numpy.recarray
+        Record array with one float field per requested format.
+
+    """
+    formats = list(formats)
+    names = list(names) if names else formats
+    fields = [(n, float) for n in names]
+    if x_axis is not None:
+        fields.insert(0, (x_name, float))
+
+    out = np.empty(len(data), dtype=fields)
+    if x_axis is not None:
+        out[x_name] = x_axis
+        if delay:
+            rotated = np.empty(len(data), dtype=complex)
+            rotated.real = 0
+            np.multiply(x_axis, 2*np.pi*delay, out=rotated.imag)
+            np.exp(rotated, out=rotated)
+            data = np.multiply(data, rotated, out=rotated)
+
+    for meas_format, name in zip(formats, names):
+        FORMATTING_DICT[meas_format](data, out[name])
+
+    return out.view(np.recarray)
 
 
 class AgilentPNAChannelError(Exception):
@@ -119,40 +201,70 @@ class AgilentPNAChannel(BaseInstrument):
             self.selected_measure = meas_name
 
         data_request = 'CALCulate{}:DATA? SDATA'.format(self._channel)
+        # The interleaved real/imaginary values are directly viewed as complex
+        # numbers to avoid copying the data.
         if self._pna.data_format == 'REAL,32':
-            data = self._pna.query_binary_values(data_request, 'f')
+            data = self._pna.query_binary_values(data_request, 'f',
+                                                 container=np.array)
+            data = np.asarray(data, dtype=np.float32)
 
         elif self._pna.data_format in ('REAL,64', 'REAL,+64'):
-            data = self._pna.query_binary_values(data_request, 'd')
+            data = self._pna.query_binary_values(data_request, 'd',
+                                                 container=np.array)
+            data = np.asarray(data, dtype=np.float64)
 
         else:
-            data = self._pna.query_ascii_values(data_request)
+            data = np.array(self._pna.query_ascii_values(data_request),
+                            dtype=np.float64)
 
         if not meas_name:
             meas_name = self.selected_measure
 
-        if data:
-            aux = np.array(data)
-            return aux[::2] + 1j*aux[1::2]
+        if len(data) and not len(data) % 2:
+            return data.view(np.complex64 if data.dtype == np.float32
+                             else np.complex128)
         else:
             raise InstrIOError(cleandoc('''Agilent PNA did not return the
                 channel {} formatted data for meas {}'''.format(
                 self._channel, meas_name)))
 
     def read_and_format_raw_data(self, meas_format, meas_name=''):
-        """
+        """Read raw data for a measure and format them.
+
+        Parameters
+        ----------
+        meas_format : str
+            Key of FORMATTING_DICT to compute.
+        meas_name : str, optional
+            Name of the measure which should be read.
+
+        Returns
+        -------
+        data : numpy.array
+            Array of Floating points holding the formatted data.
+
         """
         data = self.read_raw_data(meas_name)
-        return FORMATTING_DICT[meas_format](data)
+        out = np.empty(len(data))
+        FORMATTING_DICT[meas_format](data, out)
+        return out
 
     @secure_communication()
-    def run_averaging(self, aver_count=''):
+    def run_averaging(self, aver_count='', should_stop=None):
         """ Restart averaging on the channel and wait until it is over
 
         Parameters
         ----------
         aver_count : str, optional
             Number of averages to perform. Default value is the current one
+        should_stop : Callable, optional
+            Callable returning True if the wait should be interrupted.
+
+        Returns
+        -------
+        completed : bool
+            False if the averaging was interrupted by should_stop.
+
         """
         self._pna.trigger_source = 'Immediate'
         self.sweep_mode = 'Hold'
@@ -164,22 +276,11 @@ class AgilentPNAChannel(BaseInstrument):
         self.average_state = 1
 
         for i in range(0, int(self.average_count)):
-            self._pna.write('sense{}:sweep:mode gro'.format(self._channel))
-
-            while True:
-                try:
-                    done = int(self._pna.query('*OPC?'))
-                    break
-                except VisaIOError as e:
-                    # Getting an timeout here simply means that the
-                    # PNA isn't done averaging
-                    if e.error_code == constants.StatusCode.error_timeout:
-                        continue
-                    raise
+            cmd = 'sense{}:sweep:mode gro'.format(self._channel)
+            if not self._pna.wait_for_operation(cmd, should_stop=should_stop):
+                return False
 
-            if done != 1:
-                raise InstrError(cleandoc('''Agilent PNA did could  not perform
-                the average on channel {} '''.format(self._channel)))
+        return True
 
     @secure_communication()
     def list_existing_measures(self):
@@ -761,6 +862,22 @@ class AgilentPNA(VisaInstrument):
             self.write('INITiate{}:IMMediate'.format(channel))
         self.write('*OPC')
 
+    @secure_communication()
+    def trigger_and_wait(self, channel=None, timeout=None, should_stop=None):
+        """Trigger a sweep and wait for its completion.
+
+        Returns
+        -------
+        completed : bool
+            False if the wait was interrupted by should_stop.
+
+        """
+        if channel is None:
+            cmd = 'INITiate:IMMediate'
+        else:
+            cmd = 'INITiate{}:IMMediate'.format(channel)
+        return self.wait_for_operation(cmd, timeout, should_stop)
+
     @secure_communication()
     def check_operation_completion(self):
         """
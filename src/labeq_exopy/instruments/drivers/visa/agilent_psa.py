@@ -27,6 +27,11 @@ DATA_FORMATTING_DICT = {'raw I/Q data': 0,
                         'mag vs freq in Vrms': 11,
                         'average of mag vs freq in Vrms': 12}
 
+#: Settings whose modification changes the frequency axis of the SA traces.
+FREQUENCY_AXIS_SETTINGS = ('mode', 'start_frequency_SA', 'stop_frequency_SA',
+                           'center_frequency', 'span_frequency',
+                           'sweep_points_SA')
+
 
 class SpecDescriptor():
     def __init__(self):
@@ -51,6 +56,9 @@ class AgilentPSA(VisaInstrument):
                            'stop_frequency_SA': False,
                            'mode': False}
 
+    #: Frequency axis of the SA traces, None when it must be recomputed.
+    _frequency_axis = None
+
     def __init__(self, connection_info, caching_allowed=True,
                  caching_permissions={}, auto_open=True):
         super(AgilentPSA, self).__init__(connection_info,
@@ -59,17 +67,131 @@ class AgilentPSA(VisaInstrument):
                                          auto_open)
         self.write("ROSC:SOURCE EXT")  # 10 MHz clock bandwidth external
         self.write("ROSC:OUTP ON")  # 10 MHz clock bandwidth internal ON
-        self.write("FORM:DATA ASCii")  # lots of data must be read in
-                                       # ASCii format
-        self.write("FORM:BORD NORMAL")  # (TO CHECK)
+        # SA traces are read in binary format, other data in ASCii format
+        self.write_state(("FORM:DATA", "ASCii"))
+        self.write("FORM:BORD NORMAL")  # big endian binary data
         self.mode = self.mode  # initialize PSA properly if SPEC or WAV mode
         self.spec_header = SpecDescriptor()
 
+    def forget_state(self, *keys):
+        """Also discard the frequency axis when the settings defining it may
+        have changed.
+
+        """
+        if not keys or any(k in FREQUENCY_AXIS_SETTINGS for k in keys):
+            self._frequency_axis = None
+        super(AgilentPSA, self).forget_state(*keys)
+
+    def frequency_axis(self):
+        """Frequency axis (in GHz) of the traces in SA mode.
+
+        The axis is computed once and reused as long as the start, stop,
+        span, center frequencies and the number of points are not modified
+        through the driver.
+
+        """
+        if self._frequency_axis is None:
+            axis = np.linspace(self.start_frequency_SA,
+                               self.stop_frequency_SA,
+                               int(self.sweep_points_SA))
+            axis.flags.writeable = False
+            self._frequency_axis = axis
+        return self._frequency_axis
+
+    @secure_communication()
+    def read_traces(self, traces, should_stop=None):
+        """Acquire a single sweep in SA mode and read several traces.
+
+        The traces are transferred as big endian 32 bits floats.
+
+        Parameters
+        ----------
+        traces : iterable(int)
+            Numbers of the traces to read.
+        should_stop : Callable, optional
+            Callable returning True if the wait for the sweep should be
+            interrupted, in which case None is returned.
+
+        Returns
+        -------
+        data : np.recarray
+            Record array whose first field 'Frequency' is the frequency axis
+            and the others the traces named 'trace<n>'.
+
+        """
+        traces = list(traces)
+        self.write(":ABORT")
+        self.write(":INIT:CONT OFF")
+        if not self.wait_for_operation(":INIT", should_stop=should_stop):
+            return None
+
+        return self.fetch_traces(traces)
+
+    def stream_trace(self, trace, count, should_stop=None):
+        """Acquire sweeps back to back and yield the values of a trace.
+
+        The instrument is configured once, and each sweep is started as soon
+        as the previous trace has been read, so that every yielded trace
+        comes from a new and complete sweep. The frequency axis is given by
+        `frequency_axis`, and an InstrIOError is raised if a trace does not
+        match it.
+
+        Parameters
+        ----------
+        trace : int
+            Number of the trace to read.
+        count : int
+            Number of sweeps to acquire.
+        should_stop : Callable, optional
+            Callable returning True if the acquisition should be interrupted.
+
+        """
+        self.write(":ABORT")
+        self.write(":INIT:CONT OFF")
+        self.write_state(("FORM:DATA", "REAL,32"))
+        points = len(self.frequency_axis())
+        query = 'TRAC? TRACE{}'.format(trace)
+        for _ in range(count):
+            if not self.wait_for_operation(":INIT", should_stop=should_stop):
+                return
+            values = self._driver.query_binary_values(query, datatype='f',
+                                                      is_big_endian=True,
+                                                      container=np.array)
+            if len(values) != points:
+                raise InstrIOError(cleandoc('''Agilent PSA returned {} points
+                    for trace {} instead of {}'''.format(len(values), trace,
+                                                        points)))
+            yield values
+
+    @secure_communication()
+    def fetch_traces(self, traces):
+        """Read several traces without starting a new acquisition.
+
+        See `read_traces` for the format of the returned data.
+
+        """
+        self.write_state(("FORM:DATA", "REAL,32"))
+        freq = self.frequency_axis()
+        data = [freq]
+        for trace in traces:
+            values = self._driver.query_binary_values(
+                'TRAC? TRACE{}'.format(trace), datatype='f',
+                is_big_endian=True, container=np.array)
+            if len(values) != len(freq):
+                raise InstrIOError(cleandoc('''Agilent PSA returned {} points
+                    for trace {} instead of {}'''.format(len(values), trace,
+                                                        len(freq))))
+            data.append(values)
+
+        names = ['Frequency'] + ['trace{}'.format(t) for t in traces]
+        return np.rec.fromarrays(data, names=names)
+
     @secure_communication(2)
     def get_spec_header(self):
         """
         """
         if self.mode == 'SPEC':
+            self.write_state(("FORM:DATA", "ASCii"))
             answer = self.query_ascii_values("FETCH:SPEC1?")
             if answer:
                 self.spec_header.initialized = True
@@ -91,55 +213,32 @@ class AgilentPSA(VisaInstrument):
             raise '''PSA is not in Spectrum mode'''
 
     @secure_communication()
-    def read_data(self, trace):
-        """
+    def read_data(self, trace, should_stop=None):
+        """Acquire and read a trace.
+
+        Completion of the acquisition is signaled by the instrument through a
+        service request. should_stop is an optional callable allowing to
+        interrupt the wait, in which case None is returned.
+
         """
         DATA_FORMAT = ['raw I/Q data', 'descriptor', '0', '(I,Q) vs time',
                        'log(mag) vs freq', '0', '0',
                        'average of log(mag) vs freq', '0', '0', '0',
                        'mag vs freq in Vrms', 'average of mag vs freq in Vrms']
         if self.mode == 'SA':
-
-            # must be read in ASCii format
-            self.write("FORM:DATA ASCii")
-            # stop all the measurements
-            self.write(":ABORT")
-            # go to the "Single sweep" mode
-            self.write(":INIT:CONT OFF")
-            # initiate measurement
-            self.write(":INIT")
-
-            #
-            self.query("SWEEP:TIME?")
-
-            self.write("*WAI")  # SA waits until the averaging is done
-            # Loop to see when the averaging is done
-            while True:
-                try:
-                    self.query("SWEEP:TIME?")
-                    break
-                except:
-                    pass
-
-            data = self.query_ascii_values('trace? trace{}'.format(trace))
-
-            if data:
-                freq = np.linspace(self.start_frequency_SA,
-                                   self.stop_frequency_SA,
-                                   self.sweep_points_SA)
-                return np.rec.fromarrays([freq, np.array(data)],
-                                         names=['Frequency',
-                                                DATA_FORMAT[trace]])
-            else:
-                raise InstrIOError(cleandoc('''Agilent PSA did not return the
-                    trace {} data'''.format(trace)))
+            data = self.read_traces([trace], should_stop)
+            if data is None:
+                return None
+            return np.rec.fromarrays([data['Frequency'],
+                                      data['trace{}'.format(trace)]],
+                                     names=['Frequency', DATA_FORMAT[trace]])
 
         elif self.mode == 'SPEC':
             self.get_spec_header()
-            self.write("INIT:IMM;*WAI")  # start the acquisition and wait until
-                                         # over
-            # Check how *OPC? works
-            self.query("*OPC?")
+            # start the acquisition and wait until over
+            if not self.wait_for_operation("INIT:IMM",
+                                           should_stop=should_stop):
+                return None
             data = self.query_ascii_values("FETCH:SPEC{}?".format(trace))
             if data:
                 if trace in (4, 7, 11, 12):
@@ -169,12 +268,13 @@ class AgilentPSA(VisaInstrument):
                     trace data'''))
         else:
             self.get_spec_header()
-            self.write("INIT:IMM;*WAI")  # start the acquisition and wait until
-                                         # over
-            #Check how *OPC? works
-            self.query("*OPC?")
+            # start the acquisition and wait until over
+            if not self.wait_for_operation("INIT:IMM",
+                                           should_stop=should_stop):
+                return None
 
             # this will get the (I,Q) as a function of freq
+            self.write_state(("FORM:DATA", "ASCii"))
             data = self.query_ascii_values("FETCH:WAV0?")
             if data:
                 return np.rec.fromarrays([data[::2], data[1::2]],
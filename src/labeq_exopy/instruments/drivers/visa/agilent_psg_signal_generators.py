@@ -18,9 +18,10 @@ from pyvisa import VisaTypeError
 from ..driver_tools import (InstrIOError, instrument_property,
                             secure_communication)
 from ..visa_tools import VisaInstrument
+from ..list_sweep_tools import ListSweepMixin, TO_HZ
 
 
-class AgilentPSG(VisaInstrument):
+class AgilentPSG(ListSweepMixin, VisaInstrument):
     """
     Generic driver for Agilent PSG SignalGenerator, using the VISA library.
 
@@ -60,6 +61,39 @@ class AgilentPSG(VisaInstrument):
         self.write_termination = '\n'
         self.read_termination = '\n'
 
+    list_sweep_triggers = ('bus', 'external')
+
+    @secure_communication()
+    def _upload_list_sweep(self, frequencies, powers, trigger):
+        """Load the list in the list mode of the source and arm it.
+
+        """
+        self.write(':LIST:TYPE LIST')
+        if frequencies is not None:
+            factor = TO_HZ[self.frequency_unit]
+            self.write(':LIST:FREQ ' +
+                       ','.join('{:.6f}'.format(f*factor)
+                                for f in frequencies))
+        if powers is not None:
+            self.write(':LIST:POW ' +
+                       ','.join('{}'.format(p) for p in powers))
+        source = 'BUS' if trigger == 'bus' else 'EXT'
+        self.write(':LIST:TRIG:SOUR {}'.format(source))
+        self.write(':TRIG:SOUR {}'.format(source))
+        if frequencies is not None:
+            self.write(':FREQ:MODE LIST')
+        if powers is not None:
+            self.write(':POW:MODE LIST')
+        self.write(':INIT')
+
+    @secure_communication()
+    def _stop_hardware_list_sweep(self):
+        """Switch back to fixed frequency and power.
+
+        """
+        self.write(':FREQ:MODE CW')
+        self.write(':POW:MODE FIX')
+
     @instrument_property
     @secure_communication()
     def frequency(self):
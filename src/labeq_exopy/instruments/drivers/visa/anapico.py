@@ -18,9 +18,10 @@ from pyvisa import VisaTypeError
 from ..driver_tools import (InstrIOError, instrument_property,
                             secure_communication)
 from ..visa_tools import VisaInstrument
+from ..list_sweep_tools import ListSweepMixin, TO_HZ
 
 
-class Anapico(VisaInstrument):
+class Anapico(ListSweepMixin, VisaInstrument):
     """
     Generic driver for Anapico Signal Generators,
     using the VISA library.
@@ -69,6 +70,40 @@ class Anapico(VisaInstrument):
 # connection.
         self.write("SYST:COMM:VXI:RTMO 0")
 
+    list_sweep_triggers = ('bus', 'external')
+
+    @secure_communication()
+    def _upload_list_sweep(self, frequencies, powers, trigger):
+        """Load the list in the list mode of the source and arm it.
+
+        Each trigger moves the source to the next point of the list.
+
+        """
+        if frequencies is not None:
+            factor = TO_HZ[self.frequency_unit]
+            self.write(':LIST:FREQ ' +
+                       ','.join('{:.6f}'.format(f*factor)
+                                for f in frequencies))
+        if powers is not None:
+            self.write(':LIST:POW ' +
+                       ','.join('{}'.format(p) for p in powers))
+        self.write(':TRIG:TYPE POIN')
+        self.write(':TRIG:SOUR {}'.format('BUS' if trigger == 'bus'
+                                          else 'EXT'))
+        if frequencies is not None:
+            self.write(':FREQ:MODE LIST')
+        if powers is not None:
+            self.write(':POW:MODE LIST')
+        self.write(':INIT')
+
+    @secure_communication()
+    def _stop_hardware_list_sweep(self):
+        """Switch back to fixed frequency and power.
+
+        """
+        self.write(':FREQ:MODE CW')
+        self.write(':POW:MODE FIX')
+
     @instrument_property
     @secure_communication()
     def frequency(self):
@@ -225,6 +260,10 @@ class AnapicoMulti(Anapico):
     output : bool, instrument_property
         State of the output 'ON'(True)/'OFF'(False).
     """
+    #: The known values of the per-channel settings refer to the previously
+    #: selected channel.
+    shadow_state_couplings = {'channel': ('frequency', 'power', 'output',
+                                          'pm_state')}
 
     @instrument_property
     @secure_communication()
@@ -249,3 +288,4 @@ class AnapicoMulti(Anapico):
         if result and channel != result:
             msg = 'Instrument could not select channel {}'
             raise InstrIOError(msg.format(channel))
+        self.record_state('channel', channel)
@@ -18,9 +18,10 @@ from pyvisa import VisaTypeError
 from ..driver_tools import (InstrIOError, secure_communication,
                             instrument_property)
 from ..visa_tools import VisaInstrument
+from ..list_sweep_tools import ListSweepMixin
 
 
-class AnritsuMG3694(VisaInstrument):
+class AnritsuMG3694(ListSweepMixin, VisaInstrument):
     """Driver for the Anritsu MG 3694 microwave source.
 
     """
@@ -9,6 +9,8 @@
 """Driver for Keithley instruments using VISA library.
 
 """
+import numpy as np
+
 from ..driver_tools import (InstrIOError, secure_communication,
                             instrument_property)
 from ..visa_tools import VisaInstrument
@@ -30,7 +32,8 @@ class Keithley2000(VisaInstrument):
     function : str, instrument_property
         Current function of the multimeter. Can be : 'VOLT:DC', 'VOLT:AC',
         'CURR:DC', 'CURR:AC', 'RES'. This instrument property is cached by
-        default.
+        default. The reads only set it when the shadow state does not already
+        record the required function, even if caching is disabled.
 
     Methods
     -------
@@ -49,6 +52,13 @@ class Keithley2000(VisaInstrument):
     read_current_ac(mes_range = 'DEF', mes_resolution = 'DEF')
         Return the AC current read by the instrument. Can change the function
         if needed.
+    configure_buffer(count, function=None)
+        Configure the instrument to store several readings per trigger in its
+        internal buffer.
+    read_buffer()
+        Acquire the configured readings and return them as an array.
+    release_buffer()
+        Go back to the continuous single reading mode.
 
     """
     caching_permissions = {'function': True}
@@ -62,6 +72,7 @@ class Keithley2000(VisaInstrument):
         super(Keithley2000, self).open_connection(**para)
         self.write_termination = '\n'
         self.read_termination = '\n'
+        self._buffer_count = 0
 
     @instrument_property
     @secure_communication()
@@ -82,6 +93,7 @@ class Keithley2000(VisaInstrument):
         # The Keithley returns "VOLT:DC" needs to remove the quotes
         if not(self.query('FUNCtion?')[1:-1].lower() == value.lower()):
             raise InstrIOError('Keithley2000: Failed to set function')
+        self.record_state('function', value)
 
     @secure_communication()
     def read_voltage_dc(self, mes_range='DEF', mes_resolution='DEF'):
@@ -93,8 +105,7 @@ class Keithley2000(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'VOLT:DC':
-            self.function = 'VOLT:DC'
+        self._select_function('VOLT:DC')
 
         value = self.query('FETCh?')
         if value:
@@ -112,8 +123,7 @@ class Keithley2000(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'VOLT:AC':
-            self.function = 'VOLT:AC'
+        self._select_function('VOLT:AC')
 
         value = self.query('FETCh?')
         if value:
@@ -132,8 +142,7 @@ class Keithley2000(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'RES':
-            self.function = 'RES'
+        self._select_function('RES')
 
         value = self.query('FETCh?')
         if value:
@@ -151,8 +160,7 @@ class Keithley2000(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'CURR:DC':
-            self.function = 'CURR:DC'
+        self._select_function('CURR:DC')
 
         value = self.query('FETCh?')
         if value:
@@ -170,8 +178,7 @@ class Keithley2000(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'CURR:AC':
-            self.function = 'CURR:AC'
+        self._select_function('CURR:AC')
 
         value = self.query('FETCh?')
         if value:
@@ -179,6 +186,73 @@ class Keithley2000(VisaInstrument):
         else:
             raise InstrIOError('Keithley2000: AC current measure failed')
 
+    @secure_communication()
+    def configure_buffer(self, count, function=None):
+        """Configure the instrument to store `count` readings per trigger.
+
+        The readings are stored in the internal buffer and transferred as
+        double precision little endian binary values by `read_buffer`. Single
+        value reads are not possible until `release_buffer` is called.
+
+        Parameters
+        ----------
+        count : int
+            Number of readings to acquire per `read_buffer` call.
+        function : str, optional
+            Function to use. The current function is kept if omitted.
+
+        """
+        if function:
+            self._select_function(function)
+
+        count = int(count)
+        self.write('INIT:CONT OFF')
+        self.write('TRIG:COUN {}'.format(count))
+        self.write('TRAC:POIN {}'.format(count))
+        self.write('TRAC:FEED SENS')
+        self.write('FORM:DATA REAL,64')
+        self.write('FORM:BORD SWAP')
+        self._buffer_count = count
+
+    @secure_communication()
+    def read_buffer(self):
+        """Acquire the readings configured by `configure_buffer`.
+
+        Returns
+        -------
+        data : np.ndarray
+            1D array of the acquired readings.
+
+        """
+        if not self._buffer_count:
+            raise InstrIOError('Keithley2000: buffer has not been configured')
+        self.write('TRAC:CLE')
+        self.write('TRAC:FEED:CONT NEXT')
+        self.write('INIT')
+        # Block until the acquisition is over.
+        self.query('*OPC?')
+        return self.query_binary_values('TRAC:DATA?', datatype='d',
+                                        is_big_endian=False,
+                                        container=np.array)
+
+    @secure_communication()
+    def release_buffer(self):
+        """Restore the continuous single reading mode.
+
+        """
+        self.write('FORM:DATA ASC')
+        self.write('TRIG:COUN 1')
+        self.write('TRAC:FEED:CONT NEV')
+        self.write('INIT:CONT ON')
+        self._buffer_count = 0
+
+    def _select_function(self, function):
+        """Select the function unless it is known to be already selected.
+
+        """
+        self.apply_state('function', function,
+                         lambda v: setattr(self, 'function', v))
+
     @secure_communication()
     def check_connection(self):
         """Check wether or not a front panel user set the instrument in local.
@@ -207,7 +281,8 @@ class Keithley2001(VisaInstrument):
     function : str, instrument_property
         Current function of the multimeter. Can be : 'VOLT:DC', 'VOLT:AC',
         'CURR:DC', 'CURR:AC', 'RES'. This instrument property is cached by
-        default.
+        default. The reads only set it when the shadow state does not already
+        record the required function, even if caching is disabled.
 
     Methods
     -------
@@ -259,6 +334,7 @@ class Keithley2001(VisaInstrument):
         # The Keithley returns "VOLT:DC" needs to remove the quotes
         if not(self.query('FUNCtion?')[1:-1].lower() == value.lower()):
             raise InstrIOError('Keithley2001: Failed to set function')
+        self.record_state('function', value)
 
     @secure_communication()
     def read_voltage_dc(self, mes_range='DEF', mes_resolution='DEF'):
@@ -270,8 +346,7 @@ class Keithley2001(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'VOLT:DC':
-            self.function = 'VOLT:DC'
+        self._select_function('VOLT:DC')
 
         value = self.query('MEAS?')
 
@@ -296,8 +371,7 @@ class Keithley2001(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'VOLT:AC':
-            self.function = 'VOLT:AC'
+        self._select_function('VOLT:AC')
 
         value = self.query('MEAS?')
 
@@ -323,8 +397,7 @@ class Keithley2001(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'RES':
-            self.function = 'RES'
+        self._select_function('RES')
 
         value = self.query('MEAS?')
 
@@ -350,8 +423,7 @@ class Keithley2001(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'FRES':
-            self.function = 'FRES'
+        self._select_function('FRES')
 
         value = self.query('MEAS?')
 
@@ -376,8 +448,7 @@ class Keithley2001(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'CURR:DC':
-            self.function = 'CURR:DC'
+        self._select_function('CURR:DC')
 
         #query device with meas? command returning comma seperated string with measurement value, timestamp, reading count
         # and channel
@@ -404,8 +475,7 @@ class Keithley2001(VisaInstrument):
         agilent driver compatible.
 
         """
-        if self.function != 'CURR:AC':
-            self.function = 'CURR:AC'
+        self._select_function('CURR:AC')
 
         value = self.query('MEAS?')
         
@@ -419,6 +489,13 @@ class Keithley2001(VisaInstrument):
         else:
             raise InstrIOError('Keithley2001: AC current measure failed')
 
+    def _select_function(self, function):
+        """Select the function unless it is known to be already selected.
+
+        """
+        self.apply_state('function', function,
+                         lambda v: setattr(self, 'function', v))
+
     @secure_communication()
     def check_connection(self):
         """Check wether or not a front panel user set the instrument in local.
@@ -440,6 +517,11 @@ class Keithley2400(VisaInstrument):
     instrument but you can extend it if needed. See the documentation of the
     driver_tools package for more details about writing instruments drivers.
 
+    The measurement configuration (function, sense mode, output state, data
+    format, ...) is tracked in the shadow state (see `BaseInstrument`) so
+    that a read only sends the settings which actually changed before the
+    `READ?` query.
+
     Parameters
     ----------
     see the `VisaInstrument` parameters
@@ -468,12 +550,28 @@ class Keithley2400(VisaInstrument):
     read_current_ac(mes_range = 'DEF', mes_resolution = 'DEF')
         Return the AC current read by the instrument. Can change the function
         if needed.
+    configure_buffer(count, elements='VOLT,CURR')
+        Configure the instrument to take `count` readings per trigger and
+        return them as a single binary block.
+    read_buffer()
+        Trigger the configured readings and return them as an array.
+    sweep_list(values, function='VOLT', delay=0.0, nplc=1.0, compliance=None)
+        Run a hardware timed list sweep and return the (V, I, t) readings.
 
     """
     caching_permissions = {'function': True}
 
     protocoles = {'GPIB': 'INSTR'}
 
+    #: Maximum number of points of a source list sweep.
+    MAX_SWEEP_POINTS = 2500
+
+    #: Settings required by the single value reads.
+    _SINGLE_READ = (('TRIG:COUN', '1'), ('FORM:DATA', 'ASC'))
+
+    #: Switching the sense mode turns the output off.
+    shadow_state_couplings = {'SYST:RSEN': ('OUTP',)}
+
     @property
     def output(self):
         return self._output
@@ -482,6 +580,8 @@ class Keithley2400(VisaInstrument):
     def output(self, value):
         self._output = value
         self.write('output ' + value)
+        on = str(value).upper() in ('ON', '1')
+        self.record_state('OUTP', 'ON' if on else 'OFF')
 
     def open_connection(self, **para):
         """Open the connection to the instr using the `connection_str`.
@@ -490,6 +590,7 @@ class Keithley2400(VisaInstrument):
         super(Keithley2400, self).open_connection(**para)
         self.write_termination = '\n'
         self.read_termination = '\n'
+        self._buffer_elements = 0
 
     @instrument_property
     @secure_communication()
@@ -507,6 +608,7 @@ class Keithley2400(VisaInstrument):
     @secure_communication()
     def function(self, value):
         self.write('FUNCtion "{}"'.format(value))
+        self.forget_state('FUNC')
         # The Keithley returns "VOLT:DC" needs to remove the quotes
         if not(self.query('FUNCtion?')[1:-1].lower() == value.lower()):
             raise InstrIOError('Keithley2000: Failed to set function')
@@ -521,18 +623,10 @@ class Keithley2400(VisaInstrument):
         agilent driver compatible.
 
         """
-        self.write('FUNC "VOLT"')
-
-        #check if 2400 is in 2 point or 4 point measurement mode
-        if self.query('SYST:RSEN?') != 0:
-            #if not, then set the mode to 2 wire
-            self.write('SYST:RSEN 0')
-
-        #turn on output if not on. required for measurement. Switching rsens mode will turn off output.
-        if self.query('OUTP?') != 1:
-            self.write('OUTP ON') 
-        
-        self.write('FORM:ELEM VOLT')
+        # Two wire mode and output on are required for the measurement.
+        self.write_state(('FUNC', '"VOLT"'), ('SYST:RSEN', '0'),
+                         ('OUTP', 'ON'), ('FORM:ELEM', 'VOLT'),
+                         *self._SINGLE_READ)
         value = self.query('READ?')
 
         if value:
@@ -550,18 +644,10 @@ class Keithley2400(VisaInstrument):
         agilent driver compatible.
 
         """
-        self.write('FUNC "CURR"')
-
-        #check if 2400 is in 2 point or 4 point measurement mode
-        if self.query('SYST:RSEN?') != 0:
-            #if not, then set the mode to 2 wire
-            self.write('SYST:RSEN 0')
-
-        #turn on output if not on. required for measurement. Switching rsens mode will turn off output.
-        if self.query('OUTP?') != 1:
-            self.write('OUTP ON') 
-        
-        self.write('FORM:ELEM CURR')
+        # Two wire mode and output on are required for the measurement.
+        self.write_state(('FUNC', '"CURR"'), ('SYST:RSEN', '0'),
+                         ('OUTP', 'ON'), ('FORM:ELEM', 'CURR'),
+                         *self._SINGLE_READ)
         value = self.query('READ?')
 
         if value:
@@ -584,30 +670,17 @@ class Keithley2400(VisaInstrument):
         #get list vals
         source_mode = arg_list[0]
 
-        #set to resistance measurement mode. easier to just set than to check, func returns list for 2400.
-        self.write('FUNC "RES"')
-        
-
         if source_mode == "Manual":
-            self.write('RES:MODE MAN')
+            mode = (('RES:MODE', 'MAN'),)
         elif source_mode == "Auto":
-            self.write('RES:RANG:AUTO 1')
-            self.write('RES:MODE AUTO')
+            mode = (('RES:RANG:AUTO', '1'), ('RES:MODE', 'AUTO'))
         else:
             raise InstrIOError('Keithley2400:read_two_resistance: source mode invalid. Use "auto" or "manual."')
 
-        #check if 2400 is in 2 point or 4 point measurement mode
-        if self.query('SYST:RSEN?') != 0:
-            #if not, then set the mode to 2 wire
-            self.write('SYST:RSEN 0')
-
-        #turn on output if not on. required for measurement. Switching rsens mode will turn off output.
-        if self.query('OUTP?') != 1:
-            self.write('OUTP ON') 
-        
-        
-        self.write('FORM:ELEM RES')
-        #Read returns ascii format "voltage,current,resistance,time,state"
+        # Two wire mode and output on are required for the measurement.
+        self.write_state(('FUNC', '"RES"'), *mode, ('SYST:RSEN', '0'),
+                         ('OUTP', 'ON'), ('FORM:ELEM', 'RES'),
+                         *self._SINGLE_READ)
         value = self.query('READ?')
 
         if value:
@@ -633,42 +706,147 @@ class Keithley2400(VisaInstrument):
         curr_comp = arg_list[2]
         volt_comp = arg_list[3]
 
-        #set to resistance measurement mode. easier to just set than to check, func returns list for 2400.
-        self.write('FUNC "RES"')
-        self.write('RES:RANG:AUTO 1')
-
         if source_mode == "Manual":
-            self.write('RES:MODE MAN')
             if source_type == "Voltage":
-                self.write('SOUR:FUNC VOLT')
-                self.write('CURR:PROT ' + str(curr_comp) )
+                mode = (('RES:MODE', 'MAN'), ('SOUR:FUNC', 'VOLT'),
+                        ('CURR:PROT', str(curr_comp)))
             elif source_type == "Current":
-                self.write('SOUR:FUNC CURR')
-                self.write('VOLT:PROT ' + str(volt_comp) )
+                mode = (('RES:MODE', 'MAN'), ('SOUR:FUNC', 'CURR'),
+                        ('VOLT:PROT', str(volt_comp)))
             else:
                 raise InstrIOError('Keithley2400:read_four_resistance: source type invalid. Use "voltage" or "current."')
         elif source_mode == "Auto":
-            self.write('RES:MODE AUTO')
+            mode = (('RES:MODE', 'AUTO'),)
         else:
             raise InstrIOError('Keithley2400:read_four_resistance: source mode invalid. Use "auto" or "manual."')
 
-        #check if 2400 is in 2 point or 4 point measurement mode
-        if self.query('SYST:RSEN?') != 1:
-            #if not, then set the mode to four wire
-            self.write('SYST:RSEN 1')
-
-        #turn on output if not on. required for measurement. Switching rsens mode will turn off output.
-        if self.query('OUTP?') != 1:
-            self.write('OUTP ON') 
-        
-        self.write('FORM:ELEM RES')
-        #Read returns ascii format "voltage,current,resistance,time,state"
+        # Four wire mode and output on are required for the measurement.
+        self.write_state(('FUNC', '"RES"'), ('RES:RANG:AUTO', '1'), *mode,
+                         ('SYST:RSEN', '1'), ('OUTP', 'ON'),
+                         ('FORM:ELEM', 'RES'), *self._SINGLE_READ)
         value = self.query('READ?')
 
         if value:
             return float(value)
         else:
             raise InstrIOError('Keithley2400: Four wire resistance measurement failed')
+
+    @secure_communication()
+    def configure_buffer(self, count, elements='VOLT,CURR'):
+        """Configure the instrument to acquire several readings per trigger.
+
+        The readings are returned in a single binary transfer by
+        `read_buffer`. The 2400 only supports single precision binary data.
+
+        Parameters
+        ----------
+        count : int
+            Number of readings to take per `read_buffer` call.
+        elements : str, optional
+            Comma separated list of the elements returned for each reading
+            (VOLT, CURR, RES, TIME, STAT).
+
+        """
+        self.write_state(('OUTP', 'ON'), ('FORM:ELEM', elements),
+                         ('TRIG:COUN', str(int(count))),
+                         ('FORM:DATA', 'SREAL'), ('FORM:BORD', 'SWAP'))
+        self._buffer_elements = len(elements.split(','))
+
+    @secure_communication()
+    def read_buffer(self):
+        """Trigger the readings configured by `configure_buffer`.
+
+        Returns
+        -------
+        data : np.ndarray
+            Array of shape (count, number of elements).
+
+        """
+        if not self._buffer_elements:
+            raise InstrIOError('Keithley2400: buffer has not been configured')
+        data = self.query_binary_values('READ?', datatype='f',
+                                        is_big_endian=False,
+                                        container=np.array)
+        return data.reshape((-1, self._buffer_elements))
+
+    @secure_communication()
+    def sweep_list(self, values, function='VOLT', delay=0.0, nplc=1.0,
+                   compliance=None, should_stop=None):
+        """Run a hardware timed source list sweep and measure at each point.
+
+        The full list is uploaded, the sweep runs on the instrument and the
+        readings are returned in a single binary transfer. The source is put
+        back in fixed mode once the sweep is over.
+
+        Parameters
+        ----------
+        values : array-like
+            Set points of the sweep (at most `MAX_SWEEP_POINTS`).
+        function : {'VOLT', 'CURR'}, optional
+            Quantity to source.
+        delay : float, optional
+            Source delay in seconds between setting a point and measuring.
+        nplc : float, optional
+            Integration time in number of power line cycles.
+        compliance : float, optional
+            Compliance on the measured quantity. Left unchanged if None.
+        should_stop : Callable, optional
+            Accepted for compatibility with the other sources, the sweep is
+            performed in a single blocking read and cannot be interrupted.
+
+        Returns
+        -------
+        data : np.ndarray
+            Structured array with 'voltage', 'current' and 'time' fields.
+
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        n = len(values)
+        if not 0 < n <= self.MAX_SWEEP_POINTS:
+            msg = 'Keithley2400: a sweep list must have between 1 and {} points'
+            raise InstrIOError(msg.format(self.MAX_SWEEP_POINTS))
+        function = function.upper()[:4]
+        sense = 'CURR' if function == 'VOLT' else 'VOLT'
+
+        settings = [('SOUR:FUNC', function),
+                    ('SOUR:{}:MODE'.format(function), 'LIST'),
+                    ('SOUR:DEL', repr(float(delay))),
+                    ('SENS:FUNC:CONC', 'ON'),
+                    ('FUNC', '"{}"'.format(sense)),
+                    ('SENS:{}:NPLC'.format(sense), repr(float(nplc)))]
+        if compliance is not None:
+            settings.append(('SENS:{}:PROT'.format(sense),
+                             repr(float(compliance))))
+        self.write_state(*settings)
+
+        # Upload the list in chunks to keep the messages short.
+        points = [','.join('{:.9g}'.format(v) for v in values[i:i+100])
+                  for i in range(0, n, 100)]
+        self.write('SOUR:LIST:{} {}'.format(function, points[0]))
+        for chunk in points[1:]:
+            self.write('SOUR:LIST:{}:APP {}'.format(function, chunk))
+
+        self.configure_buffer(n, 'VOLT,CURR,TIME')
+        # Leave enough time to the instrument to perform the whole sweep.
+        timeout = self.timeout
+        if timeout is not None:
+            duration = n*(float(delay) + 2*float(nplc)/50 + 0.01)
+            self.timeout = max(timeout, 1000*(2*duration + 5))
+        try:
+            raw = self.read_buffer()
+        finally:
+            self.timeout = timeout
+            # Otherwise the next single read would step the source through
+            # the list.
+            self.write_state(('SOUR:{}:MODE'.format(function), 'FIX'))
+
+        data = np.empty(len(raw), dtype=[('voltage', float),
+                                         ('current', float),
+                                         ('time', float)])
+        data['voltage'] = raw[:, 0]
+        data['current'] = raw[:, 1]
+        data['time'] = raw[:, 2]
+        return data
     
     @secure_communication()
     def set_voltage_comp(self, comp_v, mes_range='DEF', mes_resolution='DEF'):
@@ -678,6 +856,7 @@ class Keithley2400(VisaInstrument):
         """
 
         self.write('VOLT:PROT '+str(comp_v))
+        self.record_state('VOLT:PROT', str(comp_v))
     
     @secure_communication()
     def set_current_comp(self, comp_c, mes_range='DEF', mes_resolution='DEF'):
@@ -687,6 +866,7 @@ class Keithley2400(VisaInstrument):
         """
 
         self.write('CURR:PROT '+str(comp_c))
+        self.record_state('CURR:PROT', str(comp_c))
 
     @secure_communication()
     def source_voltage_dc(self, source_v, mes_range='DEF', mes_resolution='DEF'):
@@ -695,7 +875,7 @@ class Keithley2400(VisaInstrument):
 
         """
 
-        self.write('SOUR:FUNC VOLT')
+        self.write_state(('SOUR:FUNC', 'VOLT'), ('SOUR:VOLT:MODE', 'FIX'))
         self.write('SOUR:VOLT '+str(source_v))
 
     @secure_communication()
@@ -705,7 +885,7 @@ class Keithley2400(VisaInstrument):
 
         """
 
-        self.write('SOUR:FUNC CURR')
+        self.write_state(('SOUR:FUNC', 'CURR'), ('SOUR:CURR:MODE', 'FIX'))
         self.write('SOUR:CURR '+ str(source_c))
 
     @secure_communication()
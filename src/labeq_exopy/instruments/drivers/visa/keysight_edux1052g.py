@@ -11,8 +11,9 @@
 
 from ..driver_tools import InstrIOError
 from ..visa_tools import VisaInstrument
+from ..scope_tools import Waveform
 
-import struct
+import numpy as np
 
 
 class KeysightEDUX1052G(VisaInstrument):
@@ -87,7 +88,7 @@ class KeysightEDUX1052G(VisaInstrument):
 
     def capture(self, channel_nums):
         self.write(
-            f":DIGitize CHANnel{', '.join([f'CHANnel{num}' for num in channel_nums])}"
+            f":DIGitize {', '.join([f'CHANnel{num}' for num in channel_nums])}"
         )
 
     def set_measure_source(self, channel_num):
@@ -130,24 +131,47 @@ class KeysightEDUX1052G(VisaInstrument):
             self.query_binary_values(":DISPlay:DATA? PNG, COLor", datatype="B")
         )
 
-    # -------- WIP --------
-    # def get_waveform(self, channel_num):
-    #     self.write(":WAVeform:POINts:MODE NORMal")
-    #     assert self.query(":WAVeform:POINts:MODE?") == f"NORM"
-
-    #     self.write(f":WAVeform:SOURce CHANnel{channel_num}")
-    #     assert self.query(":WAVeform:SOURce?") == f"CHAN{channel_num}"
-
-    #     self.write(":WAVeform:FORMat BYTE")
-    #     assert self.query(":WAVeform:FORMat?") == "BYTE"
-
-    #     dx = float(self.query(":WAVeform:XINCrement?"))
-    #     x0 = float(self.query(":WAVeform:XORigin?"))
-    #     dy = float(self.query(":WAVeform:YINCrement?"))
-    #     y0 = float(self.query(":WAVeform:YORigin?"))
-    #     y_ref = float(self.query(":WAVeform:YREFerence?"))
-
-    #     data = bytes(self.query_binary_values(":WAVEFORM:DATA?", datatype="s"))
-    #     data = struct.unpack(f"{len(data) // 8}d", data)
-
-    #     return dx, x0, dy, y0, y_ref, data
+    def read_waveforms(self, channel_nums, word=True):
+        """Read the waveforms of the captured channels.
+
+        Each waveform is transferred as a single binary block and the
+        preamble is read once per channel. The format settings are only sent
+        when they changed.
+
+        Parameters
+        ----------
+        channel_nums : iterable(int)
+            Channels whose waveform should be read.
+        word : bool, optional
+            Transfer the samples as 16 bits words rather than bytes.
+
+        Returns
+        -------
+        waveforms : dict
+            Waveform of each channel.
+
+        """
+        self.write_state(
+            (":WAVeform:POINts:MODE", "MAXimum"),
+            (":WAVeform:FORMat", "WORD" if word else "BYTE"),
+            (":WAVeform:BYTeorder", "LSBFirst"),
+            (":WAVeform:UNSigned", "1"),
+        )
+        datatype = "H" if word else "B"
+
+        waveforms = {}
+        for num in channel_nums:
+            self.write_state((":WAVeform:SOURce", f"CHANnel{num}"))
+            preamble = self.query(":WAVeform:PREamble?").split(",")
+            (x_increment, x_origin, x_reference,
+             y_increment, y_origin, y_reference) = map(float, preamble[4:10])
+            raw = self._driver.query_binary_values(
+                ":WAVeform:DATA?", datatype=datatype, is_big_endian=False,
+                container=np.array)
+            if not len(raw):
+                raise InstrIOError(f"EDUX1025G: No data for channel {num}")
+            waveforms[num] = Waveform(
+                raw, y_increment, y_origin - y_reference*y_increment,
+                x_origin - x_reference*x_increment, x_increment)
+
+        return waveforms
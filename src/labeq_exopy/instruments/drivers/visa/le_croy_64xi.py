@@ -23,6 +23,66 @@ import struct
 import numpy as np
 
 
+class SegmentedWaveform(object):
+    """Segments of a sequence mode acquisition.
+
+    The samples are kept as raw integers, in a (segments, samples) array
+    sharing the memory of the transferred block, and are scaled on demand.
+
+    Attributes
+    ----------
+    raw : np.ndarray
+        Raw samples, one row per segment.
+    gain : float
+        Vertical gain of the samples.
+    offset : float
+        Vertical offset of the samples. Voltages are gain * raw - offset.
+    time : np.ndarray
+        Time of the samples relative to the first sample of their segment.
+    trigger_times : np.ndarray
+        Time of the trigger of each segment relative to the first one.
+    trigger_offsets : np.ndarray
+        Time between the trigger and the first sample of each segment, to be
+        added to `time` to get the time relative to the trigger.
+
+    """
+    __slots__ = ('raw', 'gain', 'offset', 'time', 'trigger_times',
+                 'trigger_offsets')
+
+    def __init__(self, raw, gain, offset, time, trigger_times,
+                 trigger_offsets):
+        self.raw = raw
+        self.gain = gain
+        self.offset = offset
+        self.time = time
+        self.trigger_times = trigger_times
+        self.trigger_offsets = trigger_offsets
+
+    def volts(self, dtype=np.float32):
+        """Voltages of all the samples, as a (segments, samples) array.
+
+        """
+        out = self.raw.astype(dtype)
+        out *= self.gain
+        out -= self.offset
+        return out
+
+    def average(self):
+        """Average of the segments, in volts.
+
+        The raw samples are summed without converting the whole block to
+        floating point numbers.
+
+        """
+        return self.gain*self.raw.mean(axis=0, dtype=np.float64) - self.offset
+
+    def segment_means(self):
+        """Mean voltage of each segment.
+
+        """
+        return self.gain*self.raw.mean(axis=1, dtype=np.float64) - self.offset
+
+
 class LeCroyChannel(BaseInstrument):
     """
     """
@@ -241,6 +301,8 @@ class LeCroyChannel(BaseInstrument):
             horizontal values data : 'SingleSweepTimesValuesArray' or
                                      'SEQNCEWaveformTimesValuesArray'
         '''
+        # The format is not written through write_state.
+        self._LeCroy64Xi.forget_state('CFMT')
         if hires in ('True', 'Yes'):
             self._LeCroy64Xi.write('CFMT DEF9,WORD,BIN')
             result = self._LeCroy64Xi.query('CFMT?')
@@ -488,19 +550,53 @@ class LeCroyChannel(BaseInstrument):
             for i in range(0,waveform_size-1):
                 self.data['SingleSweepTimesValuesArray'][i] = self.data['HORIZ_INTERVAL'][0] * i + self.data['HORIZ_OFFSET'][0]
         else:
-            self.data['TrigTimeCount'] = np.empty(self.data['TRIGTIME_ARRAY'][0] / 16)
-            self.data['TrigTimeOffset'] = np.empty(self.data['TRIGTIME_ARRAY'][0] / 16)
-            for i in range(0, self.data['TRIGTIME_ARRAY'][0] / 16 - 1):
+            self.data['TrigTimeCount'] = np.empty(self.data['TRIGTIME_ARRAY'][0] // 16)
+            self.data['TrigTimeOffset'] = np.empty(self.data['TRIGTIME_ARRAY'][0] // 16)
+            for i in range(0, self.data['TRIGTIME_ARRAY'][0] // 16 - 1):
                 self.data['TrigTimeCount'][i] = struct.unpack('<d', databyte[(self.data['WAVE_DESCRIPTOR'][0]+i*16):(self.data['WAVE_DESCRIPTOR'][0]+8+i*16)])[0]
                 self.data['TrigTimeOffset'][i] = struct.unpack('<d', databyte[(self.data['WAVE_DESCRIPTOR'][0]+8+i*16):(self.data['WAVE_DESCRIPTOR'][0]+16+i*16)])[0]
             self.data['SEQNCEWaveformTimesValuesArray'] = np.empty(waveform_size)
             # Array of horizontal values
             for n in range(0, len(self.data['TrigTimeCount']) - 1):
-                for i in range(0, waveform_size / len(self.data['TrigTimeCount']) - 1):
-                    self.data['SEQNCEWaveformTimesValuesArray'][n * (waveform_size / len(self.data['TrigTimeCount'])) + i] = self.data['HORIZ_INTERVAL'][0] * i + self.data['TrigTimeOffset'][n]
+                for i in range(0, waveform_size // len(self.data['TrigTimeCount']) - 1):
+                    self.data['SEQNCEWaveformTimesValuesArray'][n * (waveform_size // len(self.data['TrigTimeCount'])) + i] = self.data['HORIZ_INTERVAL'][0] * i + self.data['TrigTimeOffset'][n]
 
         return self.data
 
+    @secure_communication()
+    def read_segments(self, hires=True):
+        """Read all the segments of a sequence mode acquisition at once.
+
+        The waveform is transferred as a single binary block and decoded
+        without Python loops.
+
+        Parameters
+        ----------
+        hires : bool, optional
+            Whether to transfer the samples as 16 bits words rather than
+            bytes.
+
+        Returns
+        -------
+        waveform : SegmentedWaveform
+            Segments of the acquisition. A single sweep acquisition is
+            returned as a single segment.
+
+        """
+        instr = self._LeCroy64Xi
+        with self.secure():
+            instr.write_state(('CFMT', 'DEF9,{},BIN'.format('WORD' if hires
+                                                            else 'BYTE')))
+            name = 'C' + self._channel if len(self._channel) == 1 else \
+                self._channel
+            instr.write('{}:WF? ALL'.format(name))
+            header = instr.read_bytes(self.descriptor_start)
+            block = instr.read_bytes(int(header[-9:]))
+            # Discard the termination following the block if any.
+            instr.drain_output()
+
+        return decode_segments(block)
+
     @secure_communication()
     def read_data_cfast(self, hires):
         '''
@@ -514,6 +610,8 @@ class LeCroyChannel(BaseInstrument):
             horizontal values data : 'SingleSweepTimesValuesArray' or
                                      'SEQNCEWaveformTimesValuesArray'
         '''
+        # The format is not written through write_state.
+        self._LeCroy64Xi.forget_state('CFMT')
         if hires in ('True', 'Yes'):
             self._LeCroy64Xi.write('CFMT DEF9,WORD,BIN')
             result = self._LeCroy64Xi.query('CFMT?')
@@ -736,21 +834,72 @@ class LeCroyChannel(BaseInstrument):
             for i in range(0,waveform_size-1):
                 self.data['SingleSweepTimesValuesArray'][i] = self.data['HORIZ_INTERVAL'][0] * i + self.data['HORIZ_OFFSET'][0]
         else:
-            self.data['TrigTimeCount'] = np.empty(self.data['TRIGTIME_ARRAY'][0] / 16)
-            self.data['TrigTimeOffset'] = np.empty(self.data['TRIGTIME_ARRAY'][0] / 16)
-            for i in range(0, self.data['TRIGTIME_ARRAY'][0] / 16 - 1):
+            self.data['TrigTimeCount'] = np.empty(self.data['TRIGTIME_ARRAY'][0] // 16)
+            self.data['TrigTimeOffset'] = np.empty(self.data['TRIGTIME_ARRAY'][0] // 16)
+            for i in range(0, self.data['TRIGTIME_ARRAY'][0] // 16 - 1):
                 self.data['TrigTimeCount'][i] = struct.unpack('<d', databyte[(self.data['WAVE_DESCRIPTOR'][0]+i*16):(self.data['WAVE_DESCRIPTOR'][0]+8+i*16)])[0]
                 self.data['TrigTimeOffset'][i] = struct.unpack('<d', databyte[(self.data['WAVE_DESCRIPTOR'][0]+8+i*16):(self.data['WAVE_DESCRIPTOR'][0]+16+i*16)])[0]
             self.data['SEQNCEWaveformTimesValuesArray'] = np.empty(waveform_size)
             # Array of horizontal values
             for n in range(0, len(self.data['TrigTimeCount']) - 1):
-                for i in range(0, waveform_size / len(self.data['TrigTimeCount']) - 1):
-                    self.data['SEQNCEWaveformTimesValuesArray'][n * (waveform_size / len(self.data['TrigTimeCount'])) + i] = self.data['HORIZ_INTERVAL'][0] * i + self.data['TrigTimeOffset'][n]
+                for i in range(0, waveform_size // len(self.data['TrigTimeCount']) - 1):
+                    self.data['SEQNCEWaveformTimesValuesArray'][n * (waveform_size // len(self.data['TrigTimeCount'])) + i] = self.data['HORIZ_INTERVAL'][0] * i + self.data['TrigTimeOffset'][n]
 
         return self.data
 
 
 
+def decode_segments(block):
+    """Decode a waveform block sent by the oscilloscope.
+
+    Parameters
+    ----------
+    block : bytes
+        Waveform block starting with the WAVEDESC descriptor.
+
+    Returns
+    -------
+    waveform : SegmentedWaveform
+        Segments of the acquisition.
+
+    """
+    order = '<' if struct.unpack_from('<h', block, 34)[0] else '>'
+    comm_type = struct.unpack_from(order + 'h', block, 32)[0]
+    (wave_desc, user_text, _, trigtime_size,
+     ris_time_size) = struct.unpack_from(order + '5i', block, 36)
+    count = struct.unpack_from(order + 'i', block, 116)[0]
+    subarrays = struct.unpack_from(order + 'i', block, 144)[0]
+    gain, offset = struct.unpack_from(order + '2f', block, 156)
+    interval = struct.unpack_from(order + 'f', block, 176)[0]
+    horiz_offset = struct.unpack_from(order + 'd', block, 180)[0]
+
+    start = wave_desc + user_text
+    segments = trigtime_size // 16
+    if segments:
+        trig = np.frombuffer(block, dtype=order + 'f8', count=2*segments,
+                             offset=start).reshape(segments, 2)
+        trigger_times = trig[:, 0]
+        trigger_offsets = trig[:, 1]
+    else:
+        segments = 1
+        trigger_times = np.zeros(1)
+        trigger_offsets = np.array([horiz_offset])
+    if subarrays and subarrays < segments:
+        segments = subarrays
+        trigger_times = trigger_times[:segments]
+        trigger_offsets = trigger_offsets[:segments]
+
+    dtype = np.dtype(order + 'i2') if comm_type else np.dtype('i1')
+    samples = count // (trigtime_size // 16 or 1)
+    raw = np.frombuffer(block, dtype=dtype, count=segments*samples,
+                        offset=start + trigtime_size + ris_time_size)
+    raw = raw.reshape(segments, samples)
+    time = interval*np.arange(samples)
+
+    return SegmentedWaveform(raw, gain, offset, time, trigger_times,
+                             trigger_offsets)
+
+
 class LeCroy64Xi(VisaInstrument):
     """ This is the python driver for the LeCroy Waverunner 64Xi
     Digital Oscilloscope
@@ -990,7 +1139,20 @@ class LeCroy64Xi(VisaInstrument):
         Output:
         None
         '''
-        self.write('SEQ ON, {}, {}'.format(segments, max_size))
+        self.write_state(('SEQ', 'ON, {}, {}'.format(segments, max_size)))
+
+    @secure_communication()
+    def acquire_single(self, timeout=None, should_stop=None):
+        """Arm the oscilloscope for a single acquisition and wait for it.
+
+        Returns
+        -------
+        completed : bool
+            False if the wait was interrupted by should_stop.
+
+        """
+        self.clear_cache(['trigger_mode'])
+        return self.wait_for_operation('ARM;WAIT', timeout, should_stop)
 
     @secure_communication()
     def clear_sweeps(self):
@@ -38,6 +38,8 @@ class LockInSR7265(VisaInstrument):
         Return the phase of the signal measured by the instrument
     read_amp_and_phase()
         Return the amplitude and phase of the signal measured by the instrument
+    read_time_constant()
+        Return the time constant of the output filters
 
     Notes
     -----
@@ -149,6 +151,19 @@ class LockInSR7265(VisaInstrument):
         else:
             return values
 
+    @secure_communication()
+    def read_time_constant(self):
+        """
+        Return the time constant of the output filters in seconds
+
+        """
+        value = self.query('TC.')
+        status = self._check_status()
+        if status != 'OK' or not value:
+            raise InstrIOError('The command did not complete correctly')
+        else:
+            return float(value)
+
     @secure_communication()
     def _check_status(self):
         """
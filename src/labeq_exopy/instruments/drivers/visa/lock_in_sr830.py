@@ -15,6 +15,10 @@ from ..driver_tools import (InstrIOError, secure_communication)
 from ..visa_tools import VisaInstrument
 
 
+#: Time constants (in s) corresponding to the indexes used by OFLT.
+TIME_CONSTANTS = tuple(m*10**e for e in range(-5, 5) for m in (1, 3))
+
+
 class LockInSR830(VisaInstrument):
     """Driver for a SR830 lock-in, using the VISA library.
 
@@ -43,6 +47,8 @@ class LockInSR830(VisaInstrument):
         Return the amplitude and phase of the signal measured by the instrument
     read_frequency()
         Return the frequency measured by the instrument
+    read_time_constant()
+        Return the time constant of the output filters
     """
 
     def __init__(self, *args, **kwargs):
@@ -161,6 +167,18 @@ class LockInSR830(VisaInstrument):
         else:
             return float(value)
     @secure_communication()
+    def read_time_constant(self):
+        """
+        Return the time constant of the output filters in seconds
+
+        """
+        value = self.query('OFLT?')
+        if not value:
+            raise InstrIOError('The command did not complete correctly')
+        else:
+            return TIME_CONSTANTS[int(value)]
+
+    @secure_communication()
     def read_phase(self):
         """
         Return the phase of the signal measured by the instrument
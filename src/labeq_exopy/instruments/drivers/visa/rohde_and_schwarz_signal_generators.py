@@ -18,9 +18,10 @@ from pyvisa import VisaTypeError
 from ..driver_tools import (InstrIOError, instrument_property,
                             secure_communication)
 from ..visa_tools import VisaInstrument
+from ..list_sweep_tools import ListSweepMixin
 
 
-class RohdeSchwarzSMB100A(VisaInstrument):
+class RohdeSchwarzSMB100A(ListSweepMixin, VisaInstrument):
     """
     Generic driver for Rohde and Schwarz SMB100A SignalGenerator,
     using the VISA library.
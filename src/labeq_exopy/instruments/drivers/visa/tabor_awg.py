@@ -19,6 +19,7 @@ from contextlib import contextmanager
 from ..driver_tools import (BaseInstrument, InstrIOError, secure_communication,
                             instrument_property)
 from ..visa_tools import VisaInstrument
+from ..waveform_tools import waveform_digest, get_waveform_registry
 from visa import VisaTypeError
 from textwrap import fill
 from inspect import cleandoc
@@ -116,6 +117,17 @@ class TaborAWG(VisaInstrument):
                                   caching_permissions, auto_open)
         self.channels = {}
         self.lock = Lock()
+        self.waveforms = get_waveform_registry(self.connection_str)
+
+    def open_connection(self, **para):
+        """Open the connection and forget the waveforms loaded previously.
+
+        The content of the channels cannot be checked, so the waveforms
+        recorded by an earlier connection cannot be trusted.
+
+        """
+        super(TaborAWG, self).open_connection(**para)
+        get_waveform_registry(self.connection_str).forget()
 
     def get_channel(self, num):
         """
@@ -134,13 +146,52 @@ class TaborAWG(VisaInstrument):
     def to_send(self, waveform, ch_id):
         """Command to send to the instrument. waveform = string of a bytearray
 
+        The waveform is sent as an IEEE 488.2 binary block, without being
+        formatted into the message string. The upload is skipped if the same
+        waveform is known to be loaded on the channel. The instrument cannot
+        list its traces, so the registry is cleared each time the connection
+        is opened and `forget_waveforms` should be called if they are
+        modified by other means.
+
+        Returns
+        -------
+        sent : bool
+            Whether the waveform was uploaded.
+
         """
+        if isinstance(waveform, str):
+            # Same encoding as waveform_digest.
+            waveform = waveform.encode('latin-1')
+        elif not isinstance(waveform, bytes):
+            waveform = bytes(waveform)
+        digest = waveform_digest(waveform)
+        if self.waveforms.is_stored(ch_id, digest):
+            return False
+
         numbyte = len(waveform)
+        self.waveforms.forget(ch_id)
         self.write('INST {}'.format(ch_id))
         self.write('TRAC:MODE SING')
         numApresDiese = len('{}'.format(numbyte))
         header = "TRAC#{}{}".format(numApresDiese, numbyte)
-        self.write('{}{}'.format(header, waveform))
+
+        driver = self._driver
+        send_end = driver.send_end
+        driver.send_end = False
+        try:
+            driver.write_raw(header.encode('ascii'))
+            driver.write_raw(waveform)
+        finally:
+            driver.send_end = send_end
+        driver.write_raw(driver.write_termination.encode('ascii'))
+        self.waveforms.record(ch_id, digest, numbyte)
+        return True
+
+    def forget_waveforms(self):
+        """Forget which waveforms are loaded on the channels.
+
+        """
+        self.waveforms.forget()
 
     @instrument_property
     @secure_communication()
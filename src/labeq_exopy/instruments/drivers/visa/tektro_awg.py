@@ -17,11 +17,28 @@ from inspect import cleandoc
 from threading import Lock
 from contextlib import contextmanager
 
-from pyvisa import VisaTypeError, VisaIOError
+from pyvisa import VisaTypeError
 
 from ..driver_tools import (BaseInstrument, InstrIOError, secure_communication,
                             instrument_property)
 from ..visa_tools import VisaInstrument
+from ..waveform_tools import waveform_digest, get_waveform_registry
+
+
+#: SCPI headers of the channel settings which can be applied in bulk using
+#: `AWG.apply_channels_settings`, by name of the channel property.
+CHANNEL_SETTINGS = {
+    'output_state': 'OUTP{}:STAT',
+    'vpp': 'SOURce{}:VOLTage',
+    'offset': 'SOURce{}:VOLTage:LEVel:IMMediate:OFFSet',
+    'phase': 'SOURce{}:PHAS:ADJ',
+    'marker1_low_voltage': 'SOURce{}:MARK1:VOLTage:LOW',
+    'marker1_high_voltage': 'SOURce{}:MARK1:VOLTage:HIGH',
+    'marker1_delay': 'SOURce{}:MARK1:DEL',
+    'marker2_low_voltage': 'SOURce{}:MARK2:VOLTage:LOW',
+    'marker2_high_voltage': 'SOURce{}:MARK2:VOLTage:HIGH',
+    'marker2_delay': 'SOURce{}:MARK2:DEL',
+    }
 
 
 class AWGChannel(BaseInstrument):
@@ -432,6 +449,18 @@ class AWGChannel(BaseInstrument):
                                             .format(self._channel)))
 
 
+def _normalize_output_state(value):
+    """Convert the accepted values of the output state to 'ON' or 'OFF'.
+
+    """
+    if value in (1, True) or str(value).upper() == 'ON':
+        return 'ON'
+    if value in (0, False) or str(value).upper() == 'OFF':
+        return 'OFF'
+    raise VisaTypeError('The invalid value {} was given as output state'
+                        .format(value))
+
+
 class AWG(VisaInstrument):
     """
     """
@@ -443,32 +472,26 @@ class AWG(VisaInstrument):
                                   caching_permissions, auto_open)
         self.channels = {}
         self.lock = Lock()
+        self.waveforms = get_waveform_registry(self.connection_str)
+        if auto_open:
+            self.sync_waveforms()
 
     def reopen_connection(self):
         """Clear buffer on connection reseting.
 
         """
         super(AWG, self).reopen_connection()
-        self.write('*CLS')  # As this does not seem to work poll the output
-        while True:
-            try:
-                self.read()
-            except VisaIOError:
-                break
+        for channel in self.channels.values():
+            channel.forget_state()
+        self.write('*CLS')
+        self.drain_output()
 
     def clear_output_buffer(self):
         """Cleans output buffer. This replaces '*CLS' which does not work
         properly
 
         """
-        _timeout = self.timeout
-        self.timeout = 100
-        while True:
-            try:
-                self.read()
-            except VisaIOError:
-                self.timeout = _timeout
-                break
+        self.drain_output()
 
     def get_channel(self, num):
         """
@@ -487,9 +510,22 @@ class AWG(VisaInstrument):
     def to_send(self, name, waveform):
         """Command to send to the instrument. waveform = string of a bytearray
 
+        The upload is skipped if a waveform with the same content is known to
+        be stored under the same name.
+
+        Returns
+        -------
+        sent : bool
+            Whether the waveform was uploaded.
+
         """
+        digest = waveform_digest(waveform)
+        if self.waveforms.is_stored(name, digest):
+            return False
+
         numbyte = len(waveform)
         looplength = numbyte//2
+        self.waveforms.forget(name)
         self.write("WLIST:WAVEFORM:DELETE '{}'".format(name))
         self.write("WLIST:WAVEFORM:NEW '{}' , {}, INTeger" .format(name,
                                                                    looplength))
@@ -497,6 +533,96 @@ class AWG(VisaInstrument):
         header = "WLIS:WAV:DATA '{}',0,{},".format(name, looplength)
         self._driver.write_binary_values(header, waveform, datatype='B')
         self.write('*WAI')
+        self.waveforms.record(name, digest, looplength,
+                              self._waveform_timestamp(name))
+        return True
+
+    @secure_communication()
+    def apply_channels_settings(self, settings):
+        """Apply the settings of several channels in a single message.
+
+        The settings are compared to the last values applied to the channels
+        and only the ones which changed are sent. The success of the
+        operation is checked once at the end using the event status register
+        instead of reading back each value.
+
+        Parameters
+        ----------
+        settings : dict
+            Mapping between channel numbers and dict of settings, using as
+            keys the names of the channel properties listed in
+            `CHANNEL_SETTINGS`.
+
+        Returns
+        -------
+        sent : int
+            Number of settings sent to the instrument.
+
+        """
+        commands = []
+        changes = []
+        for ch_id, ch_settings in sorted(settings.items()):
+            channel = self.get_channel(ch_id)
+            if channel is None:
+                raise InstrIOError('The AWG has no channel {}'.format(ch_id))
+            state = channel._shadow_state
+            for name, value in ch_settings.items():
+                if name == 'output_state':
+                    value = _normalize_output_state(value)
+                if name in state and state[name] == value:
+                    continue
+                header = CHANNEL_SETTINGS[name].format(ch_id)
+                commands.append('{} {}'.format(header, value))
+                changes.append((channel, name, value))
+
+        if not commands:
+            return 0
+
+        with self.lock:
+            self.drain_output()
+            self.query('*ESR?')
+            self.write(';:'.join(commands))
+            esr = int(self.query('*ESR?'))
+            for channel in {c for c, _, _ in changes}:
+                channel.clear_cache([n for c, n, _ in changes
+                                     if c is channel])
+            if esr & 0b111100:
+                for channel, name, _ in changes:
+                    channel.forget_state(name)
+                raise InstrIOError('The AWG failed to apply the settings: ' +
+                                   ';:'.join(commands))
+            for channel, name, value in changes:
+                channel.record_state(name, value)
+
+        return len(commands)
+
+    @secure_communication()
+    def sync_waveforms(self):
+        """Forget the registered waveforms which are no longer stored in the
+        instrument or which were modified since they were uploaded.
+
+        """
+        registered = self.waveforms.names()
+        if not registered:
+            return
+        size = int(self.query('WLIST:SIZE?'))
+        stored = set(self.query('WLIST:NAME? {}'.format(i)).strip('"')
+                     for i in range(size))
+        for name in registered:
+            if name not in stored:
+                self.waveforms.forget(name)
+                continue
+            length = self.query('WLIST:WAVEFORM:LENGTH? "{}"'.format(name))
+            if (int(length) != self.waveforms.length(name) or
+                    self._waveform_timestamp(name) !=
+                    self.waveforms.timestamp(name)):
+                self.waveforms.forget(name)
+
+    def _waveform_timestamp(self, name):
+        """Time at which a waveform was last modified in the instrument.
+
+        """
+        return self.query('WLIST:WAVEFORM:TSTAMP? "{}"'.format(name))
 
     @secure_communication()
     def clear_sequence(self):
@@ -505,6 +631,73 @@ class AWG(VisaInstrument):
         """
         self.write("SEQuence:LENGth 0")
 
+    @secure_communication()
+    def set_sequence(self, elements, batch_size=64):
+        """Program a whole sequence in a single transfer.
+
+        The length of the sequence is set once, the element settings are
+        sent as coalesced SCPI messages and the success of the operation is
+        checked once at the end, which is much faster than programming the
+        elements one by one using `AWGChannel.set_sequence_pos`.
+
+        Parameters
+        ----------
+        elements : iterable(dict)
+            Elements of the sequence, in order. Each element is a dict which
+            can contain the keys:
+
+            - 'waveforms': dict mapping channel number to waveform name
+            - 'repeat': number of repetitions of the element, 'inf' to
+              repeat it indefinitely
+            - 'goto': index of the element to jump to after this one
+            - 'trigger': whether the element waits for a trigger
+
+        batch_size : int, optional
+            Number of commands sent in a single message.
+
+        """
+        commands = []
+        position = 0
+        for position, element in enumerate(elements, 1):
+            elem = 'SEQuence:ELEMent{}:'.format(position)
+            for channel, name in sorted(element.get('waveforms', {}).items()):
+                commands.append(elem + 'WAVeform{} "{}"'.format(channel, name))
+            repeat = element.get('repeat')
+            if repeat == 'inf':
+                commands.append(elem + 'LOOP:INFinite 1')
+            elif repeat:
+                commands.append(elem + 'LOOP:COUNt {}'.format(int(repeat)))
+            goto = element.get('goto')
+            if goto:
+                commands.append(elem + 'GOTO:STATe 1')
+                commands.append(elem + 'GOTO:INDex {}'.format(int(goto)))
+            if element.get('trigger'):
+                commands.append(elem + 'TWAIT 1')
+
+        self.clear_output_buffer()
+        # Clear the event status register so that only the errors caused by
+        # the programming of the sequence are reported.
+        self.query('*ESR?')
+        # Reset the elements to their default settings.
+        self.write('SEQuence:LENGth 0')
+        self.write('SEQuence:LENGth {}'.format(position))
+        for i in range(0, len(commands), batch_size):
+            self.write(';:'.join(commands[i:i + batch_size]))
+
+        # ESR bits 2 to 5 signal query, device, execution and command errors.
+        if int(self.query('*ESR?')) & 0b111100:
+            errors = []
+            # Bound the number of reads in case the queue never empties.
+            for _ in range(32):
+                error = self.query('SYSTem:ERRor?')
+                if int(error.split(',')[0]) == 0:
+                    break
+                errors.append(error)
+            else:
+                errors.append('(further errors were not read)')
+            raise InstrIOError('Failed to program the sequence:\n' +
+                               '\n'.join(errors))
+
     @secure_communication()
     def set_goto_pos(self, position, goto):
         """Sets the goto value at position to goto
@@ -767,6 +960,7 @@ class AWG(VisaInstrument):
 
         """
         self.write('WLIST:WAVEFORM:DELETE ALL')
+        self.waveforms.forget()
 
     def clear_all_sequences(self):
         """Clear the all sequences played by the AWG.
@@ -18,6 +18,7 @@ from pyvisa import VisaTypeError
 from ..driver_tools import (InstrIOError, instrument_property,
                             secure_communication)
 from ..visa_tools import VisaInstrument
+from ..list_sweep_tools import ListSweepMixin
 
 CONVERSION_FACTORS = {'GHz': {'Hz': 1e9, 'kHz': 1e6, 'MHz': 1e3, 'GHz': 1},
                       'MHz': {'Hz': 1e6, 'kHz': 1e3, 'MHz': 1, 'GHz': 1e-3},
@@ -25,7 +26,7 @@ CONVERSION_FACTORS = {'GHz': {'Hz': 1e9, 'kHz': 1e6, 'MHz': 1e3, 'GHz': 1},
                       'Hz': {'Hz': 1, 'kHz': 1e-3, 'MHz': 1e-6, 'GHz': 1e-9}}
 
 
-class SynthHD(VisaInstrument):
+class SynthHD(ListSweepMixin, VisaInstrument):
     """Driver for WindFreakTech's synthHD SignalGenerator.
 
     This driver does not give access to all the functionnality of the
@@ -60,6 +61,42 @@ class SynthHD(VisaInstrument):
         self.write_termination = ''
         self.read_termination = ''
 
+    #: The known values of the per-channel settings refer to the previously
+    #: selected channel.
+    shadow_state_couplings = {'channel': ('frequency', 'power', 'output')}
+
+    #: The sweep table can only be stepped by the hardware trigger input,
+    #: bus triggered lists are emulated.
+    list_sweep_triggers = ('external',)
+
+    @secure_communication()
+    def _upload_list_sweep(self, frequencies, powers, trigger):
+        """Load the list in the sweep table of the current channel.
+
+        Each rising edge on the trigger input moves to the next point.
+
+        """
+        if frequencies is None:
+            frequencies = [float(self.query('f?'))]*len(powers)
+        else:
+            factor = CONVERSION_FACTORS[self.frequency_unit]['MHz']
+            frequencies = [f*factor for f in frequencies]
+        if powers is None:
+            powers = [float(self.query('W?'))]*len(frequencies)
+        self.write(''.join('L{0}f{1:.7f}L{0}a{2:.3f}'.format(i, f, p)
+                           for i, (f, p) in enumerate(zip(frequencies,
+                                                          powers))))
+        # Terminate the table with a null frequency.
+        self.write('L{}f0'.format(len(frequencies)))
+        self.write('X1w2g1')
+
+    @secure_communication()
+    def _stop_hardware_list_sweep(self):
+        """Stop the sweep and go back to software triggering.
+
+        """
+        self.write('g0w0')
+
     @instrument_property
     @secure_communication()
     def channel(self):
@@ -89,6 +126,7 @@ class SynthHD(VisaInstrument):
         else:
             mes = 'Instrument did not return its channel'
             raise InstrIOError(mes)
+        self.record_state('channel', value)
 
     @instrument_property
     @secure_communication()
@@ -10,6 +10,7 @@ from ..visa_tools import VisaInstrument, errors
 
 
 import time
+import numpy as np
 import pyvisa
 from time import sleep
 from multiprocessing import Process
@@ -64,7 +65,10 @@ def setSource(thing, point) :
 
 
 class YokogawaGS200(VisaInstrument):
-    
+
+    #: Interval in seconds at which a running sweep checks for interruption.
+    SWEEP_CHECK_INTERVAL = 0.1
+
     @property
     def output(self):
         return self._output
@@ -153,6 +157,89 @@ class YokogawaGS200(VisaInstrument):
 
         return "success"
     
+    def sweep_list(self, values, function='VOLT', delay=0.0, nplc=1.0,
+                   compliance=None, should_stop=None):
+        """Run a hardware timed sweep over a list of set points.
+
+        The whole list is uploaded in the program memory and stepped by the
+        instrument internal timer. The GS200 cannot transfer measured values
+        so the column of the quantity which is not sourced is filled with NaN
+        and the time column is the programmed time of each step.
+
+        The messages are retried individually on failure, so that a
+        communication error does not restart the whole sweep.
+
+        Parameters
+        ----------
+        values : array-like
+            Set points of the sweep.
+        function : {'VOLT', 'CURR'}, optional
+            Quantity to source.
+        delay : float, optional
+            Time to spend on each point in addition to the integration time.
+        nplc : float, optional
+            Integration time in number of power line cycles, only used to
+            compute the step interval.
+        compliance : float, optional
+            Limit on the quantity which is not sourced.
+        should_stop : Callable, optional
+            Callable returning True if the sweep should be interrupted. It is
+            checked every `SWEEP_CHECK_INTERVAL` while the program runs.
+
+        Returns
+        -------
+        data : np.ndarray or None
+            Structured array with 'voltage', 'current' and 'time' fields, None
+            if the sweep was interrupted.
+
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        function = function.upper()[:4]
+        # The program interval cannot be shorter than 100 ms.
+        interval = max(0.1, float(delay) + float(nplc)/50)
+
+        write = self._secure_write
+        write('SOUR:FUNC ' + function)
+        if compliance is not None:
+            limit = 'CURR' if function == 'VOLT' else 'VOLT'
+            write('SOUR:PROT:{} {}'.format(limit, compliance))
+
+        # Each level sent while editing becomes a step, group them to limit
+        # the number of messages.
+        write('PROG:EDIT:STAR')
+        for i in range(0, len(values), 50):
+            write(';:'.join('SOUR:LEV {:.9g}'.format(v)
+                            for v in values[i:i+50]))
+        write('PROG:EDIT:END')
+        write('PROG:INT {}'.format(interval))
+        write('PROG:SLOP 0')
+        write('PROG:REP 0')
+        write('PROG:RUN')
+        end = time.monotonic() + interval*len(values)
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            if should_stop is not None and should_stop():
+                write('PROG:HALT')
+                return None
+            sleep(min(remaining, self.SWEEP_CHECK_INTERVAL))
+
+        data = np.empty(len(values), dtype=[('voltage', float),
+                                            ('current', float),
+                                            ('time', float)])
+        data['voltage' if function == 'VOLT' else 'current'] = values
+        data['current' if function == 'VOLT' else 'voltage'] = np.nan
+        data['time'] = interval*np.arange(len(values))
+        return data
+
+    @secure_communication()
+    def _secure_write(self, command):
+        """Write a command, retrying on communication errors.
+
+        """
+        self.write(command)
+
 #############################################################################################################
     def open_connection(self, **para):
         """Open the connection to the instr using the `connection_str`.
@@ -9,14 +9,17 @@
 """Base classes for instrument relying on the VISA protocol.
 
 """
+import time
+
 try:
     from pyvisa.highlevel import ResourceManager
-    from pyvisa import errors
+    from pyvisa import errors, constants
 except ImportError as e:
     msg = 'The PyVISA library is necessary to use the visa backend.'
     raise ImportError(msg) from e
 
 from .driver_tools import BaseInstrument, InstrIOError
+from .profiling_tools import profiled
 
 
 class VisaInstrument(BaseInstrument):
@@ -78,9 +81,33 @@ class VisaInstrument(BaseInstrument):
     trigger()
     read_raw()
 
+    write_state(*settings)
+        Write only the (header, value) settings which differ from the shadow
+        state (see `BaseInstrument`).
+
+    When profiling is enabled (see `profiling_tools`) the above methods record
+    their latency and payload size under the header of the message.
+
     """
     secure_com_except = (InstrIOError, errors.VisaIOError)
 
+    #: Message AVailable bit of the IEEE 488.2 status byte.
+    MAV = 0x10
+
+    #: Event Status Bit of the IEEE 488.2 status byte.
+    ESB = 0x20
+
+    #: Operation complete bit of the standard event status register.
+    OPC = 0x01
+
+    #: Interval (in s) at which the stop condition is checked while waiting
+    #: for an operation to complete.
+    completion_check_interval = 0.1
+
+    #: Timeout (in ms) used to drain the output queue of instruments whose
+    #: interface does not support serial polls.
+    drain_timeout = 100
+
     def __init__(self, connection_info, caching_allowed=True,
                  caching_permissions={}, auto_open=True):
         super(VisaInstrument, self).__init__(connection_info, caching_allowed,
@@ -88,6 +115,8 @@ class VisaInstrument(BaseInstrument):
         self.connection_str = connection_info['resource_name']
 
         self._driver = None
+        self._stb_supported = True
+        self._srq_enabled = None
         if auto_open:
             self.open_connection()
 
@@ -123,6 +152,9 @@ class VisaInstrument(BaseInstrument):
                 'read_termination': self._driver.read_termination,
                 }
         self._driver.close()
+        # The instrument state may have been altered by the failure.
+        self.forget_state()
+        self._srq_enabled = None
         self.open_connection(**para)
 
     def connected(self):
@@ -130,6 +162,7 @@ class VisaInstrument(BaseInstrument):
         """
         return bool(self._driver)
 
+    @profiled
     def write(self, message):
         """Send the specified message to the instrument.
 
@@ -138,6 +171,21 @@ class VisaInstrument(BaseInstrument):
         """
         self._driver.write(message)
 
+    def write_state(self, *settings):
+        """Write the settings whose value is not known to be already set.
+
+        Parameters
+        ----------
+        settings : tuple(str, str)
+            Pairs of SCPI header and value, written in order as
+            '<header> <value>'. The header is used as shadow state key.
+
+        """
+        for header, value in settings:
+            self.apply_state(header, value,
+                             lambda v: self.write('{} {}'.format(header, v)))
+
+    @profiled
     def read(self):
         """Read one line of the instrument's buffer.
 
@@ -146,6 +194,7 @@ class VisaInstrument(BaseInstrument):
         """
         return self._driver.read()
 
+    @profiled
     def read_values(self, format=0):
         """Read one line of the instrument's buffer and convert to values.
 
@@ -154,6 +203,7 @@ class VisaInstrument(BaseInstrument):
         """
         return self._driver.read_values(format=0)
 
+    @profiled
     def read_ascii_values(self, converter='f', separator=','):
         """Read one line of the instrument's buffer and convert to values.
 
@@ -164,6 +214,7 @@ class VisaInstrument(BaseInstrument):
         """
         return self._driver.read_ascii_values(converter, separator)
 
+    @profiled
     def read_binary_values(self, datatype='f', is_big_endian=False):
         """Read one line of the instrument's buffer and convert to values.
 
@@ -174,6 +225,7 @@ class VisaInstrument(BaseInstrument):
         """
         return self._driver.read_binary_values(datatype, is_big_endian)
 
+    @profiled
     def query(self, message):
         """Send the specified message to the instrument and read its answer.
 
@@ -182,6 +234,7 @@ class VisaInstrument(BaseInstrument):
         """
         return self._driver.query(message)
 
+    @profiled
     def query_ascii_values(self, message, converter='f', separator=','):
         """Send the specified message to the instrument and convert its answer
         to values.
@@ -194,17 +247,22 @@ class VisaInstrument(BaseInstrument):
         """
         return self._driver.query_ascii_values(message, converter, separator)
 
-    def query_binary_values(self, message, datatype='f', is_big_endian=False):
+    @profiled
+    def query_binary_values(self, message, datatype='f', is_big_endian=False,
+                            container=list):
         """Send the specified message to the instrument and convert its answer
         to values.
 
         By default assume the values are returned as ascii.
 
         Simply call the `query_binary_values` method of the `Instrument` object
-        stored in the attribute `_driver`
+        stored in the attribute `_driver`. Passing `numpy.array` as container
+        allows to decode the block without going through a Python list.
 
         """
-        return self._driver.query_binary_values(message, datatype, is_big_endian)
+        return self._driver.query_binary_values(message, datatype,
+                                                is_big_endian,
+                                                container=container)
 
     def clear(self):
         """Resets the device (highly bus dependent).
@@ -222,6 +280,7 @@ class VisaInstrument(BaseInstrument):
         """
         return self._driver.assert_trigger()
 
+    @profiled
     def read_raw(self):
         """Read one line of the instrument buffer and return without stripping
         termination caracters.
@@ -231,6 +290,7 @@ class VisaInstrument(BaseInstrument):
         """
         return self._driver.read_raw()
 
+    @profiled
     def read_bytes(self, count, chunk_size=None, break_on_termchar=False):
         """Read a certain amount of bytes from the instrument buffer.
 
@@ -239,6 +299,167 @@ class VisaInstrument(BaseInstrument):
         """
         return self._driver.read_bytes(count, chunk_size, break_on_termchar)
 
+    def output_available(self):
+        """Whether the output queue of the instrument contains data.
+
+        The MAV bit of the status byte is read using a serial poll, which does
+        not require to wait for a timeout.
+
+        Returns
+        -------
+        available : bool or None
+            None if the interface does not support serial polls.
+
+        """
+        if not self._stb_supported:
+            return None
+        try:
+            return bool(self._driver.read_stb() & self.MAV)
+        except errors.VisaIOError as e:
+            unsupported = constants.StatusCode.error_nonsupported_operation
+            if e.error_code != unsupported:
+                raise
+            self._stb_supported = False
+            return None
+
+    def drain_output(self, max_reads=100):
+        """Discard the data waiting in the output queue of the instrument.
+
+        Messages are read only while the MAV bit of the status byte is set,
+        so that no time is spent waiting for a timeout when the queue is
+        empty. On interfaces not supporting serial polls, the queue is read
+        until a read times out, using a short `drain_timeout`.
+
+        Parameters
+        ----------
+        max_reads : int, optional
+            Maximal number of messages to discard.
+
+        Returns
+        -------
+        discarded : int
+            Number of messages discarded.
+
+        """
+        discarded = 0
+        available = self.output_available()
+        if available is None:
+            timeout = self.timeout
+            self.timeout = self.drain_timeout
+            try:
+                while discarded < max_reads:
+                    self._driver.read_raw()
+                    discarded += 1
+            except errors.VisaIOError:
+                pass
+            finally:
+                self.timeout = timeout
+            return discarded
+
+        while available:
+            if discarded >= max_reads:
+                raise InstrIOError('The output queue of {} could not be '
+                                   'emptied.'.format(self.connection_str))
+            self._driver.read_raw()
+            discarded += 1
+            available = self.output_available()
+        return discarded
+
+    def wait_for_operation(self, command, timeout=None, should_stop=None):
+        """Send a command and wait for the operations it starts to complete.
+
+        The command is followed by `*OPC`, which sets the operation complete
+        bit of the event status register once all pending operations are
+        over. The instrument is configured to request service when this
+        happens, so that completion is detected by waiting on the VISA
+        service request event without any bus traffic. If the interface does
+        not support service requests, the event status register is polled
+        instead.
+
+        Parameters
+        ----------
+        command : str
+            Command starting the operation (acquisition, sweep, ...).
+        timeout : float, optional
+            Maximal time to wait in seconds. By default wait indefinitely.
+        should_stop : Callable, optional
+            Callable returning True if the wait should be interrupted. It is
+            checked every `completion_check_interval`.
+
+        Returns
+        -------
+        completed : bool
+            False if the wait was interrupted by should_stop.
+
+        """
+        srq = self._enable_srq()
+        if srq:
+            self._driver.discard_events(constants.EventType.service_request,
+                                        constants.EventMechanism.queue)
+        # Clear the event status register of previous completions.
+        self.event_status()
+        self.write(command)
+        self.write('*OPC')
+
+        interval = self.completion_check_interval
+        start = time.monotonic()
+        while True:
+            if should_stop is not None and should_stop():
+                return False
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise InstrIOError('{} did not complete {} in {} s'
+                                       .format(self.connection_str, command,
+                                               timeout))
+                wait = min(interval, remaining)
+            else:
+                wait = interval
+
+            if srq:
+                response = self._driver.wait_on_event(
+                    constants.EventType.service_request, int(wait*1000),
+                    capture_timeout=True)
+                if response.timed_out:
+                    continue
+                # Reading the status byte clears the service request.
+                if not self._driver.read_stb() & self.ESB:
+                    continue
+            else:
+                time.sleep(wait)
+            if self.event_status() & self.OPC:
+                return True
+
+    def event_status(self):
+        """Read (and clear) the standard event status register.
+
+        Instruments sending response headers (such as `*ESR 1`) are
+        supported by parsing the last token of the answer.
+
+        """
+        return int(self.query('*ESR?').split()[-1])
+
+    def _enable_srq(self):
+        """Configure the instrument to request service on operation complete.
+
+        Returns
+        -------
+        enabled : bool
+            Whether service requests can be used with this interface.
+
+        """
+        if self._srq_enabled is None:
+            try:
+                self._driver.enable_event(constants.EventType.service_request,
+                                          constants.EventMechanism.queue)
+            except (errors.VisaIOError, NotImplementedError):
+                self._srq_enabled = False
+            else:
+                self.write('*ESE {}'.format(self.OPC))
+                self.write('*SRE {}'.format(self.ESB))
+                self._srq_enabled = True
+        return self._srq_enabled
+
     def _timeout(self):
         return self._driver.timeout
 
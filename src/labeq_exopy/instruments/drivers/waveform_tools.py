@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Tools to avoid re-uploading waveforms already stored in an AWG.
+
+Each AWG has a registry mapping the name (or slot) of the waveforms it stores
+to a hash of their content, their length and, if the instrument provides it,
+the time at which they were last modified. The registries are shared by all
+the drivers connected to the same instrument, so that waveforms uploaded
+during a measurement are not sent again during the next one if they did not
+change.
+
+:Contains:
+    waveform_digest :
+        Compute the hash of the content of a waveform.
+    WaveformRegistry :
+        Waveforms known to be stored in an instrument.
+    get_waveform_registry :
+        Access the registry of an instrument.
+
+"""
+import hashlib
+from threading import Lock
+
+
+def waveform_digest(waveform):
+    """Compute the hash of the content of a waveform.
+
+    Parameters
+    ----------
+    waveform : bytes, bytearray, str or buffer
+        Content of the waveform as sent to the instrument.
+
+    """
+    if isinstance(waveform, str):
+        waveform = waveform.encode('latin-1')
+    return hashlib.blake2b(memoryview(waveform), digest_size=16).digest()
+
+
+class WaveformRegistry(object):
+    """Waveforms known to be stored in an instrument.
+
+    """
+    def __init__(self):
+        self._waveforms = {}
+        self._lock = Lock()
+
+    def __contains__(self, name):
+        return name in self._waveforms
+
+    def names(self):
+        """Names of the registered waveforms.
+
+        """
+        with self._lock:
+            return list(self._waveforms)
+
+    def length(self, name):
+        """Length of a registered waveform.
+
+        """
+        return self._waveforms[name][1]
+
+    def timestamp(self, name):
+        """Modification time reported by the instrument for a waveform.
+
+        """
+        return self._waveforms[name][2]
+
+    def is_stored(self, name, digest):
+        """Whether the waveform with the given content is stored under name.
+
+        """
+        entry = self._waveforms.get(name)
+        return entry is not None and entry[0] == digest
+
+    def record(self, name, digest, length, timestamp=None):
+        """Record that a waveform was stored under name.
+
+        """
+        with self._lock:
+            self._waveforms[name] = (digest, length, timestamp)
+
+    def forget(self, *names):
+        """Forget the specified waveforms or all of them.
+
+        """
+        with self._lock:
+            if names:
+                for name in names:
+                    self._waveforms.pop(name, None)
+            else:
+                self._waveforms.clear()
+
+
+_REGISTRIES = {}
+
+_REGISTRIES_LOCK = Lock()
+
+
+def get_waveform_registry(instrument_id):
+    """Access the registry of an instrument, creating it if necessary.
+
+    Parameters
+    ----------
+    instrument_id : str
+        Identifier of the instrument, such as its VISA resource name.
+
+    """
+    with _REGISTRIES_LOCK:
+        if instrument_id not in _REGISTRIES:
+            _REGISTRIES[instrument_id] = WaveformRegistry()
+        return _REGISTRIES[instrument_id]
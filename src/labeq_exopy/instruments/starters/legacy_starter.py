@@ -12,6 +12,8 @@
 from exopy.utils.traceback import format_exc
 from exopy.instruments.api import BaseStarter
 
+from ..drivers.profiling_tools import profiler
+
 
 class LegacyStarter(BaseStarter):
     """Starter for legacy instruments.
@@ -50,9 +52,11 @@ class LegacyStarter(BaseStarter):
         driver.clear_cache()
 
     def stop(self, driver):
-        """Close the connection.
+        """Close the connection and dump the driver profile if any.
 
         """
+        if profiler.enabled:
+            profiler.dump(driver)
         driver.close_connection()
 
     def format_connection_infos(self, infos):
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Compiled evaluation of the formulas used by tasks in their hot path.
+
+`format_and_eval_string` parses the formula and compiles the resulting
+expression each time it is called. Tasks evaluating the same formulas at each
+iteration of a loop can instead compile them once, the first time they are
+evaluated during a measurement, into a code object and the list of the
+database entries they reference. Formulas made only of literals are
+evaluated only once.
+
+:Contains:
+    CompiledFormula :
+        Formula compiled against the database of a running measurement.
+    FormulaCacheMixin :
+        Mixin giving access to compiled formulas to tasks.
+
+"""
+import ast
+import numbers
+
+from atom.api import Atom, Typed
+
+from exopy.tasks.tasks.string_evaluation import safe_eval
+
+
+#: Prefix of the names under which the database values are passed to the
+#: compiled expressions.
+PREFIX = '_formula_entry_'
+
+#: Types of the constant values which can safely be shared between calls.
+IMMUTABLE_TYPES = (numbers.Number, str, bytes, type(None))
+
+
+class CompiledFormula(object):
+    """Formula compiled against the database of a running measurement.
+
+    Parameters
+    ----------
+    formula : str
+        Formula in which database entries are referenced between braces.
+    path : str
+        Path of the task evaluating the formula.
+    database : TaskDatabase
+        Database of the running measurement.
+
+    """
+    __slots__ = ('formula', 'code', 'indexes', 'constant', 'value')
+
+    def __init__(self, formula, path, database):
+        self.formula = formula
+        elements = [el for aux in formula.split('{') for el in aux.split('}')]
+        entries = elements[1::2]
+        if entries:
+            indexes = database.get_entries_indexes(path, entries)
+            elements[1::2] = [PREFIX + str(indexes[e]) for e in entries]
+            self.indexes = list(indexes.values())
+        else:
+            self.indexes = []
+        expression = ''.join(elements).strip()
+        self.code = compile(expression, formula, 'eval')
+
+        # Only literals can be folded, a formula such as 'time.time()' must
+        # be evaluated each time.
+        self.constant = False
+        self.value = None
+        if not self.indexes:
+            try:
+                value = ast.literal_eval(expression)
+            except (ValueError, SyntaxError):
+                pass
+            else:
+                if isinstance(value, IMMUTABLE_TYPES):
+                    self.constant = True
+                    self.value = value
+
+    def evaluate(self, database):
+        """Evaluate the formula using the current values of the database.
+
+        """
+        if self.constant:
+            return self.value
+        if self.indexes:
+            return safe_eval(self.code,
+                             database.get_values_by_index(self.indexes,
+                                                          PREFIX))
+        return safe_eval(self.code, {})
+
+
+class FormulaCacheMixin(Atom):
+    """Mixin for tasks evaluating the same formulas at each execution.
+
+    The formulas are compiled on their first evaluation during a measurement
+    and the compiled formulas are discarded each time the task is checked, as
+    the database may have changed. Outside of a measurement the evaluation
+    falls back to `format_and_eval_string`.
+
+    """
+    #: Formulas compiled during the current measurement.
+    _formulas = Typed(dict, ())
+
+    def check(self, *args, **kwargs):
+        """Discard the formulas compiled for a previous measurement.
+
+        """
+        self._formulas = {}
+        return super(FormulaCacheMixin, self).check(*args, **kwargs)
+
+    def eval_formula(self, formula):
+        """Evaluate a formula, compiling it on first use.
+
+        """
+        try:
+            compiled = self._formulas[formula]
+        except KeyError:
+            database = self.database
+            if not database.running:
+                return self.format_and_eval_string(formula)
+            compiled = CompiledFormula(formula, self.path, database)
+            self._formulas[formula] = compiled
+        return compiled.evaluate(self.database)
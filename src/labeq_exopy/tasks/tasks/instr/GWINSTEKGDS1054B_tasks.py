@@ -1,11 +1,12 @@
-from time import sleep
 
 from atom.api import Float, set_default
 
 from exopy.tasks.api import InstrumentTask
 
+from ..settling import SettlingTaskMixin
 
-class MeasMeanTask(InstrumentTask):
+
+class MeasMeanTask(SettlingTaskMixin, InstrumentTask):
     """Measure a dc current.
 
     Wait for any parallel operation before execution and then wait the
@@ -23,9 +24,7 @@ class MeasMeanTask(InstrumentTask):
         """Wait and read the DC current.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_mean()
+        value = self.settle(self.driver.read_mean, self.wait_time)
         self.write_in_database('mean', value)
 
 class RampCursorTask(InstrumentTask):
@@ -18,7 +18,9 @@ from atom.api import (Enum, Float, set_default,Bool,Str)
 
 from exopy.tasks.api import InstrumentTask
 
-class LakeshoreTC340MeasureTask(InstrumentTask):
+from ..settling import SettlingTaskMixin
+
+class LakeshoreTC340MeasureTask(SettlingTaskMixin, InstrumentTask):
     #: Input value to retrieve.
     MeasInput = Enum('A', 'B').tag(pref=True)
     #: Time to wait before performing the measurement.
@@ -33,11 +35,11 @@ class LakeshoreTC340MeasureTask(InstrumentTask):
 
     def perform(self):
         #measurement selection
+        value = self.settle(
+            lambda: self.driver.measure_temperature(self.MeasInput))
         if self.MeasInput == 'A':
-            value = self.driver.measure_temperature(self.MeasInput)
             self.write_in_database('A_Temp', value)
         elif self.MeasInput == 'B':
-            value = self.driver.measure_temperature(self.MeasInput)
             self.write_in_database('B_Temp', value)
         
         #Wait for the last operation to finish
@@ -13,8 +13,10 @@ from atom.api import Float, Str, Enum, set_default
 
 from exopy.tasks.api import InstrumentTask, InterfaceableTaskMixin
 
+from ..settling import SettlingTaskMixin
 
-class ReadSupplyFieldTask(InstrumentTask):
+
+class ReadSupplyFieldTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read the current field supply of the system. This value corresponds 
     to "Field (T)" on the iPS UI. It represents the maximum field strength that
@@ -37,12 +39,10 @@ class ReadSupplyFieldTask(InstrumentTask):
         """Wait and read the supply field.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_supply_field()
+        value = self.settle(self.driver.read_supply_field, self.wait_time)
         self.write_in_database('ips_supply_field', value)
 
-class ReadSupplyFieldRateTask(InstrumentTask):
+class ReadSupplyFieldRateTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read the Supply field rate of the system in T/min. This value gives
     the target rate of change of the supply field during ramping. 
@@ -62,12 +62,10 @@ class ReadSupplyFieldRateTask(InstrumentTask):
         """Wait and read the magnetic field.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_supply_field_rate()
+        value = self.settle(self.driver.read_supply_field_rate, self.wait_time)
         self.write_in_database('mag_field_setpoint', value)
 
-class ReadMagnetFieldTask(InstrumentTask):
+class ReadMagnetFieldTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read the magnetic field strength produced by the energized SC coils. 
     This value corresponds to "Magnet (T)" on the iPS UI. This value is the 
@@ -90,12 +88,10 @@ class ReadMagnetFieldTask(InstrumentTask):
         """Wait and read the magnetic field produced by SC coils.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_magnet_field()
+        value = self.settle(self.driver.read_magnet_field, self.wait_time)
         self.write_in_database('magnet_field', value)
 
-class ReadSupplyVoltageTask(InstrumentTask):
+class ReadSupplyVoltageTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read voltage supplied by magnet PSU in units of volts (V).
     
@@ -114,12 +110,10 @@ class ReadSupplyVoltageTask(InstrumentTask):
         """Wait and read the supply voltage.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_supply_voltage()
+        value = self.settle(self.driver.read_supply_voltage, self.wait_time)
         self.write_in_database('ips_supply_voltage', value)
 
-class ReadSupplyCurrentTask(InstrumentTask):
+class ReadSupplyCurrentTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read current supplied by magnet PSU in units of Amps (A).
     
@@ -138,12 +132,10 @@ class ReadSupplyCurrentTask(InstrumentTask):
         """Wait and read the supply current.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_supply_current()
+        value = self.settle(self.driver.read_supply_current, self.wait_time)
         self.write_in_database('ips_supply_current', value)
 
-class ReadSupplyCurrentRateTask(InstrumentTask):
+class ReadSupplyCurrentRateTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read supply current rate provided by PSU in units of volts per min (A/min).
     
@@ -162,12 +154,10 @@ class ReadSupplyCurrentRateTask(InstrumentTask):
         """Wait and read the supply current rate.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_supply_current_rate()
+        value = self.settle(self.driver.read_supply_current_rate, self.wait_time)
         self.write_in_database('ips_supply_current_rate', value)
 
-class ReadMagnetCurrentTask(InstrumentTask):
+class ReadMagnetCurrentTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read the current circulating through the magnet coils in units of Amps (A).
     
@@ -186,12 +176,10 @@ class ReadMagnetCurrentTask(InstrumentTask):
         """Wait and read the magnet current.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_supply_current()
+        value = self.settle(self.driver.read_supply_current, self.wait_time)
         self.write_in_database('ips_magnet_current', value)
 
-class ReadTargetCurrentTask(InstrumentTask):
+class ReadTargetCurrentTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read target current in units of Amps (A). The target current is a 
     quantity stored in memory. It is the amount of current that the 
@@ -212,9 +200,7 @@ class ReadTargetCurrentTask(InstrumentTask):
         """Wait and read the target current.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_target_current()
+        value = self.settle(self.driver.read_target_current, self.wait_time)
         self.write_in_database('ips_target_current', value)
 
 class SetTargetCurrentTask(InstrumentTask):
@@ -245,7 +231,7 @@ class SetTargetCurrentTask(InstrumentTask):
         self.driver.set_target_current(value)
         self.write_in_database('ips_target_current', value)
 
-class ReadTargetCurrentRateTask(InstrumentTask):
+class ReadTargetCurrentRateTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read target current rate in units of Amps/minute (A/m). The target 
     current rate is a quantity stored in memory. It is the rate at which the 
@@ -266,9 +252,7 @@ class ReadTargetCurrentRateTask(InstrumentTask):
         """Wait and read the target current rate.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_target_current_rate()
+        value = self.settle(self.driver.read_target_current_rate, self.wait_time)
         self.write_in_database('ips_target_current_rate', value)
 
 class SetTargetCurrentRateTask(InstrumentTask):
@@ -299,7 +283,7 @@ class SetTargetCurrentRateTask(InstrumentTask):
         self.driver.set_target_current_rate(value)
         self.write_in_database('ips_target_current_rate', value)
 
-class ReadTargetFieldTask(InstrumentTask):
+class ReadTargetFieldTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read target field in units of Tesla (T). The target field is a
     quantity stored in memory. It's an implicit target current. When the
@@ -322,9 +306,7 @@ class ReadTargetFieldTask(InstrumentTask):
         """Wait and read the target field.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_target_field()
+        value = self.settle(self.driver.read_target_field, self.wait_time)
         self.write_in_database('ips_target_field', value)
 
 class SetTargetFieldTask(InstrumentTask):
@@ -355,7 +337,7 @@ class SetTargetFieldTask(InstrumentTask):
         self.driver.set_target_field(value)
         self.write_in_database('ips_target_field', value)
 
-class ReadTargetFieldRateTask(InstrumentTask):
+class ReadTargetFieldRateTask(SettlingTaskMixin, InstrumentTask):
     """     
         Read target field rate in units of Tesla/minute (T/m). The target field
     rate is a quantity stored in memory. It's an implicit target current rate. 
@@ -377,9 +359,7 @@ class ReadTargetFieldRateTask(InstrumentTask):
         """Wait and read the target field rate.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_target_field_rate()
+        value = self.settle(self.driver.read_target_field_rate, self.wait_time)
         self.write_in_database('ips_target_field_rate', value)
 
 class SetTargetFieldRateTask(InstrumentTask):
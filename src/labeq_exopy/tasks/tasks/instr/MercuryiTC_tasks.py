@@ -11,7 +11,9 @@ from time import sleep
 from atom.api import Float, Str, Enum, set_default
 from exopy.tasks.api import InstrumentTask, InterfaceableTaskMixin, TaskInterface
 
-class ReadVTITemperatureTask(InstrumentTask):
+from ..settling import SettlingTaskMixin
+
+class ReadVTITemperatureTask(SettlingTaskMixin, InstrumentTask):
     """
         Read the VTI temperature. 
 
@@ -30,8 +32,7 @@ class ReadVTITemperatureTask(InstrumentTask):
         """Wait and read the temperature.
 
         """
-        sleep(self.wait_time)
-        value = self.driver.read_VTI_temp()
+        value = self.settle(self.driver.read_VTI_temp, self.wait_time)
         self.write_in_database('vti_temp', value)
 
 class SetVTITemperatureTask(InstrumentTask):
@@ -62,7 +63,7 @@ class SetVTITemperatureTask(InstrumentTask):
         self.driver.set_VTI_temp(value)
         self.write_in_database('vti_temp_setpoint', value)
 
-class ReadVTIPressureTask(InstrumentTask):
+class ReadVTIPressureTask(SettlingTaskMixin, InstrumentTask):
     """
         Read the VTI pressure. 
 
@@ -82,8 +83,7 @@ class ReadVTIPressureTask(InstrumentTask):
         Wait and read the pressure.
 
         """
-        sleep(self.wait_time)
-        value = self.driver.read_VTI_pres()
+        value = self.settle(self.driver.read_VTI_pres, self.wait_time)
         self.write_in_database('vti_pres', value)
 
 class SetVTIPressureTask(InstrumentTask):
@@ -114,7 +114,7 @@ class SetVTIPressureTask(InstrumentTask):
         self.driver.set_VTI_pres(value)
         self.write_in_database('vti_pres_setpoint', value)
 
-class ReadVTIValvePercentageTask(InstrumentTask):
+class ReadVTIValvePercentageTask(SettlingTaskMixin, InstrumentTask):
     """
         Read the VTI valve percentage. 
 
@@ -134,11 +134,10 @@ class ReadVTIValvePercentageTask(InstrumentTask):
         Wait and read the valve percentage.
 
         """
-        sleep(self.wait_time)
-        value = self.driver.read_VTI_valv_perc()
+        value = self.settle(self.driver.read_VTI_valv_perc, self.wait_time)
         self.write_in_database('vti_valve_perc', value)
 
-class ReadProbeTemperatureTask(InstrumentTask):
+class ReadProbeTemperatureTask(SettlingTaskMixin, InstrumentTask):
     """
         Read probe temperature.
 
@@ -157,10 +156,7 @@ class ReadProbeTemperatureTask(InstrumentTask):
         """Wait and read the temperature.
 
         """
-        sleep(self.wait_time)
-
-        
-        value = self.driver.read_probe_temp()
+        value = self.settle(self.driver.read_probe_temp, self.wait_time)
         self.write_in_database('probe_temp', value)
 
 class SetProbeTemperatureTask(InstrumentTask):
@@ -13,7 +13,9 @@ from atom.api import Float, Str, Enum, set_default
 
 from exopy.tasks.api import InstrumentTask, InterfaceableTaskMixin
 
-class NFLockInMeasureTask(InstrumentTask):
+from ..settling import SettlingTaskMixin
+
+class NFLockInMeasureTask(SettlingTaskMixin, InstrumentTask):
     """ Measure lock in output"""
 
     # Time to wait before execution
@@ -25,9 +27,8 @@ class NFLockInMeasureTask(InstrumentTask):
 
     def perform(self):
         
-        sleep(self.wait_time)
-
-        num = self.driver.measure(self.val)
+        num = self.settle(lambda: self.driver.measure(self.val),
+                          self.wait_time)
         self.write_in_database('val', num)
 
 
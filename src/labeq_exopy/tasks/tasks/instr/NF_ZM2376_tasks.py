@@ -13,6 +13,8 @@ from atom.api import Float, Str, Enum, set_default
 
 from exopy.tasks.api import InstrumentTask, InterfaceableTaskMixin
 
+from ..settling import SettlingTaskMixin
+
 class ZM2376_SetFrequencyTask(InstrumentTask):
 
 
@@ -33,7 +35,7 @@ class ZM2376_SetFrequencyTask(InstrumentTask):
         self.driver.set_frequency(freq_setpoint)
         self.write_in_database('val', freq_setpoint)
 
-class ZM2376_MeasureTask(InstrumentTask):
+class ZM2376_MeasureTask(SettlingTaskMixin, InstrumentTask):
 
     # Time to wait before execution
     wait_time = Float().tag(pref=True)
@@ -47,11 +49,10 @@ class ZM2376_MeasureTask(InstrumentTask):
 
     def perform(self):
         
-        sleep(self.wait_time)
-
         params = [self.pri, self.sec]
 
-        pri_val, sec_val = self.driver.fetch_measurements(params)
+        pri_val, sec_val = self.settle(
+            lambda: self.driver.fetch_measurements(params), self.wait_time)
 
         self.write_in_database('pri', pri_val)
         self.write_in_database('sec', sec_val)
\ No newline at end of file
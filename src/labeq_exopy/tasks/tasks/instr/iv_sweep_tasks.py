@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Task to acquire an IV curve using the sweep capabilities of a source.
+
+"""
+import numbers
+
+import numpy as np
+from atom.api import (Enum, Str, set_default)
+
+from exopy.tasks.api import InstrumentTask, validators
+
+from labeq_exopy.instruments.drivers.visa.keithley_multimeters import (
+    Keithley2400)
+
+VAL_REAL = validators.Feval(types=numbers.Real)
+
+EMPTY_REAL = validators.SkipEmpty(types=numbers.Real)
+
+#: Maximal number of set points of a sweep for the drivers having a limit.
+MAX_SWEEP_POINTS = {'labeq_exopy.Legacy.Keithley2400':
+                    Keithley2400.MAX_SWEEP_POINTS}
+
+#: Layout of the array returned by the sweep.
+IV_DTYPE = np.dtype([('voltage', float), ('current', float), ('time', float)])
+
+
+class IVSweepTask(InstrumentTask):
+    """Sweep the output of a source through a list of points in one go.
+
+    The whole list of set points is uploaded to the instrument which steps
+    through it on its own timing, and the (V, I, t) readings are retrieved in
+    a single transfer instead of building the curve with one source task and
+    one measure task per point.
+
+    Wait for any parallel operation before execution.
+
+    """
+    #: Quantity to source.
+    source = Enum('Voltage', 'Current').tag(pref=True)
+
+    #: Set points of the sweep (should evaluate to a 1D array).
+    setpoints = Str().tag(pref=True, feval=validators.Feval())
+
+    #: Time to wait after setting a point before measuring (s).
+    source_delay = Str('0.0').tag(pref=True, feval=VAL_REAL)
+
+    #: Integration time in number of power line cycles.
+    nplc = Str('1.0').tag(pref=True, feval=VAL_REAL)
+
+    #: Compliance on the measured quantity (left unchanged if empty).
+    compliance = Str().tag(pref=True, feval=EMPTY_REAL)
+
+    database_entries = set_default({'iv': np.zeros(1, dtype=IV_DTYPE)})
+
+    wait = set_default({'activated': True, 'wait': ['instr']})
+
+    def check(self, *args, **kwargs):
+        """Check that the set points form a non empty list of numbers which
+        the instrument can store.
+
+        """
+        test, traceback = super(IVSweepTask, self).check(*args, **kwargs)
+
+        if not test or not self.setpoints:
+            return test, traceback
+
+        points = self.format_and_eval_string(self.setpoints)
+        try:
+            points = np.asarray(points, dtype=float).ravel()
+        except (TypeError, ValueError):
+            points = np.zeros(0)
+        max_points = MAX_SWEEP_POINTS.get(self.selected_instrument[1]
+                                          if self.selected_instrument
+                                          else None)
+        if not len(points):
+            test = False
+            msg = 'The set points should evaluate to a list of numbers.'
+            traceback[self.get_error_path() + '-setpoints'] = msg
+        elif max_points and len(points) > max_points:
+            test = False
+            msg = 'The instrument cannot sweep more than {} points, not {}.'
+            traceback[self.get_error_path() + '-setpoints'] = \
+                msg.format(max_points, len(points))
+        else:
+            self.write_in_database('iv', np.zeros(len(points), dtype=IV_DTYPE))
+
+        return test, traceback
+
+    def perform(self):
+        """Upload the set points, run the sweep and store the readings.
+
+        """
+        points = np.asarray(self.format_and_eval_string(self.setpoints),
+                            dtype=float).ravel()
+        compliance = (self.format_and_eval_string(self.compliance)
+                      if self.compliance else None)
+
+        data = self.driver.sweep_list(
+            points, 'VOLT' if self.source == 'Voltage' else 'CURR',
+            self.format_and_eval_string(self.source_delay),
+            self.format_and_eval_string(self.nplc), compliance,
+            self.root.should_stop.is_set)
+
+        if data is not None:
+            self.write_in_database('iv', data)
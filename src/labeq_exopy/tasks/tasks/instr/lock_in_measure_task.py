@@ -9,14 +9,14 @@
 """Task to perform a lock-in measurement.
 
 """
-from time import sleep
-
 from atom.api import (Enum, Float, set_default)
 
 from exopy.tasks.api import InstrumentTask
 
+from ..settling import SettlingTaskMixin
+
 
-class LockInMeasureTask(InstrumentTask):
+class LockInMeasureTask(SettlingTaskMixin, InstrumentTask):
     """Ask a lock-in to perform a measure.
 
     Wait for any parallel operationbefore execution.
@@ -36,33 +36,34 @@ class LockInMeasureTask(InstrumentTask):
         """Wait and query the last value in the instrument buffer.
 
         """
-        sleep(self.waiting_time)
         #measurement selection
         if self.MeasMode == 'X':
-            value = self.driver.read_x()
+            value = self.settle(self.driver.read_x, self.waiting_time)
             self.write_in_database('x', value)
         elif self.MeasMode == 'Y':
-            value = self.driver.read_y()
+            value = self.settle(self.driver.read_y, self.waiting_time)
             self.write_in_database('y', value)
         elif self.MeasMode == 'X&Y':
-            value_x, value_y = self.driver.read_xy()
+            value_x, value_y = self.settle(self.driver.read_xy,
+                                           self.waiting_time)
             self.write_in_database('x', value_x)
             self.write_in_database('y', value_y)
         elif self.MeasMode == 'Amp':
-            value = self.driver.read_amplitude()
+            value = self.settle(self.driver.read_amplitude, self.waiting_time)
             self.write_in_database('amplitude', value)
         elif self.MeasMode == 'Theta':
-            value = self.driver.read_theta()
+            value = self.settle(self.driver.read_theta, self.waiting_time)
             self.write_in_database('theta', value)
         elif self.MeasMode == 'Amp&Theta':
-            amplitude, theta = self.driver.read_amp_and_theta()
+            amplitude, theta = self.settle(self.driver.read_amp_and_theta,
+                                           self.waiting_time)
             self.write_in_database('amplitude', amplitude)
             self.write_in_database('theta', theta)
         elif self.MeasMode == 'Freq':
-            value = self.driver.read_frequency()
+            value = self.settle(self.driver.read_frequency, self.waiting_time)
             self.write_in_database('frequency', value)
         elif self.MeasMode == 'Phase':
-            value = self.driver.read_phase()
+            value = self.settle(self.driver.read_phase, self.waiting_time)
             self.write_in_database('phase', value)
 
     def _post_setattr_MeasMode(self, old, new):
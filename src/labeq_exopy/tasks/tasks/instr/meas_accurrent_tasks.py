@@ -9,14 +9,15 @@
 """Task to measure AC current.
 
 """
-from time import sleep
 
 from atom.api import Float, set_default
 
 from exopy.tasks.api import InstrumentTask
 
+from ..settling import SettlingTaskMixin
 
-class MeasACCurrentTask(InstrumentTask):
+
+class MeasACCurrentTask(SettlingTaskMixin, InstrumentTask):
     """Measure an ac current.
 
     Wait for any parallel operation before execution and then wait the
@@ -34,7 +35,5 @@ class MeasACCurrentTask(InstrumentTask):
         """Wait and read the AC current.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_current_ac()
+        value = self.settle(self.driver.read_current_ac, self.wait_time)
         self.write_in_database('currentAC', value)
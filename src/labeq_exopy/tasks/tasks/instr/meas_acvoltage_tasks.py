@@ -9,14 +9,15 @@
 """Task to measure DC current.
 
 """
-from time import sleep
 
 from atom.api import Float, set_default
 
 from exopy.tasks.api import InstrumentTask
 
+from ..settling import SettlingTaskMixin
 
-class MeasACVoltageTask(InstrumentTask):
+
+class MeasACVoltageTask(SettlingTaskMixin, InstrumentTask):
     """Measure an AC voltaage.
 
     Wait for any parallel operation before execution and then wait the
@@ -34,7 +35,5 @@ class MeasACVoltageTask(InstrumentTask):
         """Wait and read the AC Voltgae.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_voltage_ac()
+        value = self.settle(self.driver.read_voltage_ac, self.wait_time)
         self.write_in_database('voltageAC', value)
@@ -9,14 +9,15 @@
 """Task to measure DC properties.
 
 """
-from time import sleep
 
 from atom.api import Float, set_default
 
 from exopy.tasks.api import InstrumentTask
 
+from ..settling import SettlingTaskMixin
 
-class MeasDCVoltageTask(InstrumentTask):
+
+class MeasDCVoltageTask(SettlingTaskMixin, InstrumentTask):
     """Measure a dc voltage.
 
     Wait for any parallel operation before execution and then wait the
@@ -34,7 +35,5 @@ class MeasDCVoltageTask(InstrumentTask):
         """Wait and read the DC voltage.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_voltage_dc()
+        value = self.settle(self.driver.read_voltage_dc, self.wait_time)
         self.write_in_database('voltageDC', value)
@@ -9,14 +9,15 @@
 """Task to measure DC current.
 
 """
-from time import sleep
 
 from atom.api import Float, set_default
 
 from exopy.tasks.api import InstrumentTask
 
+from ..settling import SettlingTaskMixin
 
-class MeasDCCurrentTask(InstrumentTask):
+
+class MeasDCCurrentTask(SettlingTaskMixin, InstrumentTask):
     """Measure a dc current.
 
     Wait for any parallel operation before execution and then wait the
@@ -34,7 +35,5 @@ class MeasDCCurrentTask(InstrumentTask):
         """Wait and read the DC current.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_current_dc()
+        value = self.settle(self.driver.read_current_dc, self.wait_time)
         self.write_in_database('currentDC', value)
@@ -9,14 +9,15 @@
 """Task to measure four wire resistance.
 
 """
-from time import sleep
 
 from atom.api import Float, set_default, Str, Enum
 
 from exopy.tasks.api import (InterfaceableTaskMixin, InstrumentTask, TaskInterface)
 
+from ..settling import SettlingTaskMixin
 
-class MeasFourResistanceTask(InterfaceableTaskMixin, InstrumentTask):
+
+class MeasFourResistanceTask(SettlingTaskMixin, InterfaceableTaskMixin, InstrumentTask):
     """Measure a four wire resistance.
 
     Wait for any parallel operation before execution and then wait the
@@ -34,9 +35,7 @@ class MeasFourResistanceTask(InterfaceableTaskMixin, InstrumentTask):
         """Wait and read the resistance.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_four_resistance()
+        value = self.settle(self.driver.read_four_resistance, self.wait_time)
         self.write_in_database('four_resistance', value)
 
 class Keithley2400MeasFourResistanceInterface(TaskInterface):
@@ -10,14 +10,15 @@
 
 """
 from statistics import mode
-from time import sleep
 
 from atom.api import Float, set_default, Str, Enum
 
 from exopy.tasks.api import (InterfaceableTaskMixin, InstrumentTask, TaskInterface)
 
+from ..settling import SettlingTaskMixin
 
-class MeasTwoResistanceTask(InterfaceableTaskMixin, InstrumentTask):
+
+class MeasTwoResistanceTask(SettlingTaskMixin, InterfaceableTaskMixin, InstrumentTask):
     """Measure a two wire resistance.
 
     Wait for any parallel operation before execution and then wait the
@@ -35,9 +36,7 @@ class MeasTwoResistanceTask(InterfaceableTaskMixin, InstrumentTask):
         """Wait and read the two wire resistance.
 
         """
-        sleep(self.wait_time)
-
-        value = self.driver.read_two_resistance()
+        value = self.settle(self.driver.read_two_resistance, self.wait_time)
         self.write_in_database('two_resistance', value)
 
 class Keithley2400MeasTwoResistanceInterface(TaskInterface):
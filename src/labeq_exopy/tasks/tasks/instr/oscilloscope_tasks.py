@@ -58,4 +58,61 @@ class OscilloGetTraceTask(InstrumentTask):
             arr = np.rec.fromarrays([data['SEQNCEWaveformTimesValuesArray'],
                                      data['Volt_Value_array']],
                                     names=['Time (s)', 'Voltage (V)'])
-            self.write_in_database('trace_data', )
+            self.write_in_database('trace_data', arr)
+
+
+class OscilloSegmentedTraceTask(InstrumentTask):
+    """Acquire a trace in sequence mode and read all its segments at once.
+
+    The segments are stored as a (segments, samples) array along with the
+    time axis of a segment and the trigger time of each segment. They can
+    also be reduced on the computer before being stored.
+
+    """
+    #: Channel to collect from the oscilloscope
+    trace = Enum('1', '2', '3', '4').tag(pref=True)
+
+    #: Number of segments to acquire.
+    segments = Str('10').tag(pref=True,
+                             feval=validators.Feval(types=numbers.Integral))
+
+    #: Maximal memory length used by the acquisition (ex: 10K, 1M).
+    max_size = Str('10K').tag(pref=True)
+
+    #: Should high resolution (16 bits) transfer be used.
+    highres = Bool(True).tag(pref=True)
+
+    #: Reduction applied to the segments before storing them.
+    reduction = Enum('None', 'Average segments',
+                     'Segment means').tag(pref=True)
+
+    database_entries = set_default({'trace_data': np.array([[1.0]]),
+                                    'time': np.array([1.0]),
+                                    'trigger_times': np.array([1.0])})
+
+    def perform(self):
+        """Acquire the segments and store them.
+
+        """
+        if self.driver.owner != self.name:
+            self.driver.owner = self.name
+
+        segments = self.format_and_eval_string(self.segments)
+        self.driver.sequence(segments, self.max_size)
+        if not self.driver.acquire_single(
+                should_stop=self.root.should_stop.is_set):
+            return
+
+        channel = self.driver.get_channel(self.trace)
+        waveform = channel.read_segments(self.highres)
+
+        if self.reduction == 'Average segments':
+            data = waveform.average()
+        elif self.reduction == 'Segment means':
+            data = waveform.segment_means()
+        else:
+            data = waveform.volts()
+
+        self.write_in_database('trace_data', data)
+        self.write_in_database('time', waveform.time)
+        self.write_in_database('trigger_times', waveform.trigger_times)
@@ -20,6 +20,9 @@ from atom.api import (Str, Int, Bool, Enum, set_default,
 
 from exopy.tasks.api import InstrumentTask, TaskInterface, validators
 
+from labeq_exopy.instruments.drivers.visa.agilent_pna import (
+    format_complex_data)
+
 
 def check_channels_presence(task, channels, *args, **kwargs):
     """ Check that all the channels are correctly defined on the PNA.
@@ -231,10 +234,9 @@ class PNASinglePointMeasureTask(SingleChannelPNATask):
                 self.channel_driver.sweep_mode = 'CONTinuous'
 
         if self.if_bandwidth < 5:
-            self.driver.fire_trigger(self.channel)
-            time.sleep(waiting_time)
-            while not self.driver.check_operation_completion():
-                time.sleep(0.1*waiting_time)
+            if not self.driver.trigger_and_wait(
+                    self.channel, should_stop=self.root.should_stop.is_set):
+                return
         else:
             time.sleep(waiting_time)
 
@@ -372,11 +374,9 @@ class PNASweepTask(SingleChannelPNATask):
                 self.channel_driver.prepare_sweep('POWER',
                                                   start, stop, points)
 
-        waiting_time = self.channel_driver.sweep_time
-        self.driver.fire_trigger(self.channel)
-        time.sleep(waiting_time)
-        while not self.driver.check_operation_completion():
-            time.sleep(0.1*waiting_time)
+        if not self.driver.trigger_and_wait(
+                self.channel, should_stop=self.root.should_stop.is_set):
+            return
 
         data = [np.linspace(start, stop, points)]
         for i, meas_name in enumerate(meas_names):
@@ -452,7 +452,8 @@ class PNAGetTraces(InstrumentTask):
 
         """
         channel_driver = self.driver.get_channel(channelnb)
-        channel_driver.run_averaging()
+        channel_driver.run_averaging(
+            should_stop=self.root.should_stop.is_set)
 
     def get_trace(self, channelnb, tracenb):
         """Get the trace that is displayed right now (no new acquisition)
@@ -468,18 +469,15 @@ class PNAGetTraces(InstrumentTask):
                                       {}: '''.format(tracenb, channelnb)))
 
         measname = channel_driver.selected_measure
-        data = channel_driver.sweep_x_axis
-        complexdata = (channel_driver.read_raw_data(measname) *
-                       np.exp(2*np.pi*1j*data*channel_driver.electrical_delay))
-        aux = [data, complexdata.real, complexdata.imag,
-               np.absolute(complexdata),
-               np.unwrap(np.angle(complexdata))]
-
-        return np.rec.fromarrays(aux, names=[str('Freq (GHz)'),
-                                             str(measname+' real'),
-                                             str(measname+' imag'),
-                                             str(measname+' abs'),
-                                             str(measname+' phase')])
+        freq = channel_driver.sweep_x_axis
+        raw = channel_driver.read_raw_data(measname)
+        delay = channel_driver.electrical_delay
+
+        names = [str(measname+' real'), str(measname+' imag'),
+                 str(measname+' abs'), str(measname+' phase')]
+        return format_complex_data(raw, ('REAL', 'IMAG', 'MLIN', 'UPHAS'),
+                                   names, x_axis=freq,
+                                   x_name=str('Freq (GHz)'), delay=delay)
 
     def check(self, *args, **kwargs):
         """Create meaningful database entries.
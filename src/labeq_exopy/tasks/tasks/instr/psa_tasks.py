@@ -51,7 +51,10 @@ class PSAGetTrace(InstrumentTask):
                                    d.sweep_points_SA, sweep_modes[self.mode])
 
         self.write_in_database('psa_config', psa_config)
-        self.write_in_database('trace_data', self.driver.read_data(self.trace))
+        data = self.driver.read_data(self.trace,
+                                     should_stop=self.root.should_stop.is_set)
+        if data is not None:
+            self.write_in_database('trace_data', data)
 
     def check(self, *args, **kwargs):
         """Validate the provided trace number.
@@ -67,6 +70,142 @@ class PSAGetTrace(InstrumentTask):
         return test, traceback
 
 
+class SpectrumAccumulator(object):
+    """Running mean, variance and maximum of a series of spectra.
+
+    The statistics are updated in place in preallocated buffers using
+    Welford's algorithm.
+
+    Parameters
+    ----------
+    points : int
+        Number of points of the spectra.
+
+    """
+    def __init__(self, points):
+        self.count = 0
+        self.mean = np.zeros(points)
+        self.max_hold = np.full(points, -np.inf)
+        self._m2 = np.zeros(points)
+        self._delta = np.empty(points)
+        self._aux = np.empty(points)
+
+    def add(self, spectrum):
+        """Update the statistics with a new spectrum.
+
+        """
+        self.count += 1
+        delta = self._delta
+        aux = self._aux
+        np.subtract(spectrum, self.mean, out=delta)
+        np.multiply(delta, 1.0/self.count, out=aux)
+        self.mean += aux
+        np.subtract(spectrum, self.mean, out=aux)
+        aux *= delta
+        self._m2 += aux
+        np.maximum(self.max_hold, spectrum, out=self.max_hold)
+
+    @property
+    def variance(self):
+        """Unbiased variance of the accumulated spectra.
+
+        """
+        if self.count < 2:
+            return np.zeros_like(self._m2)
+        return self._m2/(self.count - 1)
+
+
+class PSAStreamSpectrumTask(InstrumentTask):
+    """Acquire many spectra and store only their statistics.
+
+    The PSA sweeps back to back and each trace is folded into the running
+    mean, variance and maximum of the spectra, so that a single reduced result
+    is written in the database however many sweeps are acquired. A decimated
+    waterfall of the individual traces can optionally be kept.
+
+    """
+    #: Number of the trace to read.
+    trace = Int(1).tag(pref=True)
+
+    #: Number of sweeps to acquire.
+    sweeps = Str('100').tag(pref=True, feval=validators.Feval(
+        types=numbers.Integral))
+
+    #: Keep one trace every n sweeps in the waterfall (0 to disable it).
+    waterfall_decimation = Int(0).tag(pref=True)
+
+    database_entries = set_default({'frequency': np.array([1.0]),
+                                    'mean': np.array([1.0]),
+                                    'variance': np.array([1.0]),
+                                    'max_hold': np.array([1.0]),
+                                    'sweeps': 0})
+
+    def perform(self):
+        """Acquire the spectra and write their statistics in the database.
+
+        """
+        if self.driver.owner != self.name:
+            self.driver.owner = self.name
+
+        sweeps = self.format_and_eval_string(self.sweeps)
+        freq = self.driver.frequency_axis()
+        acc = SpectrumAccumulator(len(freq))
+        decimation = self.waterfall_decimation
+        if decimation:
+            waterfall = np.empty((-(-sweeps//decimation), len(freq)),
+                                 dtype=np.float32)
+
+        stream = self.driver.stream_trace(self.trace, sweeps,
+                                          self.root.should_stop.is_set)
+        for i, spectrum in enumerate(stream):
+            acc.add(spectrum)
+            if decimation and not i % decimation:
+                waterfall[i//decimation] = spectrum
+
+        self.write_in_database('frequency', freq)
+        self.write_in_database('mean', acc.mean)
+        self.write_in_database('variance', acc.variance)
+        self.write_in_database('max_hold', acc.max_hold)
+        self.write_in_database('sweeps', acc.count)
+        if decimation:
+            rows = -(-acc.count//decimation)
+            self.write_in_database('waterfall', waterfall[:rows])
+
+    def check(self, *args, **kwargs):
+        """Validate the trace number, the decimation and the PSA mode.
+
+        """
+        test, traceback = super(PSAStreamSpectrumTask, self).check(*args,
+                                                                   **kwargs)
+        err_path = self.get_error_path()
+        if kwargs.get('test_instr') and self.driver.mode != 'SA':
+            test = False
+            traceback[err_path] = 'PSA is not in Spectrum Analyzer mode'
+
+        if self.trace > 4 or self.trace < 1:
+            test = False
+            msg = 'Trace number should be 1, 2, 3 or 4 not {}'
+            traceback[err_path + '-trace'] = msg.format(self.trace)
+
+        if self.waterfall_decimation < 0:
+            test = False
+            traceback[err_path + '-waterfall_decimation'] = \
+                'The waterfall decimation cannot be negative.'
+
+        return test, traceback
+
+    def _post_setattr_waterfall_decimation(self, old, new):
+        """Add or remove the waterfall entry.
+
+        """
+        entries = self.database_entries.copy()
+        if new:
+            entries['waterfall'] = np.array([[1.0]])
+        else:
+            entries.pop('waterfall', None)
+        self.database_entries = entries
+
+
 EMPTY_REAL = validators.SkipEmpty(types=numbers.Real)
 
 EMPTY_INT = validators.SkipEmpty(types=numbers.Integral)
@@ -11,11 +11,13 @@
 """
 import numbers
 
-from atom.api import (Str, Bool, set_default, Enum)
+from atom.api import (Str, Bool, Value, set_default, Enum)
 
 from exopy.tasks.api import (InstrumentTask, InterfaceableTaskMixin,
                             validators)
 
+from ..formulas import FormulaCacheMixin
+
 CONVERSION_FACTORS = {'GHz': {'Hz': 1e9, 'kHz': 1e6, 'MHz': 1e3, 'GHz': 1},
                       'MHz': {'Hz': 1e6, 'kHz': 1e3, 'MHz': 1, 'GHz': 1e-3},
                       'kHz': {'Hz': 1e3, 'kHz': 1, 'MHz': 1e-3, 'GHz': 1e-6},
@@ -25,7 +27,61 @@ CONVERSION_FACTORS = {'GHz': {'Hz': 1e9, 'kHz': 1e6, 'MHz': 1e3, 'GHz': 1},
 LOOP_REAL = validators.SkipLoop(types=numbers.Real)
 
 
-class SetRFFrequencyTask(InterfaceableTaskMixin, InstrumentTask):
+class SetterPlan(object):
+    """Precomputed steps used by a task to set a driver property.
+
+    The plan is built by the task on its first execution, and bound to the
+    driver it is applied to. The value applied is recorded in the shadow state of the
+    driver (under the name of the property, expressed in a unit independent
+    of the task settings) so that a value identical to the one currently
+    applied does not cause any communication with the instrument.
+
+    Parameters
+    ----------
+    name : str
+        Name of the driver property to set.
+    factor : float, optional
+        Factor converting the values to the unit used to compare them. None
+        for values which are not numbers.
+    attributes : dict, optional
+        Attributes of the driver to set before setting the property (such as
+        the frequency unit).
+
+    """
+    __slots__ = ('name', 'factor', 'attributes', 'driver', 'setter')
+
+    def __init__(self, name, factor=None, attributes=None):
+        self.name = name
+        self.factor = factor
+        self.attributes = attributes or {}
+        self.driver = None
+        self.setter = None
+
+    def apply(self, driver, value):
+        """Set the property to value unless it already has this value.
+
+        Returns
+        -------
+        sent : bool
+            Whether the value was sent to the instrument.
+
+        """
+        if driver is not self.driver:
+            self.driver = driver
+            self.setter = getattr(type(driver), self.name).__set__
+        driver_attrs = driver.__dict__
+        for attr, attr_value in self.attributes.items():
+            if driver_attrs.get(attr) != attr_value:
+                setattr(driver, attr, attr_value)
+
+        setter = self.setter
+        state = value*self.factor if self.factor is not None else value
+        return driver.apply_state(self.name, state,
+                                  lambda _: setter(driver, value))
+
+
+class SetRFFrequencyTask(FormulaCacheMixin, InterfaceableTaskMixin,
+                         InstrumentTask):
     """Set the frequency of the signal delivered by a RF source.
 
     """
@@ -40,13 +96,17 @@ class SetRFFrequencyTask(InterfaceableTaskMixin, InstrumentTask):
 
     database_entries = set_default({'frequency': 1.0, 'unit': 'GHz'})
 
+    #: Execution plans used to set the frequency and start the source.
+    _plans = Value()
+
     def check(self, *args, **kwargs):
-        """Add the unit into the database.
+        """Add the unit into the database and discard the execution plans.
 
         """
         test, traceback = super(SetRFFrequencyTask, self).check(*args,
                                                                 **kwargs)
         self.write_in_database('unit', self.unit)
+        self._plans = None
 
         return test, traceback
 
@@ -54,14 +114,22 @@ class SetRFFrequencyTask(InterfaceableTaskMixin, InstrumentTask):
         """Default interface for simple sources.
 
         """
+        driver = self.driver
+        if self._plans is None:
+            self._plans = (SetterPlan('frequency',
+                                      CONVERSION_FACTORS[self.unit]['Hz'],
+                                      {'frequency_unit': self.unit}),
+                           SetterPlan('output'))
+        frequency_plan, output_plan = self._plans
         if self.auto_start:
-            self.driver.output = 'On'
+            output_plan.apply(driver, 'On')
 
         if frequency is None:
-            frequency = self.format_and_eval_string(self.frequency)
+            frequency = self.eval_formula(self.frequency)
 
-        self.driver.frequency_unit = self.unit
-        self.driver.frequency = frequency
+        if getattr(driver, 'list_sweep_active', False):
+            driver.stop_list_sweep()
+        frequency_plan.apply(driver, frequency)
         self.write_in_database('frequency', frequency)
 
     def convert(self, frequency, unit):
@@ -82,8 +150,15 @@ class SetRFFrequencyTask(InterfaceableTaskMixin, InstrumentTask):
         """
         return frequency*CONVERSION_FACTORS[self.unit][unit]
 
+    def _post_setattr_unit(self, old, new):
+        """Discard the execution plans which depend on the unit.
 
-class SetRFPowerTask(InterfaceableTaskMixin, InstrumentTask):
+        """
+        self._plans = None
+
+
+class SetRFPowerTask(FormulaCacheMixin, InterfaceableTaskMixin,
+                     InstrumentTask):
     """Set the power of the signal delivered by the source.
 
     """
@@ -95,17 +170,35 @@ class SetRFPowerTask(InterfaceableTaskMixin, InstrumentTask):
 
     database_entries = set_default({'power': -10})
 
+    #: Execution plans used to set the power and start the source.
+    _plans = Value()
+
+    def check(self, *args, **kwargs):
+        """Discard the execution plans.
+
+        """
+        test, traceback = super(SetRFPowerTask, self).check(*args, **kwargs)
+        self._plans = None
+
+        return test, traceback
+
     def i_perform(self, power=None):
         """
 
         """
+        driver = self.driver
+        if self._plans is None:
+            self._plans = (SetterPlan('power'), SetterPlan('output'))
+        power_plan, output_plan = self._plans
         if self.auto_start:
-            self.driver.output = 'On'
+            output_plan.apply(driver, 'On')
 
         if power is None:
-            power = self.format_and_eval_string(self.power)
+            power = self.eval_formula(self.power)
 
-        self.driver.power = power
+        if getattr(driver, 'list_sweep_active', False):
+            driver.stop_list_sweep()
+        power_plan.apply(driver, power)
         self.write_in_database('power', power)
 
 
@@ -194,3 +287,77 @@ class SetPulseModulationTask(InterfaceableTaskMixin, InstrumentTask):
         else:
             self.driver.pm_state = 'Off'
             self.write_in_database('pm_state', 0)
+
+
+class LoadRFListSweepTask(InterfaceableTaskMixin, InstrumentTask):
+    """Load a list of frequencies and/or powers in the source.
+
+    The source is then moved from one point to the next using
+    AdvanceRFListSweepTask. Sources having a list mode receive the whole list
+    at once and are stepped by a single trigger, for the others each point is
+    set individually.
+
+    """
+    # Frequencies of the points (dynamically evaluated, empty to keep the
+    # frequency fixed).
+    frequencies = Str().tag(pref=True, feval=validators.SkipEmpty())
+
+    # Unit of the frequencies
+    unit = Enum('GHz', 'MHz', 'kHz', 'Hz').tag(pref=True)
+
+    # Powers of the points in dBm (dynamically evaluated, empty to keep the
+    # power fixed).
+    powers = Str().tag(pref=True, feval=validators.SkipEmpty())
+
+    # Source of the trigger moving to the next point. With an external
+    # trigger AdvanceRFListSweepTask only tracks the current point.
+    trigger = Enum('Bus', 'External').tag(pref=True)
+
+    database_entries = set_default({'points': 1, 'unit': 'GHz'})
+
+    def check(self, *args, **kwargs):
+        """Check that at least one list is specified.
+
+        """
+        test, traceback = super(LoadRFListSweepTask, self).check(*args,
+                                                                 **kwargs)
+        if not self.frequencies and not self.powers:
+            test = False
+            traceback[self.get_error_path() + '-lists'] =\
+                'At least a list of frequencies or powers must be specified.'
+        self.write_in_database('unit', self.unit)
+
+        return test, traceback
+
+    def i_perform(self):
+        """Default interface for simple sources.
+
+        """
+        frequencies = (self.format_and_eval_string(self.frequencies)
+                       if self.frequencies else None)
+        powers = (self.format_and_eval_string(self.powers)
+                  if self.powers else None)
+
+        self.driver.frequency_unit = self.unit
+        points = self.driver.load_list_sweep(frequencies, powers,
+                                             self.trigger.lower())
+        self.write_in_database('points', points)
+
+
+class AdvanceRFListSweepTask(InterfaceableTaskMixin, InstrumentTask):
+    """Move the source to the next point of the loaded list.
+
+    """
+    database_entries = set_default({'index': 0, 'frequency': 1.0,
+                                    'power': -10})
+
+    def i_perform(self):
+        """Default interface for simple sources.
+
+        """
+        index, frequency, power = self.driver.next_list_point()
+        self.write_in_database('index', index)
+        if frequency is not None:
+            self.write_in_database('frequency', frequency)
+        if power is not None:
+            self.write_in_database('power', power)
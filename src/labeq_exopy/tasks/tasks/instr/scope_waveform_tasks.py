@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Task reading the waveforms of an oscilloscope and computing statistics.
+
+"""
+import numpy as np
+from atom.api import Str, Bool, set_default
+
+from exopy.tasks.api import InstrumentTask
+
+from labeq_exopy.instruments.drivers.scope_tools import (STATISTICS,
+                                                         waveform_statistics)
+
+
+class ReadScopeWaveformsTask(InstrumentTask):
+    """Read the waveforms of several channels and compute their statistics.
+
+    All the channels are read in a single pass, each waveform being
+    transferred once in binary format, and the statistics (mean, rms, min,
+    max, amplitude, frequency and period) are computed from the transferred
+    samples instead of being queried one by one from the instrument.
+
+    """
+    #: Channels to read, separated by commas.
+    channels = Str('1').tag(pref=True)
+
+    #: Whether to store the waveforms in addition to their statistics.
+    save_waveforms = Bool(False).tag(pref=True)
+
+    database_entries = set_default({'ch1_' + name: 1.0
+                                    for name in STATISTICS})
+
+    def perform(self):
+        """Read the waveforms and write their statistics in the database.
+
+        """
+        waveforms = self.driver.read_waveforms(self._channel_nums())
+        for num, waveform in waveforms.items():
+            prefix = 'ch{}_'.format(num)
+            for name, value in waveform_statistics(waveform).items():
+                self.write_in_database(prefix + name, value)
+            if self.save_waveforms:
+                arr = np.rec.fromarrays([waveform.time, waveform.volts()],
+                                        names=['Time (s)', 'Voltage (V)'])
+                self.write_in_database(prefix + 'waveform', arr)
+
+    def check(self, *args, **kwargs):
+        """Validate the list of channels.
+
+        """
+        test, traceback = super(ReadScopeWaveformsTask, self).check(*args,
+                                                                    **kwargs)
+        try:
+            nums = self._channel_nums()
+        except ValueError:
+            nums = None
+        if not nums:
+            test = False
+            msg = 'Channels should be integers separated by commas not {}'
+            traceback[self.get_error_path() + '-channels'] = \
+                msg.format(self.channels)
+
+        return test, traceback
+
+    def _channel_nums(self):
+        """Numbers of the channels to read.
+
+        """
+        return [int(ch) for ch in self.channels.split(',') if ch.strip()]
+
+    def _update_entries(self):
+        """Update the database entries to match the channels.
+
+        """
+        try:
+            nums = self._channel_nums()
+        except ValueError:
+            return
+        entries = {}
+        for num in nums:
+            prefix = 'ch{}_'.format(num)
+            for name in STATISTICS:
+                entries[prefix + name] = 1.0
+            if self.save_waveforms:
+                entries[prefix + 'waveform'] = np.array([1.0])
+        self.database_entries = entries
+
+    def _post_setattr_channels(self, old, new):
+        """Update the database entries when the channels change.
+
+        """
+        self._update_entries()
+
+    def _post_setattr_save_waveforms(self, old, new):
+        """Add or remove the waveform entries.
+
+        """
+        self._update_entries()
@@ -18,6 +18,8 @@ from exopy.utils.traceback import format_exc
 from exopy.tasks.api import (InstrumentTask, InterfaceableTaskMixin,
                             InstrTaskInterface)
 
+from ..formulas import FormulaCacheMixin
+
 # XXX unfinished
 
 class AnalogicalParameters(HasPrefAtom):
@@ -126,8 +128,13 @@ class AWGChannelParameters(HasPrefAtom):
         return new
 
 
-class SetAWGParametersTask(InterfaceableTaskMixin, InstrumentTask):
+class SetAWGParametersTask(FormulaCacheMixin, InterfaceableTaskMixin,
+                           InstrumentTask):
     """Set the parameters of the different channels of the AWG.
+
+    Only the parameters which changed since the last execution are sent to
+    the instrument.
+
     """
 
     _channels = Dict()
@@ -213,8 +220,17 @@ class TektroAWGParasInterface(AWGParasInterface):
 
     channels_specs = {1: (2, 1), 2: (2, 1), 3: (2, 1), 4: (2, 1)}
 
+    #: Driver settings corresponding to the parameters of the analogical port.
+    analogical_settings = ('vpp', 'offset', 'phase')
+
+    #: Driver settings corresponding to the parameters of the logical ports.
+    logical_settings = (('marker1_low_voltage', 'marker1_high_voltage',
+                         'marker1_delay'),
+                        ('marker2_low_voltage', 'marker2_high_voltage',
+                         'marker2_delay'))
+
     def perform(self):
-        """Set all channels parameters.
+        """Set all channels parameters in a single message.
 
         """
         task = self.task
@@ -224,42 +240,22 @@ class TektroAWGParasInterface(AWGParasInterface):
         if task.driver.owner != task.task_name:
             task.driver.owner = task.task_name
 
+        settings = {}
         for ch_id in self.channels_ids:
-            ch_dr = task.driver.get_channel(ch_id)
             ch = task._channels[ch_id]
+            ch_settings = {}
             if ch.active:
-                state = task.format_and_eval_string(ch.active)
-                ch_dr.output_state = state
-
-            analogic = ch.analogicals[0]
-            if analogic.parameter1:
-                amp = task.format_and_eval_string(analogic.parameter1)
-                ch_dr.vpp = amp
-            if analogic.parameter2:
-                off = task.format_and_eval_string(analogic.parameter2)
-                ch_dr.offset = off
-            if analogic.parameter3:
-                ph = task.format_and_eval_string(analogic.parameter3)
-                ch_dr.phase = ph
-
-            logical1 = ch.logicals[0]
-            if logical1.parameter1:
-                low = task.format_and_eval_string(logical1.parameter1)
-                ch_dr.marker1_low_voltage = low
-            if logical1.parameter2:
-                high = task.format_and_eval_string(logical1.parameter2)
-                ch_dr.marker1_high_voltage = high
-            if logical1.parameter3:
-                de = task.format_and_eval_string(logical1.parameter3)
-                ch_dr.marker1_delay = de
-
-            logical2 = ch.logicals[1]
-            if logical2.parameter1:
-                low = task.format_and_eval_string(logical2.parameter1)
-                ch_dr.marker2_low_voltage = low
-            if logical2.parameter2:
-                high = task.format_and_eval_string(logical2.parameter2)
-                ch_dr.marker2_high_voltage = high
-            if logical2.parameter3:
-                de = task.format_and_eval_string(logical2.parameter3)
-                ch_dr.marker2_delay = de
+                ch_settings['output_state'] = task.eval_formula(ch.active)
+
+            for names, para in zip((self.analogical_settings,) +
+                                   self.logical_settings,
+                                   ch.analogicals[:1] + ch.logicals[:2]):
+                for name, member in zip(names, ('parameter1', 'parameter2',
+                                                'parameter3')):
+                    formula = getattr(para, member)
+                    if formula:
+                        ch_settings[name] = task.eval_formula(formula)
+
+            settings[ch_id] = ch_settings
+
+        task.driver.apply_channels_settings(settings)
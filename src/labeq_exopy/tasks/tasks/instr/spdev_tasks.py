@@ -15,12 +15,14 @@ from atom.api import (Bool, Str, Enum, set_default)
 
 from exopy.tasks.api import InstrumentTask, validators
 
+from ..formulas import FormulaCacheMixin
+
 VAL_REAL = validators.Feval(types=numbers.Real)
 
 VAL_INT = validators.Feval(types=numbers.Integral)
 
 
-class DemodSPTask(InstrumentTask):
+class DemodSPTask(FormulaCacheMixin, InstrumentTask):
     """Get the averaged quadratures of the signal.
 
     """
@@ -138,12 +140,12 @@ class DemodSPTask(InstrumentTask):
         avg_bef_demod = self.average == 'Avg before demod'
         avg_aft_demod = self.average == 'Avg after demod'
 
-        num_loop = int(self.format_and_eval_string(self.num_loop))
-        records_number = self.format_and_eval_string(self.records_number)
+        num_loop = int(self.eval_formula(self.num_loop))
+        records_number = self.eval_formula(self.records_number)
         records_number *= num_loop
-        delay = self.format_and_eval_string(self.delay)*1e-9
-        duration = self.format_and_eval_string(self.duration)*1e-9
-        sampling_rate = self.format_and_eval_string(self.sampling_rate)
+        delay = self.eval_formula(self.delay)*1e-9
+        duration = self.eval_formula(self.duration)*1e-9
+        sampling_rate = self.eval_formula(self.sampling_rate)
 
         channels = (self.ch1_enabled, self.ch2_enabled)
 
@@ -155,8 +157,7 @@ class DemodSPTask(InstrumentTask):
 
             """
             ch = traces[index-1]
-            freq = self.format_and_eval_string(getattr(self,
-                                                       'freq_%d' % index))*1e6
+            freq = self.eval_formula(getattr(self, 'freq_%d' % index))*1e6
 
             # Remove points that do not belong to a full period.
             samples_per_period = int(sampling_rate/freq)
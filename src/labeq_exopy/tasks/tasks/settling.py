@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Tools to wait for a measured quantity to settle before recording it.
+
+Instead of sleeping for a fixed, worst-case, time before reading a value, a
+task can poll the quantity at a given interval and return as soon as the last
+readings agree within a tolerance, or wait for a multiple of the time constant
+of a lock-in amplifier.
+
+:Contains:
+    wait_for_settling :
+        Poll a quantity until it settles or a maximum time elapses.
+    SettlingTaskMixin :
+        Mixin giving access to the settling strategies to instrument tasks.
+
+"""
+import logging
+import time
+from collections import deque
+
+import numpy as np
+from atom.api import Atom, Enum, Float, Int
+
+
+#: Runtime dependency holding the classes of the drivers used by a measurement.
+DRIVERS = 'exopy.instruments.drivers'
+
+
+def _is_settled(readings, rel_tol, abs_tol):
+    """Check that the readings agree within the tolerances.
+
+    The spread of each quantity over the readings is compared to the largest
+    of the absolute tolerance and of the relative tolerance times the
+    magnitude of the last reading.
+
+    """
+    values = np.asarray(readings, dtype=float)
+    spread = values.max(axis=0) - values.min(axis=0)
+    tolerance = np.maximum(abs_tol, rel_tol*np.abs(values[-1]))
+    return bool(np.all(spread <= tolerance))
+
+
+def wait_for_settling(read, rel_tol=1e-3, abs_tol=0.0, window=3,
+                      interval=0.1, max_wait=10.0, min_wait=0.0, stop=None):
+    """Poll a quantity until it settles or a maximum time elapses.
+
+    Parameters
+    ----------
+    read : callable
+        Function returning the quantity (a number or a sequence of numbers).
+    rel_tol : float, optional
+        Relative tolerance on the spread of the readings in the window.
+    abs_tol : float, optional
+        Absolute tolerance on the spread of the readings in the window.
+    window : int, optional
+        Number of consecutive readings which must agree.
+    interval : float, optional
+        Time to wait between two readings in seconds.
+    max_wait : float, optional
+        Maximum time spent polling in seconds (not counting min_wait).
+    min_wait : float, optional
+        Time to wait before the first reading in seconds.
+    stop : threading.Event, optional
+        Event interrupting the waits when set.
+
+    Returns
+    -------
+    value :
+        Last reading.
+    settled : bool
+        Whether the convergence criterion was met.
+
+    """
+    _sleep(min_wait, stop)
+
+    readings = deque(maxlen=max(window, 1))
+    start = time.monotonic()
+    while True:
+        value = read()
+        readings.append(value)
+        if (len(readings) == readings.maxlen and
+                _is_settled(readings, rel_tol, abs_tol)):
+            return value, True
+
+        if (time.monotonic() - start + interval > max_wait or
+                (stop is not None and stop.is_set())):
+            return value, False
+
+        _sleep(interval, stop)
+
+
+def _sleep(duration, stop=None):
+    """Sleep, returning early if the stop event is set.
+
+    """
+    if duration <= 0:
+        return
+    if stop is not None:
+        stop.wait(duration)
+    else:
+        time.sleep(duration)
+
+
+class SettlingTaskMixin(Atom):
+    """Mixin giving access to the settling strategies to instrument tasks.
+
+    The task should call `settle` with the function reading the quantity and
+    the time it was configured to wait. In 'Fixed' mode this time is simply
+    waited, otherwise it is used as a minimal dead time.
+
+    'Adaptive' polls the quantity until the last `settling_window` readings
+    agree within the tolerances. 'Time constant' waits for a multiple of the
+    time constant reported by the driver (`read_time_constant`), which is
+    checked before the measurement starts.
+
+    """
+    #: Strategy used to wait for the quantity to settle.
+    settling = Enum('Fixed', 'Adaptive', 'Time constant').tag(pref=True)
+
+    #: Relative tolerance on the spread of the readings.
+    settling_rel_tol = Float(1e-3).tag(pref=True)
+
+    #: Absolute tolerance on the spread of the readings.
+    settling_abs_tol = Float(0.0).tag(pref=True)
+
+    #: Number of consecutive readings which must agree.
+    settling_window = Int(3).tag(pref=True)
+
+    #: Time between two readings in adaptive mode (s).
+    settling_interval = Float(0.1).tag(pref=True)
+
+    #: Multiple of the time constant to wait in time constant mode.
+    settling_tc_multiple = Float(5.0).tag(pref=True)
+
+    #: Maximum time to wait for the quantity to settle (s).
+    settling_max_wait = Float(10.0).tag(pref=True)
+
+    def check(self, *args, **kwargs):
+        """Check that the driver can report its time constant if needed.
+
+        """
+        test, traceback = super(SettlingTaskMixin, self).check(*args,
+                                                               **kwargs)
+        if self.settling != 'Time constant':
+            return test, traceback
+
+        if kwargs.get('test_instr') and self.driver is not None:
+            driver_cls = type(self.driver)
+        elif self.selected_instrument:
+            driver_cls = self.root.run_time.get(DRIVERS, {}).get(
+                self.selected_instrument[1])
+        else:
+            driver_cls = None
+        if (driver_cls is not None and
+                not hasattr(driver_cls, 'read_time_constant')):
+            test = False
+            msg = ('{} cannot report its time constant, use the Fixed or '
+                   'Adaptive settling.')
+            traceback[self.get_error_path() + '-settling'] = \
+                msg.format(driver_cls.__name__)
+
+        return test, traceback
+
+    def settle(self, read, wait_time=0.0):
+        """Wait for the quantity to settle and return its value.
+
+        Parameters
+        ----------
+        read : callable
+            Function reading the quantity on the instrument.
+        wait_time : float, optional
+            Time to wait in fixed mode, minimal dead time otherwise.
+
+        """
+        stop = self.root.should_stop
+        if self.settling == 'Fixed':
+            _sleep(wait_time, stop)
+            return read()
+
+        if self.settling == 'Time constant':
+            if not hasattr(self.driver, 'read_time_constant'):
+                msg = '{} cannot report its time constant'
+                raise ValueError(msg.format(type(self.driver).__name__))
+            tc = self.driver.read_time_constant()
+            _sleep(max(wait_time,
+                       min(self.settling_tc_multiple*tc,
+                           self.settling_max_wait)),
+                   stop)
+            return read()
+
+        value, settled = wait_for_settling(read, self.settling_rel_tol,
+                                           self.settling_abs_tol,
+                                           self.settling_window,
+                                           self.settling_interval,
+                                           self.settling_max_wait, wait_time,
+                                           stop)
+        if not settled and not stop.is_set():
+            logger = logging.getLogger(__name__)
+            logger.warning('%s: value did not settle within %s s, last '
+                           'reading %s', self.name, self.settling_max_wait,
+                           value)
+        return value
@@ -10,14 +10,18 @@
 
 """
 import os
+import logging
+from itertools import islice
 
 import numpy as np
 import h5py
-from atom.api import (Bool, Str, List, set_default)
+from atom.api import (Bool, Int, Str, List, Value, set_default)
 from past.builtins import basestring
 
 from exopy.tasks.api import SimpleTask, InterfaceableTaskMixin, TaskInterface
 
+from .save_tasks import COUNT_CALLS_DATASET
+
 
 def _make_array(names, dtypes='f8'):
     if isinstance(dtypes, basestring):
@@ -27,6 +31,122 @@ def _make_array(names, dtypes='f8'):
     return np.ones((5,), dtype=dtype)
 
 
+def _select_columns(data, columns):
+    """Select columns of a record array or of a plain array.
+
+    A 1D plain array is considered as a single column.
+
+    """
+    if data.dtype.names:
+        return data[[data.dtype.names[c] if isinstance(c, int) else c
+                     for c in columns]]
+    if data.ndim < 2:
+        if any(c not in (0, -1) for c in columns):
+            raise IndexError('Only the column 0 of a 1D array can be '
+                             'selected, not {}'.format(columns))
+        return data
+    return data[:, columns]
+
+
+def parse_rows(rows):
+    """Convert a 'start:stop:step' string into a slice (all rows if empty).
+
+    """
+    if not rows.strip():
+        return slice(None)
+    bounds = [int(b) if b.strip() else None for b in rows.split(':')]
+    if len(bounds) == 1:
+        return slice(bounds[0], bounds[0] + 1 if bounds[0] != -1 else None)
+    if len(bounds) > 3:
+        raise ValueError('Invalid rows selection {}'.format(rows))
+    return slice(*bounds)
+
+
+def parse_columns(columns):
+    """Convert a comma separated list of names or indexes into a list.
+
+    Returns None if no column is selected.
+
+    """
+    selected = [c.strip() for c in columns.split(',') if c.strip()]
+    if not selected:
+        return None
+    return [int(c) if c.lstrip('-').isdigit() else c for c in selected]
+
+
+class H5LazyArray(object):
+    """Array like proxy reading the selected rows of a HDF5 dataset on access.
+
+    The file is opened only when the data are accessed and only the requested
+    part of the dataset is read. Converting the proxy to a numpy array (for
+    example by using it in a numpy function) reads the whole selection.
+
+    Parameters
+    ----------
+    path : str
+        Path of the HDF5 file.
+    key : str
+        Name of the dataset.
+    rows : range
+        Rows of the dataset exposed by the proxy.
+    shape : tuple
+        Shape of a row of the dataset.
+    dtype : numpy.dtype
+        Type of the dataset.
+    swmr : bool
+        Whether to open the file in SWMR mode.
+
+    """
+    def __init__(self, path, key, rows, shape, dtype, swmr):
+        self.path = path
+        self.key = key
+        self.rows = rows
+        self.shape = (len(rows),) + tuple(shape)
+        self.dtype = dtype
+        self.swmr = swmr
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, item):
+        if not isinstance(item, tuple):
+            item = (item,)
+        first, rest = (item[0], item[1:]) if item else (slice(None), ())
+        if first is Ellipsis:
+            first, rest = slice(None), item
+        try:
+            selected = self.rows[first]
+        except TypeError:
+            # Fancy indexing: read the whole selection and index it.
+            return self[:][item]
+
+        reverse = False
+        if isinstance(selected, range):
+            if selected.step < 0:
+                selected = selected[::-1]
+                reverse = True
+            if len(selected):
+                selected = slice(selected.start, selected.stop, selected.step)
+            else:
+                selected = slice(0, 0)
+
+        with h5py.File(self.path, 'r', swmr=self.swmr) as f:
+            data = f[self.key][(selected,) + rest]
+        return data[::-1] if reverse else data
+
+    def __array__(self, dtype=None, copy=None):
+        data = self[:]
+        return data.astype(dtype) if dtype is not None else data
+
+    def __repr__(self):
+        return 'H5LazyArray({!r}, {!r}, shape={})'.format(self.path, self.key,
+                                                          self.shape)
+
+
 class LoadArrayTask(InterfaceableTaskMixin, SimpleTask):
     """ Load an array from the disc into the database.
 
@@ -40,6 +160,13 @@ class LoadArrayTask(InterfaceableTaskMixin, SimpleTask):
     #: Kind of file to load.
     selected_format = Str().tag(pref=True)
 
+    #: Rows to load as 'start:stop:step' (all if empty).
+    rows = Str().tag(pref=True, fmt=True)
+
+    #: Comma separated names or indexes of the columns (or datasets) to load
+    #: (all if empty).
+    columns = Str().tag(pref=True, fmt=True)
+
     database_entries = set_default({'array': _make_array(['var1', 'var2'])})
 
     def check(self, *args, **kwargs):
@@ -61,8 +188,22 @@ class LoadArrayTask(InterfaceableTaskMixin, SimpleTask):
                    'create it before this task is executed.')
             traceback[err_path + '-file'] = msg
 
+        try:
+            parse_rows(self.format_string(self.rows))
+        except Exception:
+            traceback[err_path + '-rows'] = \
+                'Invalid rows selection : {}'.format(self.rows)
+            return False, traceback
+
         return test, traceback
 
+    def get_selection(self):
+        """Get the selected rows as a slice and the selected columns.
+
+        """
+        return (parse_rows(self.format_string(self.rows)),
+                parse_columns(self.format_string(self.columns)))
+
 
 class CSVLoadInterface(TaskInterface):
     """Interface used to load CSV files.
@@ -81,18 +222,128 @@ class CSVLoadInterface(TaskInterface):
     #: if the file cannot be found when checks are run.
     c_names = List(Str()).tag(pref=True)
 
+    #: Number of rows parsed at once.
+    chunk_size = Int(100000).tag(pref=True)
+
     #: Class attr used in the UI.
     file_formats = ['CSV']
 
     def perform(self):
         """Load a file stored in csv format.
 
+        The file is parsed by chunks in a preallocated array, only the
+        selected rows and columns being converted. Files which cannot be
+        parsed this way (missing values for example) are loaded using
+        numpy.genfromtxt.
+
         """
         task = self.task
         folder = task.format_string(task.folder)
         filename = task.format_string(task.filename)
         full_path = os.path.join(folder, filename)
+        rows, columns = task.get_selection()
 
+        try:
+            data = self._load_chunks(full_path, rows, columns)
+        except ValueError:
+            logger = logging.getLogger(__name__)
+            logger.info('In %s, fast parsing of %s failed, falling back on '
+                        'genfromtxt.', task.name, full_path)
+            data = self._load_genfromtxt(full_path, rows, columns)
+
+        task.write_in_database('array', data)
+
+    def _skip_header(self, f):
+        """Skip the leading comments and read the names of the columns.
+
+        Returns
+        -------
+        lines : int
+            Number of lines skipped.
+        names : list or None
+            Names of the columns if the file has a names row.
+
+        """
+        lines = 0
+        while True:
+            line = f.readline()
+            lines += 1
+            if not line or not self.comments or\
+                    not line.startswith(self.comments):
+                break
+        if self.names:
+            return lines, [n.strip().replace(' ', '_')
+                           for n in line.split(self.delimiter) if n.strip()]
+        # The line is a data line, rewind to its start.
+        f.seek(0)
+        for _ in range(lines - 1):
+            f.readline()
+        return lines - 1, None
+
+    def _load_chunks(self, full_path, rows, columns):
+        """Parse the file chunk by chunk in a preallocated array.
+
+        """
+        with open(full_path, 'rb') as f:
+            lines_number = sum(buf.count(b'\n')
+                               for buf in iter(lambda: f.read(1 << 20), b''))
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    lines_number += 1
+
+        with open(full_path) as f:
+            skipped, names = self._skip_header(f)
+            usecols = None
+            if columns is not None:
+                usecols = [names.index(c) if isinstance(c, str) else c
+                           for c in columns]
+                if names:
+                    names = [names[i] for i in usecols]
+            if names:
+                dtype = np.dtype([(n, 'f8') for n in names])
+            else:
+                dtype = np.dtype('f8')
+
+            # Only parse the selected rows when they are contiguous and do not
+            # depend on the exact number of rows in the file.
+            data_lines = lines_number - skipped
+            if (rows.step in (None, 1) and (rows.start or 0) >= 0 and
+                    (rows.stop is None or rows.stop >= 0)):
+                start, stop, _ = rows.indices(data_lines)
+                source = islice(f, start, stop)
+                rows = slice(None)
+                data_lines = max(stop - start, 0)
+            else:
+                source = f
+
+            data = None
+            filled = 0
+            while True:
+                chunk_lines = list(islice(source, self.chunk_size))
+                if not chunk_lines:
+                    break
+                chunk = np.loadtxt(chunk_lines, dtype=dtype,
+                                   comments=self.comments or None,
+                                   delimiter=self.delimiter, usecols=usecols,
+                                   ndmin=1 if dtype.names else 2)
+                if data is None:
+                    data = np.empty((data_lines,) + chunk.shape[1:],
+                                    chunk.dtype)
+                data[filled:filled + len(chunk)] = chunk
+                filled += len(chunk)
+
+        if data is None:
+            data = np.empty((0,), dtype)
+        data = data[:filled][rows]
+        if not dtype.names and data.ndim == 2 and data.shape[1] == 1:
+            data = data[:, 0]
+        return data
+
+    def _load_genfromtxt(self, full_path, rows, columns):
+        """Load the file using numpy.genfromtxt.
+
+        """
         comment_lines = 0
         with open(full_path) as f:
             while True:
@@ -104,36 +355,53 @@ class CSVLoadInterface(TaskInterface):
         data = np.genfromtxt(full_path, comments=self.comments,
                              delimiter=self.delimiter, names=self.names,
                              skip_header=comment_lines)
-
-        task.write_in_database('array', data)
+        if columns is not None:
+            data = _select_columns(data, columns)
+        return data[rows]
 
     def check(self, *args, **kwargs):
         """Try to find the names of the columns to add the array in the
-        database.
+        database and validate the columns selected by name.
 
         """
         task = self.task
-        if self.c_names:
-            return True, {}
-
         try:
             full_folder_path = task.format_string(task.folder)
             filename = task.format_string(task.filename)
+            columns = parse_columns(task.format_string(task.columns))
         except Exception:
             return True, {}
 
         full_path = os.path.join(full_folder_path, filename)
 
+        header = None
         if os.path.isfile(full_path):
             with open(full_path) as f:
-                while True:
-                    line = f.readline()
-                    if not line.startswith(self.comments):
-                        names = line.split(self.delimiter)
-                        names = [n.strip() for n in names if n]
-                        self.task.write_in_database('array',
-                                                    _make_array(names))
-                        break
+                if not self.c_names:
+                    while True:
+                        line = f.readline()
+                        if not line.startswith(self.comments):
+                            names = line.split(self.delimiter)
+                            names = [n.strip() for n in names if n]
+                            self.task.write_in_database('array',
+                                                        _make_array(names))
+                            break
+                f.seek(0)
+                header = self._skip_header(f)[1]
+
+        # Columns selected by name must exist in the names row of the file.
+        selected_names = [c for c in columns or () if isinstance(c, str)]
+        if selected_names:
+            err_path = task.get_error_path() + '-columns'
+            if not self.names:
+                msg = ('Columns can only be selected by name if the first '
+                       'row of the file holds the names of the columns.')
+                return False, {err_path: msg}
+            if header is not None:
+                missing = [c for c in selected_names if c not in header]
+                if missing:
+                    msg = 'Columns {} not found in the file (available: {})'
+                    return False, {err_path: msg.format(missing, header)}
 
         return True, {}
 
@@ -145,6 +413,110 @@ class CSVLoadInterface(TaskInterface):
             self.task.write_in_database('array', _make_array(new))
 
 
+def h5_row_count(f, refresh=False):
+    """Number of rows written in a file by a SaveFileHDF5Task.
+
+    Parameters
+    ----------
+    f : h5py.File
+        Opened file.
+    refresh : bool, optional
+        Whether to refresh the counter before reading it (SWMR mode).
+
+    Returns
+    -------
+    count : int or None
+        None if the file was not written by a SaveFileHDF5Task.
+
+    """
+    if COUNT_CALLS_DATASET in f:
+        counter = f[COUNT_CALLS_DATASET]
+        if refresh:
+            counter.refresh()
+        return int(counter[0])
+    count = f.attrs.get('count_calls')
+    return None if count is None else int(count)
+
+
+def h5_data_keys(f):
+    """Names of the datasets of a file holding data.
+
+    """
+    return [k for k in f if k != COUNT_CALLS_DATASET]
+
+
+class H5TailReader(object):
+    """Reader keeping a HDF5 file open to read the rows appended to it.
+
+    Designed for files written by a SaveFileHDF5Task in SWMR mode: the
+    datasets are refreshed before each read and only the rows written since
+    the previous read (or the last rows of the file) are read so that the cost
+    of a read does not depend on the size of the file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the HDF5 file.
+    swmr : bool
+        Whether to open the file in SWMR mode.
+
+    """
+    def __init__(self, path, swmr):
+        self.path = path
+        self.swmr = swmr
+        self.file = h5py.File(path, 'r', swmr=swmr)
+        #: Number of rows of each dataset already read.
+        self.offsets = {}
+
+    def read(self, keys=None, window=0):
+        """Read the new rows of the specified datasets.
+
+        Parameters
+        ----------
+        keys : list, optional
+            Names or indexes of the datasets to read, all by default.
+        window : int, optional
+            If non zero, read the last window rows of each dataset instead of
+            the rows written since the previous read.
+
+        Returns
+        -------
+        data : dict
+            Rows read for each dataset.
+
+        """
+        f = self.file
+        # The root attributes of a file opened in SWMR mode are not
+        # refreshed, the row count is read from a dedicated dataset.
+        count_calls = h5_row_count(f, self.swmr)
+        names = h5_data_keys(f)
+        if keys is None:
+            keys = names
+        data = {}
+        for key in keys:
+            if isinstance(key, int):
+                key = names[key]
+            dataset = f[key]
+            if self.swmr:
+                dataset.refresh()
+            length = dataset.shape[0] if dataset.shape else 0
+            if count_calls is not None:
+                length = min(length, count_calls)
+            if window:
+                start = max(length - window, 0)
+            else:
+                start = min(self.offsets.get(key, 0), length)
+            data[key] = dataset[start:length]
+            self.offsets[key] = length
+        return data
+
+    def close(self):
+        """Close the underlying file.
+
+        """
+        self.file.close()
+
+
 class H5PYLoadInterface(TaskInterface):
     """Interface used to load .h5 files.
 
@@ -152,6 +524,10 @@ class H5PYLoadInterface(TaskInterface):
     Readers mode which allows read-only access while the file is still
     being written by another  task without any race conditions.
 
+    In incremental mode the file is kept open and only the rows appended
+    since the previous execution (or the last rows) are loaded, the rows
+    selection of the task being ignored.
+
     """
     #: Class attr used in the UI.
     file_formats = ['H5PY']
@@ -159,6 +535,21 @@ class H5PYLoadInterface(TaskInterface):
     #: Whether or not the HDF5 file supports SWMR
     swmr = Bool(True).tag(pref=True)
 
+    #: Whether to store lazy proxies reading the data on access instead of
+    #: loading the datasets in memory.
+    lazy = Bool(False).tag(pref=True)
+
+    #: Whether to keep the file open between executions and read only the
+    #: rows appended since the previous execution.
+    incremental = Bool(False).tag(pref=True)
+
+    #: In incremental mode, number of last rows to read at each execution
+    #: (only the new rows are read if zero).
+    window = Int(0).tag(pref=True)
+
+    #: Reader used in incremental mode.
+    _reader = Value()
+
     def perform(self):
         """Load a file stored in h5py format.
 
@@ -169,15 +560,43 @@ class H5PYLoadInterface(TaskInterface):
         folder = task.format_string(task.folder)
         filename = task.format_string(task.filename)
         full_path = os.path.join(folder, filename)
-
-        with h5py.File(full_path,'r', swmr=self.swmr) as f:
+        rows, columns = task.get_selection()
+
+        if self.incremental:
+            reader = self._reader
+            if reader is None or reader.path != full_path:
+                if reader is not None:
+                    reader.close()
+                reader = self._reader = H5TailReader(full_path, self.swmr)
+                task.root.resources['files'][full_path + '#tail'] = reader
+            task.write_in_database('array', reader.read(columns, self.window))
+            return
+
+        with h5py.File(full_path, 'r', swmr=self.swmr) as f:
             data_dict = {}
             # If the file is still opened by a saveFileHDF5Task,
             # we need to truncate the data
-            if 'count_calls' in f.attrs:
-                count_calls = f.attrs['count_calls']
-                for key in f:
-                    data_dict[key] = np.array(f[key][:count_calls])
+            count_calls = h5_row_count(f)
+            keys = h5_data_keys(f)
+            if columns is not None:
+                keys = [keys[c] if isinstance(c, int) else c for c in columns]
+            for key in keys:
+                dataset = f[key]
+                if not dataset.shape:
+                    data_dict[key] = dataset[()]
+                    continue
+                length = dataset.shape[0]
+                if count_calls is not None:
+                    length = min(length, count_calls)
+                selected = range(length)[rows]
+                if self.lazy:
+                    data_dict[key] = H5LazyArray(full_path, key, selected,
+                                                 dataset.shape[1:],
+                                                 dataset.dtype, self.swmr)
+                elif selected.step == 1:
+                    data_dict[key] = dataset[selected.start:selected.stop]
+                else:
+                    data_dict[key] = dataset[:length][rows]
 
         task.write_in_database('array', data_dict)
 
@@ -185,6 +604,7 @@ class H5PYLoadInterface(TaskInterface):
         """Try to find the names of the keys
 
         """
+        task = self.task
         try:
             full_folder_path = task.format_string(task.folder)
             filename = task.format_string(task.filename)
@@ -196,6 +616,61 @@ class H5PYLoadInterface(TaskInterface):
         if os.path.isfile(full_path):
             with h5py.File(full_path,'r', swmr=self.swmr) as f:
                 self.task.write_in_database('array',
-                                            {k: np.ones(5) for k in f})
+                                            {k: np.ones(5)
+                                             for k in h5_data_keys(f)})
+
+        return True, {}
+
+
+class NPYLoadInterface(TaskInterface):
+    """Interface used to load .npy files.
+
+    The file can be memory mapped, in which case only the parts of the array
+    which are accessed are read from the disc.
+
+    """
+    #: Class attr used in the UI.
+    file_formats = ['NPY']
+
+    #: Whether to memory map the file instead of loading it in memory.
+    memory_map = Bool(True).tag(pref=True)
+
+    def perform(self):
+        """Load a file stored in .npy format.
+
+        """
+        task = self.task
+        folder = task.format_string(task.folder)
+        filename = task.format_string(task.filename)
+        full_path = os.path.join(folder, filename)
+        rows, columns = task.get_selection()
+
+        data = np.load(full_path, mmap_mode='r' if self.memory_map else None)
+        data = data[rows]
+        if columns is not None:
+            data = _select_columns(data, columns)
+
+        task.write_in_database('array', data)
+
+    def check(self, *args, **kwargs):
+        """Read the header of the file to add the array in the database.
+
+        """
+        task = self.task
+        try:
+            full_folder_path = task.format_string(task.folder)
+            filename = task.format_string(task.filename)
+        except Exception:
+            return True, {}
+
+        full_path = os.path.join(full_folder_path, filename)
+
+        if os.path.isfile(full_path):
+            data = np.load(full_path, mmap_mode='r')
+            if data.dtype.names:
+                task.write_in_database('array',
+                                       _make_array(list(data.dtype.names)))
+            else:
+                task.write_in_database('array', np.ones(5))
 
         return True, {}
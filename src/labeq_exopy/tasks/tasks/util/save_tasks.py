@@ -28,8 +28,10 @@ from exopy.tasks.api import SimpleTask, validators
 from exopy.utils.atom_util import ordered_dict_from_pref, ordered_dict_to_pref
 from exopy.utils.traceback import format_exc
 
+from ..formulas import FormulaCacheMixin
 
-class SaveTask(SimpleTask):
+
+class SaveTask(FormulaCacheMixin, SimpleTask):
     """ Save the specified entries either in a CSV file or an array. The file
     is closed when the line number is reached.
 
@@ -93,7 +95,7 @@ class SaveTask(SimpleTask):
             self.line_index = 0
             size_str = self.array_size
             if size_str:
-                self.array_length = self.format_and_eval_string(size_str)
+                self.array_length = self.eval_formula(size_str)
             else:
                 self.array_length = -1
 
@@ -137,7 +139,7 @@ class SaveTask(SimpleTask):
             self.initialized = True
 
         # Writing
-        values = tuple(self.format_and_eval_string(s)
+        values = tuple(self.eval_formula(s)
                        for s in self.saved_values.values())
         if self.saving_target != 'Array':
             new_line = '\t'.join([str(val) for val in values]) + '\n'
@@ -255,7 +257,7 @@ class SaveTask(SimpleTask):
             self.database_entries = {}
 
 
-class SaveFileTask(SimpleTask):
+class SaveFileTask(FormulaCacheMixin, SimpleTask):
     """ Save the specified entries in a CSV file.
 
     Wait for any parallel operation before execution.
@@ -263,7 +265,8 @@ class SaveFileTask(SimpleTask):
     Notes
     -----
     Currently only support saving floats and arrays of floats (record arrays
-    or simple arrays).
+    or simple arrays). Complex values are saved as two columns holding their
+    real and imaginary parts.
 
     """
     #: Folder in which to save the data.
@@ -292,6 +295,24 @@ class SaveFileTask(SimpleTask):
     #: Shapes of identified arrays.
     array_dims = Value()
 
+    #: Format used to write the values when saving arrays.
+    float_format = Str('%.18e').tag(pref=True)
+
+    #: Number of columns written when saving arrays.
+    _columns_number = Int()
+
+    #: Whether each saved field is complex (and hence saved in two columns).
+    _complex_fields = List()
+
+    #: Format of a line of the file when saving arrays.
+    _row_format = Str()
+
+    #: Block in which the columns are assembled before being written.
+    _block = Value()
+
+    #: Number of lines formatted at once when saving arrays.
+    chunk_lines = 4096
+
     database_entries = set_default({'file': None})
 
     wait = set_default({'activated': True})  # Wait on all pools by default.
@@ -325,99 +346,120 @@ class SaveFileTask(SimpleTask):
             labels = []
             self.array_values = list()
             self.array_dims = list()
+            self._complex_fields = []
             for i, (l, v) in enumerate(self.saved_values.items()):
                 label = self.format_string(l)
-                value = self.format_and_eval_string(v)
+                value = self.eval_formula(v)
+                fields = [(label, value)]
                 if isinstance(value, numpy.ndarray):
                     names = value.dtype.names
                     self.array_values.append(i)
                     self.array_dims.append(value.ndim)
                     if names:
-                        labels.extend([label + '_' + m for m in names])
+                        fields = [(label + '_' + m, value[m]) for m in names]
+                for name, field in fields:
+                    is_complex = numpy.iscomplexobj(field)
+                    self._complex_fields.append(is_complex)
+                    if is_complex:
+                        labels.extend([name + '_real', name + '_imag'])
                     else:
-                        labels.append(label)
-                else:
-                    labels.append(label)
+                        labels.append(name)
             self.file_object.write(('\t'.join(labels) + '\n').encode('utf-8'))
             self.file_object.flush()
 
-            self.initialized = True
+            self._columns_number = len(labels)
+            self._row_format = '\t'.join([self.float_format]*len(labels))
+            self._row_format += '\n'
+            self._block = None
 
-        shapes_1D = set()
-        shapes_2D = set()
-        values = []
-        for i, v in enumerate(self.saved_values.values()):
-            value = self.format_and_eval_string(v)
-            values.append(value)
-            if i in self.array_values:  # if we deal with an array_type value
-                if len(value.shape) == 1:
-                    shapes_1D.add(value.shape)
-                elif len(value.shape) == 2:
-                    shapes_2D.add(value.shape)
-                else:
-                    log = logging.getLogger()
-                    msg = ("In {}, impossible to save arrays exceeding two "
-                           "dimension. Save file in HDF5 format.")
-                    log.error(msg.format(self.name))
-                    self.root.should_stop.set()
+            self.initialized = True
 
-        if shapes_1D:
-            if len(shapes_1D) > 1:
-                log = logging.getLogger()
-                msg = ("In {}, impossible to save simultaneously 1D-arrays of "
-                       "different sizes. Save file in HDF5 format.")
-                log.error(msg.format(self.name))
-                self.root.should_stop.set()
-            else:
-                length = shapes_1D.pop()
-
-        if shapes_2D:
-            if len(shapes_2D) > 1:
-                log = logging.getLogger()
-                msg = ("In {}, impossible to save simultaneously 2D-arrays of "
-                       "different sizes. Save file in HDF5 format.")
-                log.error(msg.format(self.name))
-                self.root.should_stop.set()
-            elif shapes_1D:
-                if length == shapes_2D[0]:
-                    shape = shapes_2D.pop()
-                else:
-                    log = logging.getLogger()
-                    msg = ("In {}, 1D-arrays and 2D-arrays could not be "
-                           "broadcast together. Save file in HDF5 format.")
-                    log.error(msg.format(self.name))
-                    self.root.should_stop.set()
-            else:
-                shape = shapes_2D.pop()
+        values = [self.eval_formula(v) for v in self.saved_values.values()]
 
         if not self.array_values:
             new_line = '\t'.join([str(val) for val in values]) + '\n'
             self.file_object.write(new_line.encode('utf-8'))
             self.file_object.flush()
-        else:
-            columns = []
-            if not (2 in self.array_dims):
-                for i, val in enumerate(values):
-                    if i in self.array_values:
-                        if val.dtype.names:
-                            columns.extend([val[m] for m in val.dtype.names])
-                        else:
-                            columns.append(val)
-                    else:
-                        columns.append(numpy.ones(length)*val)
+            return
+
+        shape = self._broadcast_shape(values)
+        if shape is None:
+            self.root.should_stop.set()
+            return
+
+        # Assemble all the columns in a single block (one row per column, so
+        # that each column can be filled through a contiguous view) which is
+        # reused as long as the number of lines does not change.
+        lines = shape[0]*shape[1] if len(shape) == 2 else shape[0]
+        block = self._block
+        if block is None or block.shape[1] != lines:
+            block = self._block = numpy.empty((self._columns_number, lines))
+        column = 0
+        complex_fields = iter(self._complex_fields)
+        for val in values:
+            if isinstance(val, numpy.ndarray) and val.dtype.names:
+                fields = [val[m] for m in val.dtype.names]
             else:
-                for i, val in enumerate(values):
-                    if i in self.array_values:
-                        if val.ndim == 1:
-                            val_2D = numpy.array([val]).T
-                            ones = numpy.ones((1, shape[1]))
-                            val = numpy.multiply(val_2D, ones)
-                    else:
-                        val = numpy.ones(shape[0]*shape[1])*val
-                    columns.append(val.reshape((shape[0]*shape[1])))
-            array_to_save = numpy.rec.fromarrays(columns)
-            numpy.savetxt(self.file_object, array_to_save, delimiter='\t')
-            self.file_object.flush()
+                fields = (val,)
+            for field in fields:
+                if len(shape) == 2 and numpy.ndim(field) == 1:
+                    field = field[:, None]
+                if next(complex_fields):
+                    block[column].reshape(shape)[...] = numpy.real(field)
+                    block[column + 1].reshape(shape)[...] = numpy.imag(field)
+                    column += 2
+                else:
+                    block[column].reshape(shape)[...] = field
+                    column += 1
+
+        # Format the lines by chunks to bound the size of the text in memory.
+        chunk = self.chunk_lines
+        for start in range(0, lines, chunk):
+            rows = block[:, start:start + chunk]
+            text = (self._row_format*rows.shape[1]) % tuple(rows.T.ravel())
+            self.file_object.write(text.encode('utf-8'))
+        self.file_object.flush()
+
+    def _broadcast_shape(self, values):
+        """Determine the shape on which the saved values are broadcast.
+
+        Returns None (after logging the reason) if the values cannot be saved
+        together.
+
+        """
+        shapes_1D = set()
+        shapes_2D = set()
+        for i in self.array_values:
+            shape = values[i].shape
+            if len(shape) == 1:
+                shapes_1D.add(shape)
+            elif len(shape) == 2:
+                shapes_2D.add(shape)
+            else:
+                msg = ("In {}, impossible to save arrays exceeding two "
+                       "dimension. Save file in HDF5 format.")
+                logging.getLogger(__name__).error(msg.format(self.name))
+                return None
+
+        msg = None
+        if len(shapes_1D) > 1:
+            msg = ("In {}, impossible to save simultaneously 1D-arrays of "
+                   "different sizes. Save file in HDF5 format.")
+        elif len(shapes_2D) > 1:
+            msg = ("In {}, impossible to save simultaneously 2D-arrays of "
+                   "different sizes. Save file in HDF5 format.")
+        elif shapes_2D:
+            shape = shapes_2D.pop()
+            if shapes_1D and shapes_1D.pop()[0] != shape[0]:
+                msg = ("In {}, 1D-arrays and 2D-arrays could not be "
+                       "broadcast together. Save file in HDF5 format.")
+        else:
+            shape = shapes_1D.pop()
+
+        if msg:
+            logging.getLogger(__name__).error(msg.format(self.name))
+            return None
+        return shape
 
     def check(self, *args, **kwargs):
         """Check that given parameters are meaningful
@@ -465,6 +507,13 @@ class SaveFileTask(SimpleTask):
                     'Failed to evaluate entry {}:\n{}'.format(v, format_exc())
                 test = False
 
+        try:
+            self.float_format % 1.0
+        except (TypeError, ValueError):
+            traceback[err_path + '-float_format'] = \
+                'Invalid format for a float : {}'.format(self.float_format)
+            test = False
+
         if not test:
             return test, traceback
 
@@ -475,6 +524,11 @@ class SaveFileTask(SimpleTask):
         return test, traceback
 
 
+#: Name of the dataset holding the number of rows written in a HDF5 file.
+#: Unlike the attributes, datasets can be refreshed by SWMR readers.
+COUNT_CALLS_DATASET = '_count_calls'
+
+
 class _HDF5File(h5py.File):
     """Resize the datasets before closing the file
 
@@ -484,6 +538,8 @@ class _HDF5File(h5py.File):
 
     def close(self):
         for dataset in self.keys():
+            if dataset == COUNT_CALLS_DATASET:
+                continue
             oldshape = self[dataset].shape
             newshape = (self.attrs['count_calls'], ) + oldshape[1:]
             self[dataset].resize(newshape)
@@ -501,7 +557,7 @@ class _HDF5File(h5py.File):
 VAL_REAL = validators.Feval(types=numbers.Real)
 
 
-class SaveFileHDF5Task(SimpleTask):
+class SaveFileHDF5Task(FormulaCacheMixin, SimpleTask):
     """ Save the specified entries in a HDF5 file.
 
     Wait for any parallel operation before execution.
@@ -548,7 +604,7 @@ class SaveFileHDF5Task(SimpleTask):
 
         """
 
-        calls_estimation = self.format_and_eval_string(self.calls_estimation)
+        calls_estimation = self.eval_formula(self.calls_estimation)
 
         # Initialisation.
         if not self.initialized:
@@ -575,7 +631,7 @@ class SaveFileHDF5Task(SimpleTask):
             for l, v in self.saved_values.items():
                 label = self.format_string(l)
                 self._formatted_labels.append(label)
-                value = self.format_and_eval_string(v)
+                value = self.eval_formula(v)
                 if isinstance(value, numpy.ndarray):
                     names = value.dtype.names
                     if names:
@@ -596,6 +652,8 @@ class SaveFileHDF5Task(SimpleTask):
                                      self.datatype, self.compression)
             f.attrs['header'] = self.format_string(self.header)
             f.attrs['count_calls'] = 0
+            super(_HDF5File, f).create_dataset(COUNT_CALLS_DATASET, (1,),
+                                               dtype='i8', data=[0])
             if self.swmr:
                 f.swmr_mode = True
             f.flush()
@@ -607,13 +665,15 @@ class SaveFileHDF5Task(SimpleTask):
 
         if not (count_calls % calls_estimation):
             for dataset in f.keys():
+                if dataset == COUNT_CALLS_DATASET:
+                    continue
                 oldshape = f[dataset].shape
                 newshape = (oldshape[0] + calls_estimation, ) + oldshape[1:]
                 f[dataset].resize(newshape)
 
         labels = self._formatted_labels
         for i, v in enumerate(self.saved_values.values()):
-            value = self.format_and_eval_string(v)
+            value = self.eval_formula(v)
             if isinstance(value, numpy.ndarray):
                 names = value.dtype.names
                 if names:
@@ -625,6 +685,7 @@ class SaveFileHDF5Task(SimpleTask):
                 f[labels[i]][count_calls] = value
 
         f.attrs['count_calls'] = count_calls + 1
+        f[COUNT_CALLS_DATASET][0] = count_calls + 1
         f.flush()
 
     def check(self, *args, **kwargs):
@@ -686,12 +747,85 @@ class SaveFileHDF5Task(SimpleTask):
     _formatted_labels = List()
 
 
+class _NpyAppender(object):
+    """Binary .npy file growing by one array at each call to append.
+
+    The header has a fixed size so that the number of arrays stored in the
+    file can be updated in place after each append. The file is always a
+    valid .npy file of shape (count,) + array shape which can be memory
+    mapped using numpy.load(path, mmap_mode='r').
+
+    """
+    #: Total size of the magic string and header (multiple of 64 bytes).
+    HEADER_SIZE = 256
+
+    def __init__(self, path, dtype, shape):
+        self.dtype = numpy.dtype(dtype)
+        self.shape = tuple(shape)
+        self.count = 0
+        self._descr = numpy.lib.format.dtype_to_descr(self.dtype)
+        self._file = open(path, 'wb')
+        self._write_header()
+
+    def append(self, array):
+        """Append an array at the end of the file.
+
+        """
+        if array.shape != self.shape:
+            msg = 'Cannot append an array of shape {} to arrays of shape {}'
+            raise ValueError(msg.format(array.shape, self.shape))
+        f = self._file
+        f.seek(0, os.SEEK_END)
+        f.write(numpy.ascontiguousarray(array, self.dtype).tobytes())
+        self.count += 1
+        self._write_header()
+        f.flush()
+
+    def close(self):
+        self._file.close()
+
+    def _write_header(self):
+        """Write the header describing the current content of the file.
+
+        """
+        header = repr({'descr': self._descr, 'fortran_order': False,
+                       'shape': (self.count,) + self.shape})
+        # Magic string (6), version (2) and header length (2).
+        length = self.HEADER_SIZE - 10
+        header = header.ljust(length - 1) + '\n'
+        if len(header) > length:
+            raise ValueError('Array description too long for a .npy header.')
+        f = self._file
+        f.seek(0)
+        f.write(numpy.lib.format.magic(1, 0))
+        f.write(numpy.array(length, '<u2').tobytes())
+        f.write(header.encode('latin1'))
+
+
+class _NpyPreallocated(object):
+    """Preallocated, memory mapped, .npy file filled one array at a time.
+
+    """
+    def __init__(self, path, dtype, points, shape):
+        self.points = points
+        self.memmap = numpy.lib.format.open_memmap(path, mode='w+',
+                                                   dtype=dtype,
+                                                   shape=points + shape)
+
+    def close(self):
+        self.memmap.flush()
+        del self.memmap
+
+
 ARR_VAL = validators.Feval(types=numpy.ndarray)
 
 
-class SaveArrayTask(SimpleTask):
+class SaveArrayTask(FormulaCacheMixin, SimpleTask):
     """Save the specified array either in a CSV file or as a .npy binary file.
 
+    In the streaming binary modes, the arrays saved at each call are gathered
+    in a single .npy file which can be memory mapped for analysis.
+
     Wait for any parallel operation before execution.
 
     """
@@ -708,8 +842,27 @@ class SaveArrayTask(SimpleTask):
     #: Name of the array to save in the database.
     target_array = Str().tag(pref=True, feval=ARR_VAL)
 
-    #: Flag indicating whether to save as csv or .npy.
-    mode = Enum('Text file', 'Binary file').tag(pref=True)
+    #: Flag indicating whether to save as csv or .npy. In appended mode all
+    #: the arrays saved during the measurement are stacked in a single .npy
+    #: file, in preallocated mode they are written at the specified index of a
+    #: memory mapped .npy file.
+    mode = Enum('Text file', 'Binary file', 'Appended binary file',
+                'Preallocated binary file').tag(pref=True)
+
+    #: Number of arrays to store in preallocated mode (integer or tuple of
+    #: integers, evaluated at runtime).
+    points = Str().tag(pref=True)
+
+    #: Index at which to store the array in preallocated mode (integer or
+    #: tuple of integers, evaluated at runtime). Arrays are stored one after
+    #: the other if left empty.
+    index = Str().tag(pref=True)
+
+    #: Streaming file in the appended and preallocated modes.
+    stream = Value()
+
+    #: Number of arrays written in the streaming file.
+    calls = Int()
 
     wait = set_default({'activated': True})  # Wait on all pools by default.
 
@@ -717,7 +870,7 @@ class SaveArrayTask(SimpleTask):
         """ Save array to file.
 
         """
-        array_to_save = self.format_and_eval_string(self.target_array)
+        array_to_save = self.eval_formula(self.target_array)
 
         assert isinstance(array_to_save, numpy.ndarray), 'Wrong type returned.'
 
@@ -755,7 +908,7 @@ class SaveArrayTask(SimpleTask):
             numpy.savetxt(file_object, array_to_save, delimiter='\t')
             file_object.close()
 
-        else:
+        elif self.mode == 'Binary file':
             try:
                 file_object = open(full_path, 'wb')
                 file_object.close()
@@ -769,6 +922,45 @@ class SaveArrayTask(SimpleTask):
 
             numpy.save(full_path, array_to_save)
 
+        else:
+            self._stream_array(full_path, array_to_save)
+
+    def _stream_array(self, full_path, array):
+        """Write the array in the streaming file, opening it on first call.
+
+        """
+        if self.stream is None:
+            try:
+                if self.mode == 'Appended binary file':
+                    self.stream = _NpyAppender(full_path, array.dtype,
+                                               array.shape)
+                else:
+                    points = self.eval_formula(self.points)
+                    if not isinstance(points, tuple):
+                        points = (int(points),)
+                    self.stream = _NpyPreallocated(full_path, array.dtype,
+                                                   points, array.shape)
+            except (IOError, ValueError):
+                msg = "In {}, failed to open the specified file."
+                log = logging.getLogger()
+                log.exception(msg.format(self.name))
+
+                self.root.should_stop.set()
+                return
+            self.root.resources['files'][full_path] = self.stream
+            self.calls = 0
+
+        if self.mode == 'Appended binary file':
+            self.stream.append(array)
+        else:
+            memmap = self.stream.memmap
+            if self.index:
+                index = self.eval_formula(self.index)
+            else:
+                index = numpy.unravel_index(self.calls, self.stream.points)
+            memmap[index] = array
+        self.calls += 1
+
     def check(self, *args, **kwargs):
         """Check folder path and filename.
 
@@ -776,7 +968,7 @@ class SaveArrayTask(SimpleTask):
         err_path = self.get_error_path()
         test, traceback = super(SaveArrayTask, self).check(*args, **kwargs)
 
-        if self.mode == 'Binary file':
+        if self.mode != 'Text file':
             if len(self.filename) > 3 and self.filename[-4] == '.'\
                     and self.filename[-3:] != 'npy':
                 self.filename = self.filename[:-4] + '.npy'
@@ -788,6 +980,30 @@ class SaveArrayTask(SimpleTask):
                 traceback[err_path + '-header'] =\
                     'Cannot write a header when saving in binary mode.'
 
+        if self.mode == 'Preallocated binary file':
+            for name in ('points', 'index'):
+                formula = getattr(self, name)
+                if not formula:
+                    continue
+                try:
+                    value = self.format_and_eval_string(formula)
+                except Exception:
+                    test = False
+                    traceback[err_path + '-' + name] = \
+                        'Failed to evaluate {}:\n{}'.format(formula,
+                                                             format_exc())
+                    continue
+                values = value if isinstance(value, tuple) else (value,)
+                if not all(isinstance(v, numbers.Integral) for v in values):
+                    test = False
+                    traceback[err_path + '-' + name] = \
+                        'The {} must be an integer or a tuple of integers.'\
+                        .format(name)
+            if not self.points:
+                test = False
+                traceback[err_path + '-points'] = \
+                    'The number of arrays to store must be specified.'
+
         try:
             full_folder_path = self.format_string(self.folder)
             filename = self.format_string(self.filename)
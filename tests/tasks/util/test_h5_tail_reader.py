@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2015-2018 by ExopyHqcLegacy Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test reading a HDF5 file while it is written in SWMR mode.
+
+"""
+import multiprocessing
+
+import pytest
+
+np = pytest.importorskip('numpy')
+h5py = pytest.importorskip('h5py')
+load_tasks = pytest.importorskip('labeq_exopy.tasks.tasks.util.load_tasks')
+
+from labeq_exopy.tasks.tasks.util.save_tasks import COUNT_CALLS_DATASET
+
+#: Number of rows preallocated at once, as calls_estimation does.
+BLOCK = 2
+
+ROWS = 5
+
+
+def _write(path, ready, write, written):
+    """Append rows to a file following the layout of SaveFileHDF5Task.
+
+    """
+    with h5py.File(path, 'w', libver='latest') as f:
+        f.create_dataset('x', (BLOCK,), maxshape=(None,), dtype='f8')
+        f.create_dataset(COUNT_CALLS_DATASET, (1,), dtype='i8', data=[0])
+        f.attrs['count_calls'] = 0
+        f.swmr_mode = True
+        f.flush()
+        ready.set()
+
+        for i in range(ROWS):
+            assert write.wait(10)
+            write.clear()
+            if i and not i % BLOCK:
+                f['x'].resize((i + BLOCK,))
+            f['x'][i] = i
+            f.attrs['count_calls'] = i + 1
+            f[COUNT_CALLS_DATASET][0] = i + 1
+            f.flush()
+            written.set()
+
+
+def test_read_while_writing(tmpdir):
+    """Each read returns exactly the rows written since the previous one.
+
+    """
+    path = str(tmpdir.join('tail.h5'))
+    ctx = multiprocessing.get_context('spawn')
+    ready, write, written = ctx.Event(), ctx.Event(), ctx.Event()
+    writer = ctx.Process(target=_write, args=(path, ready, write, written))
+    writer.start()
+    try:
+        assert ready.wait(10)
+        reader = load_tasks.H5TailReader(path, True)
+        try:
+            assert len(reader.read()['x']) == 0
+            for i in range(ROWS):
+                write.set()
+                assert written.wait(10)
+                written.clear()
+                np.testing.assert_array_equal(reader.read()['x'], [i])
+            assert list(reader.read(window=3)['x']) == [2, 3, 4]
+            assert COUNT_CALLS_DATASET not in reader.read()
+        finally:
+            reader.close()
+    finally:
+        writer.join(10)
+    assert writer.exitcode == 0